@@ -0,0 +1,65 @@
+"""
+Regressão + desempenho da extração de DY (statusinvest_dy.extract_dy).
+
+1. Regressão: no HTML salvo do BBAS3 o DY 12m tem que sair 7,85 (texto do caminho
+   requests) e nada pode ser inventado para 5/10 anos (a página não tem esses campos).
+2. Desempenho: página salva e um texto adversário (muitos "dy" sem "meses"), comparando
+   com as regexes antigas sobre o texto inteiro. extract_dy tem que respeitar o orçamento.
+
+Uso: python bench_dy.py [arquivo.html]   (sai com código 1 se algo falhar)
+"""
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from statusinvest_dy import DY_BUDGET_S, extract_dy
+
+LEGACY_PATTERNS = [
+    r'dy.*?12.*?meses?.*?(\d+[,.]?\d*%?)',
+    r'dy.*?5.*?anos?.*?(\d+[,.]?\d*%?)',
+    r'dy.*?10.*?anos?.*?(\d+[,.]?\d*%?)',
+]
+
+def legacy(text: str) -> list:
+    return [m.group(1) if m else None
+            for m in (re.search(p, text, re.IGNORECASE) for p in LEGACY_PATTERNS)]
+
+def medir(fn, text: str):
+    inicio = time.perf_counter()
+    resultado = fn(text)
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+def main(arquivo: str) -> int:
+    falhas = []
+    with open(arquivo, encoding="utf-8") as f:
+        html = f.read()
+    text = BeautifulSoup(html, "lxml").get_text(" ", strip=True)
+
+    # 1. Regressão
+    dy = extract_dy(text)
+    esperado = {"dy_12m": 7.85, "dy_medio_5a": None, "dy_medio_10a": None}
+    if "bbas3" in arquivo.lower() and dy != esperado:
+        falhas.append(f"regressão: esperado {esperado}, obtido {dy}")
+    print(f"texto da página: {dy}")
+
+    # 2. Desempenho
+    adversario = "dy 12 " * 150 + "x" * 2000  # cresce ~cúbico nas regexes antigas
+    limite_ms = DY_BUDGET_S * 1000 * 2  # folga para o último bloco depois do prazo
+    for nome, entrada in [("texto", text), ("html bruto", html), ("adversário", adversario)]:
+        ms_antigo, antigo = medir(legacy, entrada)
+        ms_novo, novo = medir(extract_dy, entrada)
+        print(f"{nome:<11} {len(entrada) / 1024:>6.0f} KB | regexes antigas {ms_antigo:>8.1f} ms {antigo} "
+              f"| extract_dy {ms_novo:>6.1f} ms {list(novo.values())}")
+        if ms_novo > limite_ms:
+            falhas.append(f"{nome}: extract_dy levou {ms_novo:.1f} ms (limite {limite_ms:.0f} ms)")
+
+    for f in falhas:
+        print("FALHA:", f)
+    print("OK" if not falhas else f"{len(falhas)} falha(s)")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "debug_bbas3_structure.html"
+    sys.exit(main(arquivo))
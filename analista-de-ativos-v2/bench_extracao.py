@@ -0,0 +1,95 @@
+"""
+Micro-benchmark da extração de indicadores: locators x snapshot (page.evaluate).
+
+Carrega um HTML salvo (ex.: debug_bbas3_structure.html) num Chromium sem rede,
+roda as duas estratégias de v1 e v2 e mostra idas ao browser e latência.
+
+Uso: python bench_extracao.py [arquivo.html] [repeticoes]
+"""
+import asyncio
+import inspect
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+import statusinvest_scrape as v1
+import statusinvest_scrape_v2 as v2
+
+class ContadorIPC:
+    """Proxy de page/locator que conta cada chamada assíncrona (uma ida ao browser)."""
+
+    def __init__(self, alvo, contador=None):
+        self._alvo = alvo
+        self._contador = contador if contador is not None else [0]
+
+    @property
+    def chamadas(self) -> int:
+        return self._contador[0]
+
+    def _embrulhar(self, obj):
+        if isinstance(obj, list):
+            return [self._embrulhar(o) for o in obj]
+        if hasattr(obj, "locator") and not isinstance(obj, ContadorIPC):
+            return ContadorIPC(obj, self._contador)
+        return obj
+
+    def __getattr__(self, nome):
+        attr = getattr(self._alvo, nome)
+        if not callable(attr):
+            return self._embrulhar(attr)
+
+        def chamada(*args, **kwargs):
+            r = attr(*args, **kwargs)
+            if inspect.isawaitable(r):
+                async def _aguardar():
+                    self._contador[0] += 1
+                    return self._embrulhar(await r)
+                return _aguardar()
+            return self._embrulhar(r)
+        return chamada
+
+ESTRATEGIAS = [
+    ("v1 locators", v1.extract_indicators_locators),
+    ("v1 snapshot", v1.extract_indicators_snapshot),
+    ("v2 locators", v2.scrape_basic_indicators),
+    ("v2 snapshot", v2.scrape_basic_indicators_snapshot),
+]
+
+async def main(arquivo: str, repeticoes: int) -> None:
+    with open(arquivo, encoding="utf-8") as f:
+        html = f.read()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        ctx = await browser.new_context()
+        # Sem rede: só o HTML salvo
+        await ctx.route("**/*", lambda route: route.abort())
+        page = await ctx.new_page()
+        await page.set_content(html, wait_until="domcontentloaded")
+
+        resultados = {}
+        print(f"{'estratégia':<14} {'idas/ticker':>12} {'ms/ticker':>10}")
+        for nome, extrair in ESTRATEGIAS:
+            tempos = []
+            for _ in range(repeticoes):
+                contador = ContadorIPC(page)
+                inicio = time.perf_counter()
+                resultados[nome] = await extrair(contador)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            tempos.sort()
+            print(f"{nome:<14} {contador.chamadas:>12} {tempos[len(tempos) // 2]:>10.1f}")
+
+        await browser.close()
+
+    for versao in ("v1", "v2"):
+        iguais = resultados[f"{versao} locators"] == resultados[f"{versao} snapshot"]
+        print(f"{versao}: resultados {'idênticos' if iguais else 'DIFERENTES'}")
+        if not iguais:
+            print("  locators:", resultados[f"{versao} locators"])
+            print("  snapshot:", resultados[f"{versao} snapshot"])
+
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "debug_bbas3_structure.html"
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(main(arquivo, repeticoes))
@@ -0,0 +1,74 @@
+"""
+Vazão da normalização de números (statusinvest_numeros) sobre um milhão de valores.
+
+Gera textos no formato da página ("1.234,56", "7,85%", "-12,5", "-", "N/A",
+"10,31\\xa0%", "R$ 0,45", ...) e compara:
+
+  - antigo:   o normalize_number de antes (cadeia de .replace, um por vez, % volta texto);
+  - escalar:  statusinvest_numeros.numero num loop;
+  - vetorial: statusinvest_numeros.normalizar_numeros sobre a Series inteira.
+
+Confere também que escalar e vetorial dão o mesmo valor e a mesma marca de percentual.
+
+Uso: python bench_numeros.py [-n 1000000]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from statusinvest_numeros import normalizar_numeros, numero
+
+def normalize_number_antigo(s):
+    if not s:
+        return None
+    s = s.strip()
+    if s.endswith('%'):
+        return s
+    s = s.replace('.', '').replace(' ', '').replace('\xa0', '').replace(',', '.')
+    try:
+        return float(s)
+    except:
+        return None
+
+def gerar(n: int) -> list:
+    rnd = random.Random(42)
+    formatos = [
+        lambda v: f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", "."),  # 1.234,56
+        lambda v: f"{v:.2f}".replace(".", ",") + "%",                                 # 7,85%
+        lambda v: f"{-v:.1f}".replace(".", ","),                                      # -12,5
+        lambda v: f"{v:.2f}".replace(".", ",") + "\xa0%",                             # 10,31 %
+        lambda v: f"R$ {v:.2f}".replace(".", ","),                                    # R$ 0,45
+        lambda v: f"{v:.2f}",                                                          # 10.31
+        lambda v: rnd.choice(["-", "N/A", "", "—"]),
+    ]
+    return [rnd.choice(formatos)(rnd.uniform(0, 5000)) for _ in range(n)]
+
+def medir(nome: str, fn, n: int):
+    inicio = time.perf_counter()
+    resultado = fn()
+    s = time.perf_counter() - inicio
+    print(f"{nome:<9} {s:7.2f}s  {n / s / 1e6:6.2f} M valores/s")
+    return resultado
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalização de números: um por vez x vetorizada")
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+    valores = gerar(args.n)
+    serie = pd.Series(valores, dtype="string[pyarrow]")
+    print(f"{args.n} valores")
+    medir("antigo", lambda: [normalize_number_antigo(v) for v in valores], args.n)
+    escalar = medir("escalar", lambda: [numero(v) for v in valores], args.n)
+    vetorial = medir("vetorial", lambda: normalizar_numeros(serie), args.n)
+
+    esperado = np.array([np.nan if v is None else v for v, _ in escalar], dtype="float64")
+    iguais = np.array_equal(esperado, vetorial["valor"].to_numpy(), equal_nan=True)
+    iguais &= bool((np.array([p for _, p in escalar]) == vetorial["percentual"].to_numpy()).all())
+    print("escalar e vetorial iguais" if iguais else "DIVERGÊNCIA entre escalar e vetorial")
+    print(f"percentuais: {int(vetorial['percentual'].sum())}, vazios/inválidos: {int(vetorial['valor'].isna().sum())}")
+
+if __name__ == "__main__":
+    main()
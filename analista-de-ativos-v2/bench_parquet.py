@@ -0,0 +1,86 @@
+"""
+Triagem sobre o histórico de coletas: JSON lines x Parquet (statusinvest_parquet).
+
+Gera `--tickers` x `--dias` coletas sintéticas (uma saída do lote por dia, em
+JSON lines, e o mesmo conteúdo em Parquet particionado por dia) num diretório
+temporário e mede a mesma triagem, "dy >= 6 and p_l < 10" em todas as coletas:
+
+  - json:    loop lendo os arquivos, json.loads e conversão por linha;
+  - parquet: carregar() com memory map + DataFrame.query.
+
+Uso: python bench_parquet.py [--tickers 400] [--dias 250]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from statusinvest_numeros import numero
+from statusinvest_parquet import COLUNAS_INDICADORES, ExportadorParquet, carregar
+
+def _coleta(ticker: str, dia: datetime, rnd: random.Random) -> dict:
+    return {
+        "ticker": ticker,
+        "indicadores": {"P/L": round(rnd.uniform(2, 30), 2), "P/VP": round(rnd.uniform(0.3, 5), 2),
+                        "DY": f"{rnd.uniform(0, 15):.2f}%".replace(".", ","),
+                        "ROE": f"{rnd.uniform(-5, 35):.2f}%".replace(".", ",")},
+        "dividendos": {"dy_12m": round(rnd.uniform(0, 15), 2), "historico_12m": [
+            {"data": (dia - timedelta(days=30 * i)).strftime("%d/%m/%Y"), "valor": round(rnd.uniform(0.05, 1), 4)}
+            for i in range(4)]},
+    }
+
+def gerar(diretorio: str, tickers: int, dias: int) -> None:
+    rnd = random.Random(42)
+    nomes = [f"T{i:03d}3" for i in range(tickers)]
+    inicio = datetime(2024, 1, 1, 18)
+    with ExportadorParquet(os.path.join(diretorio, "parquet"), gravar_a_cada=tickers) as exportador:
+        for d in range(dias):
+            dia = inicio + timedelta(days=d)
+            with open(os.path.join(diretorio, f"lote_{dia:%Y%m%d}.jsonl"), "w", encoding="utf-8") as f:
+                for t in nomes:
+                    data = _coleta(t, dia, rnd)
+                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
+                    exportador.adicionar(data, dia)
+
+def triagem_json(diretorio: str) -> int:
+    achados = 0
+    for nome in sorted(os.listdir(diretorio)):
+        if not nome.endswith(".jsonl"):
+            continue
+        with open(os.path.join(diretorio, nome), encoding="utf-8") as f:
+            for linha in f:
+                data = json.loads(linha)
+                ind = {COLUNAS_INDICADORES[k]: numero(v)[0] for k, v in data["indicadores"].items()}
+                if ind["dy"] is not None and ind["p_l"] is not None and ind["dy"] >= 6 and ind["p_l"] < 10:
+                    achados += 1
+    return achados
+
+def triagem_parquet(diretorio: str) -> int:
+    df = carregar("indicadores", os.path.join(diretorio, "parquet"), colunas=["ticker", "coletado_em", "p_l", "dy"])
+    return len(df.query("dy >= 6 and p_l < 10"))
+
+def _tamanho(caminho: str) -> float:
+    return sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(caminho) for f in fs) / 2**20
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Triagem: JSON lines x Parquet")
+    parser.add_argument("--tickers", type=int, default=400)
+    parser.add_argument("--dias", type=int, default=250)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        gerar(tmp, args.tickers, args.dias)
+        print(f"{args.tickers} tickers x {args.dias} coletas = {args.tickers * args.dias} linhas "
+              f"(gerado em {time.perf_counter() - inicio:.1f}s)")
+        json_mb = _tamanho(tmp) - _tamanho(os.path.join(tmp, "parquet"))
+        print(f"disco: JSON lines {json_mb:.1f} MB x Parquet {_tamanho(os.path.join(tmp, 'parquet')):.1f} MB")
+        for nome, fn in (("json", triagem_json), ("parquet", triagem_parquet)):
+            inicio = time.perf_counter()
+            achados = fn(tmp)
+            print(f"{nome:<8} {achados:>7} linhas na triagem em {(time.perf_counter() - inicio) * 1000:8.0f} ms")
+
+if __name__ == "__main__":
+    main()
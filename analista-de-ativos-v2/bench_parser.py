@@ -0,0 +1,42 @@
+"""
+Benchmark do parser offline sobre um corpus de páginas salvas.
+
+Uso: python bench_parser.py [glob] [repeticoes]
+     (padrão: "debug_*_structure.html", 5 repetições)
+"""
+import glob
+import sys
+import time
+
+from statusinvest_parser import parse_html
+
+def main(padrao: str, repeticoes: int) -> None:
+    arquivos = sorted(glob.glob(padrao))
+    if not arquivos:
+        print(f"Nenhum arquivo encontrado para {padrao!r}")
+        sys.exit(1)
+    paginas = []
+    for arquivo in arquivos:
+        with open(arquivo, "rb") as f:
+            paginas.append((arquivo, f.read()))
+
+    total = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for arquivo, html in paginas:
+            data = parse_html(html)
+            total += 1
+    decorrido = time.perf_counter() - inicio
+
+    for arquivo, html in paginas:
+        data = parse_html(html)
+        achados = sum(v is not None for v in data["indicadores"].values())
+        print(f"{arquivo}: {len(html) / 1024:.0f} KB, {achados}/{len(data['indicadores'])} indicadores, "
+              f"{len(data['dividendos']['historico_12m'])} proventos")
+    print(f"{total} páginas em {decorrido:.2f}s -> {decorrido / total * 1000:.1f} ms/página, "
+          f"{total / decorrido * 60:.0f} páginas/min (1 núcleo)")
+
+if __name__ == "__main__":
+    padrao = sys.argv[1] if len(sys.argv) > 1 else "debug_*_structure.html"
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    main(padrao, repeticoes)
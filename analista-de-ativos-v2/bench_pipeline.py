@@ -0,0 +1,89 @@
+"""
+Parse no loop x pipeline com parse em processos (statusinvest_pipeline).
+
+Simula o lote com a página salva pelo debug: cada "busca" espera `--latencia`
+segundos numa thread (como a rede) e devolve o HTML. Compara:
+
+  - loop:     busca em threads e parse no próprio event loop (o jeito ingênuo);
+  - pipeline: scrape_pipeline, parse num ProcessPoolExecutor.
+
+Mostra páginas/s, o maior atraso do event loop (quanto tempo um buscador fica
+sem ser atendido enquanto alguém parseia) e a vazão por etapa do pipeline.
+Com um núcleo só não há ganho de vazão no parse; o atraso do loop cai igual.
+
+Uso: python bench_pipeline.py [debug_bbas3_structure.html] [-n 40] [-c 8] [--latencia 0.2]
+"""
+import argparse
+import asyncio
+import time
+
+from statusinvest_pipeline import (EXTRATORES, PARSERS_PADRAO, EstatisticasPipeline,
+                                   formatar_resumo, scrape_pipeline)
+
+async def _medir_atraso(resultado: dict, intervalo: float = 0.005) -> None:
+    """Maior atraso do loop: quanto um sleep de `intervalo` passou do ponto."""
+    while True:
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        resultado["max"] = max(resultado["max"], time.perf_counter() - inicio - intervalo)
+
+def _baixador(html: bytes, latencia: float):
+    def baixar(ticker: str):
+        time.sleep(latencia)
+        return f"https://statusinvest.com.br/acoes/{ticker.lower()}", html
+    return baixar
+
+async def no_loop(tickers: list, concorrencia: int, extrator: str, baixar) -> int:
+    sem = asyncio.Semaphore(concorrencia)
+
+    async def _um(ticker: str):
+        async with sem:
+            url, html = await asyncio.to_thread(baixar, ticker)
+        return EXTRATORES[extrator](html, ticker, url)
+
+    return len(await asyncio.gather(*(_um(t) for t in tickers)))
+
+async def pipeline(tickers: list, concorrencia: int, extrator: str, baixar, parsers: int,
+                   stats: EstatisticasPipeline) -> int:
+    n = 0
+    async for data in scrape_pipeline(tickers, concorrencia, parsers, extrator=extrator,
+                                      baixar=baixar, estatisticas=stats):
+        n += "erro" not in data
+    return n
+
+async def rodar(modo: str, args, html: bytes) -> None:
+    tickers = [f"T{i:03d}" for i in range(args.n)]
+    baixar = _baixador(html, args.latencia)
+    atraso = {"max": 0.0}
+    monitor = asyncio.create_task(_medir_atraso(atraso))
+    stats = EstatisticasPipeline(args.concorrencia, args.parsers)
+    inicio = time.perf_counter()
+    if modo == "loop":
+        ok = await no_loop(tickers, args.concorrencia, args.extrator, baixar)
+    else:
+        ok = await pipeline(tickers, args.concorrencia, args.extrator, baixar, args.parsers, stats)
+    total = time.perf_counter() - inicio
+    monitor.cancel()
+    print(f"{modo:<9} {ok:>4} páginas em {total:6.2f}s  {ok / total:6.1f} pág/s  "
+          f"atraso máx. do loop {atraso['max'] * 1000:7.1f} ms")
+    if modo == "pipeline":
+        print(f"          {formatar_resumo(stats.resumo())}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse no loop x pipeline com processos")
+    parser.add_argument("html", nargs="?", default="debug_bbas3_structure.html")
+    parser.add_argument("-n", type=int, default=40, help="páginas")
+    parser.add_argument("-c", "--concorrencia", type=int, default=8, help="buscas simultâneas")
+    parser.add_argument("-p", "--parsers", type=int, default=PARSERS_PADRAO)
+    parser.add_argument("--latencia", type=float, default=0.2, help="segundos por busca simulada")
+    parser.add_argument("--extrator", choices=sorted(EXTRATORES), default="requests")
+    args = parser.parse_args()
+    with open(args.html, "rb") as f:
+        html = f.read()
+    print(f"{args.n} páginas de {len(html) / 1024:.0f} KB | busca {args.latencia * 1000:.0f} ms, "
+          f"concorrência {args.concorrencia} | {args.parsers} parser(s) | extrator {args.extrator}")
+    for modo in ("loop", "pipeline"):
+        asyncio.run(rodar(modo, args, html))
+
+if __name__ == "__main__":
+    main()
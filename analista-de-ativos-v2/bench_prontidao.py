@@ -0,0 +1,150 @@
+"""
+Benchmark da espera pelo carregamento: espera fixa (antiga) x prontidão por eventos.
+
+Um servidor HTTP local serve as páginas salvas (debug_*_structure.html) em
+/acoes/<ticker>, sem os <script> originais. Para imitar o Status Invest, a
+#indicators-section vai vazia e um script busca o conteúdo dela por XHR em
+/xhr/indicadores/<ticker>, que o servidor responde depois de `atraso` s.
+
+  - antiga: goto + wait_for_selector("P/L|DY|ROE") + wait_for_timeout(3000),
+    a espera que o scraper v2 usava;
+  - eventos: statusinvest_prontidao.carregar (MutationObserver + prazo).
+
+Para cada atraso mostra a mediana por ticker e quantos indicadores o extrator
+snapshot do v2 achou logo depois da espera (a espera fixa perde o XHR que
+chega depois dos 3 s).
+
+Uso: python bench_prontidao.py [-n 5] [--atrasos 0,0.5,1.5,4]
+"""
+import argparse
+import asyncio
+import glob
+import os
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import lxml.html
+from playwright.async_api import async_playwright
+
+import statusinvest_scrape_v2 as v2
+from statusinvest_prontidao import carregar
+
+SCRIPT_RE = re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL)
+
+XHR_JS = """<script>
+fetch('/xhr/indicadores/{ticker}').then(r => r.text()).then(h => {{
+  document.getElementById('indicators-section').innerHTML = h;
+}});
+</script>"""
+
+def preparar(arquivo: str, ticker: str) -> tuple:
+    """(página sem scripts e com #indicators-section vazia, fragmento servido por XHR)"""
+    with open(arquivo, encoding="utf-8") as f:
+        html = SCRIPT_RE.sub("", f.read())
+    doc = lxml.html.fromstring(html)
+    secao = doc.get_element_by_id("indicators-section")
+    fragmento = "".join(lxml.html.tostring(filho, encoding="unicode") for filho in secao)
+    for filho in list(secao):
+        secao.remove(filho)
+    secao.text = None
+    doc.find("body").append(lxml.html.fragment_fromstring(XHR_JS.format(ticker=ticker)))
+    return lxml.html.tostring(doc, encoding="unicode"), fragmento
+
+class Paginas:
+    def __init__(self, arquivos: dict):
+        self.paginas = {t: preparar(a, t) for t, a in arquivos.items()}
+        self.atraso = 0.0
+
+def servir(paginas: Paginas):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            partes = self.path.strip("/").split("/")
+            ticker = partes[-1]
+            if ticker not in paginas.paginas:
+                self.send_error(404)
+                return
+            pagina, fragmento = paginas.paginas[ticker]
+            if partes[0] == "xhr":
+                time.sleep(paginas.atraso)
+                corpo = fragmento
+            else:
+                corpo = pagina
+            dados = corpo.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+async def espera_antiga(page, url: str) -> None:
+    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+    try:
+        await page.wait_for_selector("text=/P\\/L|DY|ROE/i", timeout=30000)
+        await page.wait_for_timeout(3000)
+    except:
+        await page.wait_for_timeout(5000)
+
+async def espera_eventos(page, url: str) -> None:
+    await carregar(page, url)
+
+ESTRATEGIAS = [("antiga", espera_antiga), ("eventos", espera_eventos)]
+
+async def medir(page, url: str, esperar) -> tuple:
+    inicio = time.perf_counter()
+    await esperar(page, url)
+    ms = (time.perf_counter() - inicio) * 1000
+    indicadores = await v2.scrape_basic_indicators_snapshot(page)
+    return ms, sum(v is not None for v in indicadores.values())
+
+async def main(repeticoes: int, atrasos: list) -> None:
+    arquivos = {re.match(r"debug_(.+)_structure\.html", os.path.basename(a)).group(1): a
+                for a in sorted(glob.glob("debug_*_structure.html"))}
+    paginas = Paginas(arquivos)
+    servidor, base = servir(paginas)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        ctx = await browser.new_context()
+        # Só o servidor local: CSS, fontes e imagens externas são abortados
+        await ctx.route("**/*", lambda route: route.continue_() if route.request.url.startswith(base)
+                        else route.abort())
+        page = await ctx.new_page()
+
+        print(f"tickers: {', '.join(arquivos)} | {repeticoes} repetições por atraso")
+        print(f"{'atraso XHR':>10} {'antiga ms':>10} {'eventos ms':>11} {'redução':>8} {'campos antiga/eventos':>22}")
+        for atraso in atrasos:
+            paginas.atraso = atraso
+            linha = {}
+            for nome, esperar in ESTRATEGIAS:
+                tempos, campos = [], []
+                for _ in range(repeticoes):
+                    for ticker in arquivos:
+                        ms, n = await medir(page, f"{base}/acoes/{ticker}", esperar)
+                        tempos.append(ms)
+                        campos.append(n)
+                linha[nome] = (statistics.median(tempos), min(campos))
+            antiga, eventos = linha["antiga"], linha["eventos"]
+            reducao = 1 - eventos[0] / antiga[0]
+            print(f"{atraso:>9.1f}s {antiga[0]:>10.0f} {eventos[0]:>11.0f} {reducao:>8.0%} "
+                  f"{antiga[1]:>10}/{eventos[1]:<11}")
+
+        await browser.close()
+    servidor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Espera fixa x prontidão por eventos")
+    parser.add_argument("-n", type=int, default=5, help="repetições por ticker e atraso")
+    parser.add_argument("--atrasos", default="0,0.5,1.5,4", help="atrasos do XHR em segundos")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, [float(a) for a in args.atrasos.split(",")]))
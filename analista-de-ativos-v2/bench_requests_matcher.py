@@ -0,0 +1,115 @@
+"""
+Benchmark da busca de indicadores do caminho requests/bs4 sobre páginas salvas.
+
+Compara, por página, o tempo de CPU da busca antiga (text.lower().find por
+variante + get_text().lower() de novo para os dividendos) com o LabelMatcher
+(texto em minúsculas uma vez + uma única regex, sem acento, para todas as variantes).
+O parse do BeautifulSoup e o primeiro get_text ficam fora da medição: são iguais
+nos dois casos.
+
+A busca antiga fica congelada aqui (tabela de rótulos, janela e conversão de
+números de antes do registro de indicadores), e as duas são conferidas contra o
+parser offline (parse_html): a coluna "acertos" mostra quantos indicadores batem
+com ele, e o script sai com código 1 se o LabelMatcher divergir.
+
+Uso: python bench_requests_matcher.py [glob] [repeticoes]
+"""
+import glob
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from statusinvest_indicadores import LABEL_MATCHER, chave_canonica, lower_text
+from statusinvest_numeros import numero
+from statusinvest_parser import parse_html
+
+# Como era o caminho requests antes do registro (indicadores.json)
+LABELS_ANTIGOS = {
+    "P/L": ["P/L", "Preço/Lucro"],
+    "P/VP": ["P/VP", "Preço/Valor Patrimonial"],
+    "Dividend Yield": ["Dividend", "Dividend Yield", "Dividendo"],
+    "ROE": ["ROE"],
+    "ROIC": ["ROIC"],
+    "Margem Líquida": ["Margem Líquida"],
+    "Dív. Líq/EBITDA": ["Dívida Líquida / EBITDA", "DL/EBITDA"]
+}
+NUM_RE_ANTIGO = re.compile(r"-?\d{1,3}([.\s]\d{3})*(,\d+)?%?|-?\d+,\d+%?")
+
+def normalize_number_antigo(s):
+    if not s: return None
+    s = s.strip()
+    if s.endswith("%"): return s
+    s = s.replace(".", "").replace(" ", "").replace("\xa0","").replace(",", ".")
+    try:
+        return float(s)
+    except:
+        return None
+
+def busca_antiga(soup, text: str) -> dict:
+    indicadores = {}
+    for key, variants in LABELS_ANTIGOS.items():
+        val = None
+        for label in variants:
+            i = text.lower().find(label.lower())
+            if i != -1:
+                snippet = text[max(0, i-60): i+160]
+                m = NUM_RE_ANTIGO.search(snippet)
+                if m:
+                    val = m.group(0)
+                    break
+        indicadores[key] = normalize_number_antigo(val) if val else None
+    soup.get_text().lower()  # texto refeito para os regexes de dividendos
+    return indicadores
+
+def busca_indexada(soup, text: str) -> dict:
+    return LABEL_MATCHER.extract(text, lower_text(text))
+
+def cpu_ms(fn, soup, text: str, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        resultado = fn(soup, text)
+        tempos.append((time.process_time() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2], resultado
+
+def divergencias(indicadores: dict, referencia: dict) -> list:
+    """Chaves (do registro) em que o valor não bate com o do parser offline."""
+    valores = {chave_canonica(k) or k: numero(v)[0] for k, v in indicadores.items()}
+    return [k for k, v in referencia.items() if valores.get(k) != numero(v)[0]]
+
+def main(padrao: str, repeticoes: int) -> int:
+    arquivos = sorted(glob.glob(padrao))
+    if not arquivos:
+        print(f"Nenhum arquivo encontrado para {padrao!r}")
+        sys.exit(1)
+    total_antiga = total_nova = 0.0
+    regressoes = 0
+    for arquivo in arquivos:
+        with open(arquivo, encoding="utf-8") as f:
+            html = f.read()
+        soup = BeautifulSoup(html, "lxml")
+        text = soup.get_text(" ", strip=True)
+        referencia = parse_html(html)["indicadores"]
+        ms_antiga, antiga = cpu_ms(busca_antiga, soup, text, repeticoes)
+        ms_nova, nova = cpu_ms(busca_indexada, soup, text, repeticoes)
+        total_antiga += ms_antiga
+        total_nova += ms_nova
+        erros_antiga, erros_nova = divergencias(antiga, referencia), divergencias(nova, referencia)
+        regressoes += len(erros_nova)
+        n_ref = len(referencia)
+        print(f"{arquivo} ({len(text) / 1024:.0f} KB de texto): "
+              f"antiga {ms_antiga:.1f} ms, acertos {n_ref - len(erros_antiga)}/{n_ref} | "
+              f"indexada {ms_nova:.1f} ms, acertos {n_ref - len(erros_nova)}/{n_ref}"
+              + (f" | indexada diverge do parser em: {erros_nova}" if erros_nova else ""))
+    n = len(arquivos)
+    print(f"média por página: antiga {total_antiga / n:.1f} ms | indexada {total_nova / n:.1f} ms "
+          f"({total_antiga / max(total_nova, 1e-9):.1f}x)")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    padrao = sys.argv[1] if len(sys.argv) > 1 else "debug_*_structure.html"
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.exit(main(padrao, repeticoes))
@@ -0,0 +1,152 @@
+"""
+Suíte de benchmark dos scrapers sobre um corpus de visitas gravadas (HAR).
+
+Para cada HAR (debug_<ticker>.har, gravado pelo `make debug`; sem argumentos, os
+que estão ao lado do script) e cada scraper
+— v1 (scrape_statusinvest_acao), v2 (scrape_statusinvest_acao_v2) e
+requests (scrape_statusinvest_requests) — roda `-n` execuções, cada uma num
+subprocesso novo e em replay (statusinvest_har), sem rede. Mede:
+
+  - latência da chamada do scraper (mediana);
+  - CPU (usuário + sistema) do processo e dos filhos (driver e Chromium);
+  - pico de RSS (maior processo da árvore);
+  - acurácia por campo contra o esperado: debug_<ticker>_esperado.json, se
+    existir, senão o parser offline sobre o documento gravado no HAR.
+
+Uso: python bench_scrapers.py [-n 3] [--scrapers v1,v2,requests] [debug_bbas3.har ...]
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from statusinvest_har import documento
+from statusinvest_parser import parse_html
+
+SCRAPERS = ("v1", "v2", "requests")
+
+def _executar(scraper: str, ticker: str, har: str) -> dict:
+    """Roda um scraper uma vez (no subprocesso), em replay do HAR."""
+    os.environ["STATUSINVEST_HAR"] = har
+    if scraper == "requests":
+        from statusinvest_har import instalar_replay_requests
+        from statusinvest_requests import scrape_statusinvest_requests
+        instalar_replay_requests(hars=[har])
+        scrape = scrape_statusinvest_requests
+    elif scraper == "v1":
+        from statusinvest_scrape import scrape_statusinvest_acao
+        scrape = lambda t: asyncio.run(scrape_statusinvest_acao(t))
+    else:
+        from statusinvest_scrape_v2 import scrape_statusinvest_acao_v2
+        scrape = lambda t: asyncio.run(scrape_statusinvest_acao_v2(t))
+
+    antes = resource.getrusage(resource.RUSAGE_SELF)
+    inicio = time.perf_counter()
+    data = scrape(ticker)
+    latencia = time.perf_counter() - inicio
+    eu = resource.getrusage(resource.RUSAGE_SELF)
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "latencia_s": latencia,
+        "cpu_s": (eu.ru_utime - antes.ru_utime) + (eu.ru_stime - antes.ru_stime)
+                 + filhos.ru_utime + filhos.ru_stime,
+        "rss_mb": max(eu.ru_maxrss, filhos.ru_maxrss) / 1024,  # ru_maxrss em KB no Linux
+        "data": data,
+    }
+
+def _numero(v):
+    if isinstance(v, str):
+        try:
+            return round(float(v.replace("%", "").replace(".", "").replace(",", ".")), 2)
+        except ValueError:
+            return v
+    return round(v, 2) if isinstance(v, float) else v
+
+def _historico(h: list) -> set:
+    return {(x["data"], round(x["valor"], 4)) for x in h or []}
+
+def comparar_campos(obtido: dict, esperado: dict) -> tuple:
+    """(acertos, total, [campos errados]) sobre indicadores, DYs e o histórico de proventos."""
+    campos = []
+    for chave, valor in esperado["indicadores"].items():
+        campos.append((chave, _numero(obtido.get("indicadores", {}).get(chave)), _numero(valor)))
+    div_obtido, div_esperado = obtido.get("dividendos", {}), esperado["dividendos"]
+    for chave in ("dy_12m", "dy_medio_5a", "dy_medio_10a"):
+        campos.append((chave, _numero(div_obtido.get(chave)), _numero(div_esperado.get(chave))))
+    campos.append(("historico_12m", _historico(div_obtido.get("historico_12m")),
+                   _historico(div_esperado.get("historico_12m"))))
+    errados = [nome for nome, a, b in campos if a != b]
+    return len(campos) - len(errados), len(campos), errados
+
+def esperado(har: str, ticker: str) -> dict:
+    arquivo = har.replace(".har", "_esperado.json")
+    if os.path.exists(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+    html = documento(har)
+    if html is None:
+        raise SystemExit(f"{har}: nenhum documento HTML gravado")
+    return parse_html(html, ticker)
+
+def rodar(scraper: str, ticker: str, har: str) -> dict:
+    proc = subprocess.run([sys.executable, __file__, "--executar", scraper, ticker, har],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        # última linha de exceção do traceback (o Playwright imprime caixas depois dela)
+        linhas = proc.stderr.strip().splitlines() or ["?"]
+        erro = next((l for l in reversed(linhas) if re.match(r"[\w.]*(Error|Exception)\b", l)), linhas[-1])
+        return {"erro": erro}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(hars: list, scrapers: list, repeticoes: int) -> int:
+    hars = hars or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_*.har")))
+    if not hars:
+        print("Nenhum HAR (debug_<ticker>.har). Grave com: make debug TICKER=BBAS3")
+        return 1
+    corpus = [(re.match(r"(?:debug_)?(.+?)\.har$", os.path.basename(h)).group(1).upper(), h) for h in hars]
+    esperados = {ticker: esperado(har, ticker) for ticker, har in corpus}
+    print(f"corpus: {', '.join(t for t, _ in corpus)} | {repeticoes} execuções por ticker (subprocesso, replay)")
+    print(f"{'scraper':<9} {'latência p50':>13} {'CPU/ticker':>11} {'RSS pico':>9} {'acurácia':>9} {'erros':>6}")
+    for scraper in scrapers:
+        latencias, cpus, rss, acertos, total, erros, errados = [], [], [], 0, 0, 0, set()
+        for ticker, har in corpus:
+            for i in range(repeticoes):
+                r = rodar(scraper, ticker, har)
+                if "erro" in r:
+                    erros += 1
+                    ultimo_erro = r["erro"]
+                    continue
+                latencias.append(r["latencia_s"])
+                cpus.append(r["cpu_s"])
+                rss.append(r["rss_mb"])
+                if i == 0:
+                    a, t, e = comparar_campos(r["data"], esperados[ticker])
+                    acertos, total = acertos + a, total + t
+                    errados.update(f"{ticker}:{c}" for c in e)
+        if not latencias:
+            print(f"{scraper:<9} {'-':>13} {'-':>11} {'-':>9} {'-':>9} {erros:>6}  ({ultimo_erro[:80]})")
+            continue
+        print(f"{scraper:<9} {statistics.median(latencias) * 1000:>10.0f} ms {statistics.mean(cpus):>9.2f} s "
+              f"{max(rss):>6.0f} MB {acertos / total:>9.0%} {erros:>6}")
+        if errados:
+            print(f"          campos divergentes: {', '.join(sorted(errados))}")
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--executar":
+        r = _executar(*sys.argv[2:])
+        print(json.dumps(r, ensure_ascii=False))
+        sys.exit(0)
+    parser = argparse.ArgumentParser(description="Latência, CPU, RSS e acurácia dos scrapers em replay de HAR")
+    parser.add_argument("hars", nargs="*", help="padrão: debug_*.har")
+    parser.add_argument("-n", type=int, default=3, help="execuções por ticker")
+    parser.add_argument("--scrapers", default=",".join(SCRAPERS), help="ex.: v2,requests")
+    args = parser.parse_args()
+    sys.exit(main(args.hars, [s for s in args.scrapers.split(",") if s], args.n))
@@ -5,6 +5,28 @@ import signal
 import sys
 from playwright.async_api import async_playwright
 
+from statusinvest_bloqueio import estatisticas, formatar_resumo, instalar_filtro
+from statusinvest_har import opcoes_gravacao
+from statusinvest_parser import parse_html
+from statusinvest_prontidao import aguardar_prontidao
+
+async def gravar_xhr(response, gravacao: list) -> None:
+    """Guarda as respostas JSON de XHR/fetch (endpoints que preenchem a página)."""
+    request = response.request
+    if request.resource_type not in ("xhr", "fetch"):
+        return
+    try:
+        dados = await response.json()
+    except Exception:
+        return  # não é JSON (HTML parcial, imagem, corpo vazio)
+    gravacao.append({
+        "metodo": request.method,
+        "url": response.url,
+        "post_data": request.post_data,
+        "status": response.status,
+        "json": dados,
+    })
+
 class TimeoutError(Exception):
     pass
 
@@ -33,7 +55,19 @@ async def debug_statusinvest_structure(ticker: str, max_timeout: int = 120):
                 headless=False,  # Mostra o browser
                 slow_mo=500      # Execução mais rápida
             )
-            page = await browser.new_page()
+            # Toda a visita vai para um HAR (replay offline: statusinvest_har)
+            har_filename = f"debug_{ticker.lower()}.har"
+            ctx = await browser.new_context(**opcoes_gravacao(har_filename))
+            page = await ctx.new_page()
+            # Mesmo bloqueio de recursos dos scrapers (STATUSINVEST_BLOQUEIO=desligado para ver tudo)
+            await instalar_filtro(ctx)
+            # Captura das chamadas XHR (base do statusinvest_api)
+            gravacao, pendentes = [], set()
+            def _resposta(response):
+                tarefa = asyncio.ensure_future(gravar_xhr(response, gravacao))
+                pendentes.add(tarefa)
+                tarefa.add_done_callback(pendentes.discard)
+            page.on("response", _resposta)
             
             print("📥 Carregando página...")
             try:
@@ -50,8 +84,12 @@ async def debug_statusinvest_structure(ticker: str, max_timeout: int = 120):
                     print(f"❌ Falha total no carregamento: {e2}")
                     return
             
-            print("⏳ Aguardando carregamento AJAX...")
-            await page.wait_for_timeout(3000)  # Reduzido de 5000
+            print("⏳ Aguardando os cards de indicadores (AJAX)...")
+            prontidao = await aguardar_prontidao(page, prazo_ms=15000)
+            if prontidao["pronto"]:
+                print(f"✅ Indicadores prontos em {prontidao['ms']} ms")
+            else:
+                print(f"⚠️ Seguindo sem: {', '.join(prontidao['faltando'])}")
             
             print(f"🔍 Analisando estrutura de: {url}")
             print("=" * 60)
@@ -136,6 +174,27 @@ async def debug_statusinvest_structure(ticker: str, max_timeout: int = 120):
                 print(f"📊 Tamanho do arquivo: {len(html_content)} caracteres")
             except Exception as e:
                 print(f"❌ Erro ao salvar HTML: {e}")
+
+            # 5.0 Endpoints XHR chamados pela página
+            print(f"\n🛰️ ENDPOINTS XHR (JSON):")
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
+            for entrada in gravacao:
+                print(f"{entrada['metodo']:4} {entrada['status']} {entrada['url'][:110]}")
+            xhr_filename = f"debug_{ticker.lower()}_xhr.json"
+            try:
+                with open(xhr_filename, "w", encoding="utf-8") as f:
+                    json.dump(gravacao, f, ensure_ascii=False, indent=1)
+                print(f"✅ {len(gravacao)} respostas gravadas em: {xhr_filename}")
+            except Exception as e:
+                print(f"❌ Erro ao gravar XHR: {e}")
+            
+            # 5.1 Mesmo HTML passado pelo parser offline (o que os scrapers devem extrair)
+            print(f"\n🧩 RESULTADO DO PARSER OFFLINE:")
+            try:
+                print(json.dumps(parse_html(html_content, ticker), ensure_ascii=False, indent=2))
+            except Exception as e:
+                print(f"❌ Erro no parser: {e}")
             
             # 6. Capturar screenshot (sempre tenta)
             print(f"\n📸 Capturando screenshot...")
@@ -146,17 +205,18 @@ async def debug_statusinvest_structure(ticker: str, max_timeout: int = 120):
             except Exception as e:
                 print(f"❌ Erro ao capturar screenshot: {e}")
             
-            # 7. Aguardar apenas 3 segundos antes de fechar
-            print(f"\n⏱️ Aguardando 3 segundos antes de fechar...")
-            await page.wait_for_timeout(3000)
+            print(f"\n🌐 Rede: {formatar_resumo(await estatisticas(page).resumo())}")
             
             print("🔄 Fechando browser...")
+            await ctx.close()  # grava o HAR
             await browser.close()
             
             print("\n✅ DEBUG CONCLUÍDO!")
             print(f"📁 Arquivos gerados:")
             print(f"   - {filename}")
             print(f"   - {screenshot_filename}")
+            print(f"   - {xhr_filename}")
+            print(f"   - {har_filename}")
             print("=" * 60)
             
     except TimeoutError:
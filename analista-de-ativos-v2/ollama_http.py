@@ -0,0 +1,90 @@
+"""
+Cliente HTTP do Ollama (/api/generate e /api/chat) com sessão keep-alive.
+
+Substitui `ollama run` via subprocess: sem custo de subir o CLI a cada análise,
+sem códigos ANSI na saída, e com as métricas que o servidor devolve
+(eval_count, eval_duration, load_duration...). `keep_alive` mantém o modelo
+carregado entre um ticker e outro; `formato="json"` pede saída estruturada.
+
+Uso rápido: python ollama_http.py [MODELO] [PROMPT]   (respeita OLLAMA_BASE_URL)
+"""
+import json
+import os
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import CLIENTE_HTTP, ClienteHTTP
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_TIMEOUT = (5, float(os.environ.get("OLLAMA_TIMEOUT", 600)))  # (conexão, leitura)
+
+METRICAS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration",
+            "eval_count", "eval_duration")
+
+def extrair_metricas(data: dict) -> dict:
+    """Métricas do Ollama (durações em ns) + tokens/s calculado."""
+    metricas = {k: data[k] for k in METRICAS if k in data}
+    if metricas.get("eval_count") and metricas.get("eval_duration"):
+        metricas["tokens_por_s"] = round(metricas["eval_count"] / (metricas["eval_duration"] / 1e9), 2)
+    return metricas
+
+class OllamaHTTP:
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 timeout=OLLAMA_TIMEOUT, cliente: ClienteHTTP = CLIENTE_HTTP):
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        # Session keep-alive por host, com retries e limite por host (comum/http_cliente.py)
+        self.cliente = cliente
+
+    def _post(self, path: str, payload: dict) -> dict:
+        r = self.cliente.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        if r.status_code != 200:
+            try:
+                erro = r.json().get("error", r.text)
+            except ValueError:
+                erro = r.text
+            raise RuntimeError(f"Ollama {path} respondeu {r.status_code}: {erro}")
+        return r.json()
+
+    def _payload(self, model: str, formato: Optional[str], options: Optional[dict]) -> dict:
+        payload = {"model": model, "stream": False, "keep_alive": self.keep_alive}
+        if formato:
+            payload["format"] = formato
+        if options:
+            payload["options"] = options
+        return payload
+
+    def generate(self, model: str, prompt: str, formato: Optional[str] = None,
+                 options: Optional[dict] = None, system: Optional[str] = None) -> dict:
+        """POST /api/generate. Retorna {"resposta": str, "metricas": dict}."""
+        payload = self._payload(model, formato, options)
+        payload["prompt"] = prompt
+        if system:
+            payload["system"] = system
+        data = self._post("/api/generate", payload)
+        return {"resposta": data.get("response", ""), "metricas": extrair_metricas(data)}
+
+    def chat(self, model: str, messages: List[dict], formato: Optional[str] = None,
+             options: Optional[dict] = None) -> dict:
+        """POST /api/chat. Retorna {"resposta": str, "metricas": dict}."""
+        payload = self._payload(model, formato, options)
+        payload["messages"] = messages
+        data = self._post("/api/chat", payload)
+        return {"resposta": (data.get("message") or {}).get("content", ""), "metricas": extrair_metricas(data)}
+
+_padrao = None
+
+def cliente_padrao() -> OllamaHTTP:
+    """Cliente compartilhado pelo processo (mesma sessão para todos os tickers)."""
+    global _padrao
+    if _padrao is None:
+        _padrao = OllamaHTTP()
+    return _padrao
+
+if __name__ == "__main__":
+    model = sys.argv[1] if len(sys.argv) > 1 else "gemma3:1b"
+    prompt = sys.argv[2] if len(sys.argv) > 2 else "Responda apenas: ok"
+    print(json.dumps(cliente_padrao().generate(model, prompt), ensure_ascii=False, indent=2))
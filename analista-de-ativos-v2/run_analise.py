@@ -1,39 +1,120 @@
+import argparse
 import asyncio
 import json
+import os
 import subprocess
 import sys
 
+import statusinvest_requests
+import statusinvest_scrape
+from statusinvest_cache import CACHE_TTL, ScrapeCache
 from statusinvest_scrape import scrape_statusinvest_acao
 from statusinvest_requests import scrape_statusinvest_requests
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from llm_cache import LLM_CACHE_DIR, LLM_CACHE_MODE, LLMCache, ollama_model_digest
+from ollama_http import OLLAMA_BASE_URL, OllamaHTTP, cliente_padrao
+
 DEFAULT_MODEL = "analista-fundamentalista-gemma"
+LLM_CACHE_PATH = LLM_CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm")
+
+OLLAMA_BACKEND = os.environ.get("OLLAMA_BACKEND", "http")  # "http" ou "cli"
 
-def run_ollama(model: str, payload: dict) -> str:
+def build_prompt(payload: dict, formato: str = None) -> str:
     prompt = (
         "Analise o ativo abaixo e classifique a qualidade (Alta|Neutra|Baixa).\n"
         "Dados:\n"
         + json.dumps(payload, ensure_ascii=False, indent=2)
     )
+    if formato == "json":
+        prompt += '\n\nResponda em JSON: {"qualidade": "Alta|Neutra|Baixa", "justificativa": "..."}'
+    return prompt
+
+def _gerar_cli(model: str, prompt: str) -> dict:
     proc = subprocess.run(
         ["ollama", "run", model],
         input=prompt, text=True, capture_output=True
     )
     if proc.returncode != 0:
         raise RuntimeError(proc.stderr)
-    return proc.stdout
+    return {"resposta": proc.stdout, "metricas": {}}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python run_analise.py <TICKER> [MODEL]")
-        sys.exit(1)
-    ticker = sys.argv[1]
-    model = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL
+def run_ollama(model: str, payload: dict, cache: LLMCache = None, backend: str = OLLAMA_BACKEND,
+               cliente: OllamaHTTP = None, formato: str = None) -> dict:
+    """Roda a análise no modelo. Retorna {"resposta": str, "metricas": dict}.
+    `backend`: "http" (API do Ollama, sessão keep-alive) ou "cli" (`ollama run`)."""
+    prompt = build_prompt(payload, formato)
+
+    def _gerar():
+        if backend == "cli":
+            return _gerar_cli(model, prompt)
+        return (cliente or cliente_padrao()).generate(model, prompt, formato=formato)
+
+    if cache is None:
+        return _gerar()
+    # Sem temperatura explícita valem as opções do Modelfile: o cache só entra
+    # com --cache-llm (modo "sempre"). O cache guarda só o texto da resposta.
+    hits = cache.hits
+    opcoes = {"format": formato} if formato else {}
+    gerado = {}
+    resposta = cache.obter_ou_gerar(
+        lambda: ollama_model_digest(OLLAMA_BASE_URL, model), prompt, opcoes,
+        lambda: gerado.setdefault("r", _gerar())["resposta"],
+    )
+    if cache.hits > hits:
+        return {"resposta": resposta, "metricas": {"cache": True}}
+    return gerado["r"]
+
+def scrape_ticker(ticker: str, cache: ScrapeCache = None, refresh: bool = False) -> dict:
+    """Playwright com fallback para requests/bs4, passando pelo cache em disco quando houver.
+    Uma entrada válida de qualquer um dos dois é usada antes de fazer scraping."""
+    def _playwright():
+        return asyncio.run(scrape_statusinvest_acao(ticker))
+
+    def _requests():
+        return scrape_statusinvest_requests(ticker)
+
+    if cache is not None and not refresh:
+        # Olha as duas entradas antes de abrir browser: um "requests" válido serve
+        # quando o "playwright" não está no TTL (fresco ganha de vencido, Playwright de requests).
+        pw = cache.estado(ticker, "playwright", statusinvest_scrape.SCRAPER_VERSION)
+        rq = cache.estado(ticker, "requests", statusinvest_requests.SCRAPER_VERSION)
+        if (pw != "fresco" and rq == "fresco") or (pw is None and rq == "vencido"):
+            return cache.fetch(ticker, "requests", statusinvest_requests.SCRAPER_VERSION, _requests)
 
     try:
-        data = asyncio.run(scrape_statusinvest_acao(ticker))
+        if cache is None:
+            return _playwright()
+        return cache.fetch(ticker, "playwright", statusinvest_scrape.SCRAPER_VERSION, _playwright, refresh)
     except Exception as e:
         print(f"[fallback] Playwright falhou: {e}\nUsando requests/bs4…")
-        data = scrape_statusinvest_requests(ticker)
+        if cache is None:
+            return _requests()
+        return cache.fetch(ticker, "requests", statusinvest_requests.SCRAPER_VERSION, _requests, refresh)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(usage="python run_analise.py <TICKER> [MODEL] [--refresh] [--ttl SEGUNDOS] [--backend http|cli] [--json]")
+    parser.add_argument("ticker")
+    parser.add_argument("model", nargs="?", default=DEFAULT_MODEL)
+    parser.add_argument("--refresh", action="store_true", help="ignora o cache e faz um scraping novo")
+    parser.add_argument("--ttl", type=int, default=CACHE_TTL, help=f"validade do cache em segundos (padrão {CACHE_TTL})")
+    parser.add_argument("--sem-cache", action="store_true", help="não lê nem grava o cache em disco")
+    parser.add_argument("--cache-llm", action="store_true",
+                        help="reusa a resposta do modelo para o mesmo prompt mesmo com temperatura > 0")
+    parser.add_argument("--backend", choices=["http", "cli"], default=OLLAMA_BACKEND,
+                        help=f"como chamar o Ollama (padrão {OLLAMA_BACKEND}, env OLLAMA_BACKEND)")
+    parser.add_argument("--json", action="store_true", help="pede a resposta do modelo em JSON (format: json)")
+    args = parser.parse_args()
+
+    cache = None if args.sem_cache else ScrapeCache(ttl=args.ttl)
+    llm_cache = None
+    if not args.sem_cache:
+        llm_cache = LLMCache(diretorio=LLM_CACHE_PATH, modo="sempre" if args.cache_llm else LLM_CACHE_MODE)
+    data = scrape_ticker(args.ticker, cache, refresh=args.refresh)
     print(json.dumps(data, ensure_ascii=False, indent=2))
     print("\n================= RESPOSTA DO MODELO =================\n")
-    print(run_ollama(model, data))
+    resultado = run_ollama(args.model, data, llm_cache, backend=args.backend,
+                           formato="json" if args.json else None)
+    print(resultado["resposta"])
+    if resultado["metricas"]:
+        print("\n[métricas]", json.dumps(resultado["metricas"], ensure_ascii=False), file=sys.stderr)
@@ -0,0 +1,118 @@
+"""
+Análise em lote que só chama o modelo para os tickers cujos fundamentos mudaram.
+
+Para cada ticker: scraping (com o cache de scraping de sempre), comparação com a
+linha de base da última análise (statusinvest_mudancas) e então:
+  - mudou algum campo material além da tolerância -> roda o modelo e a linha de base anda;
+  - não mudou -> reusa a análise guardada, sem chamar o Ollama.
+
+Com --etag faz antes um GET condicional da página (If-None-Match/If-Modified-Since):
+num 304 nem o scraping roda. Sem validadores na resposta, segue pela comparação.
+
+Sai uma linha JSON por ticker; o resumo (analisados x reusados, tempo de modelo
+poupado) vai para o stderr.
+
+Uso: python run_lote.py BBAS3 ITUB4 [-f tickers.txt] [--modelo M] [--tolerancia 0.01] [--etag] [--forcar]
+"""
+import argparse
+import json
+import sys
+import time
+
+from run_analise import DEFAULT_MODEL, LLM_CACHE_PATH, OLLAMA_BACKEND, LLMCache, run_ollama, scrape_ticker
+from statusinvest_cache import CACHE_TTL, ScrapeCache
+from statusinvest_mudancas import MUDANCAS_PATH, TOLERANCIA, DetectorMudancas, validadores_http
+
+def _url(ticker: str) -> str:
+    return f"https://statusinvest.com.br/acoes/{ticker.lower()}"
+
+def _ler_tickers(args) -> list:
+    tickers = list(args.tickers)
+    if args.arquivo:
+        with open(args.arquivo, encoding="utf-8") as f:
+            tickers += [linha.strip() for linha in f if linha.strip() and not linha.startswith("#")]
+    return [t.upper() for t in tickers]
+
+def analisar_ticker(ticker: str, detector: DetectorMudancas, modelo: str, args, cache=None, llm_cache=None) -> dict:
+    chave_modelo = f"{modelo}|{'json' if args.json else 'texto'}"
+    base = detector.linha_de_base(ticker)
+    etag = last_modified = None
+
+    if args.etag and base is not None and base["modelo"] == chave_modelo and not args.forcar:
+        try:
+            mudou, etag, last_modified = validadores_http(_url(ticker), base["etag"], base["last_modified"])
+        except Exception as e:
+            print(f"[lote] {ticker}: GET condicional falhou ({e}), seguindo pelo scraping", file=sys.stderr)
+            mudou = None
+        if mudou is False:
+            detector.registrar_verificacao(ticker, etag, last_modified)
+            return {"ticker": ticker, "analisado": False, "motivo": "304", "campos": [],
+                    "resposta": base["analise"], "poupado_s": base["duracao_s"] or 0}
+    elif args.etag:
+        try:
+            _, etag, last_modified = validadores_http(_url(ticker))
+        except Exception:
+            pass
+
+    data = scrape_ticker(ticker, cache, refresh=args.refresh)
+    precisa, campos, base = detector.comparar(ticker, data, chave_modelo)
+    if not precisa and not args.forcar:
+        detector.registrar_verificacao(ticker, etag, last_modified)
+        return {"ticker": ticker, "analisado": False, "motivo": "sem mudança", "campos": [],
+                "resposta": base["analise"], "poupado_s": base["duracao_s"] or 0}
+
+    inicio = time.perf_counter()
+    resultado = run_ollama(modelo, data, llm_cache, backend=args.backend, formato="json" if args.json else None)
+    duracao = time.perf_counter() - inicio
+    detector.registrar_analise(ticker, data, chave_modelo, resultado["resposta"], duracao, etag, last_modified)
+    return {"ticker": ticker, "analisado": True, "motivo": "forçado" if args.forcar and not precisa else "mudou",
+            "campos": campos, "resposta": resultado["resposta"], "modelo_s": round(duracao, 3)}
+
+def main(args) -> int:
+    tickers = _ler_tickers(args)
+    detector = DetectorMudancas(args.mudancas, tolerancia=args.tolerancia)
+    cache = None if args.sem_cache else ScrapeCache(ttl=args.ttl)
+    llm_cache = None if args.sem_cache else LLMCache(diretorio=LLM_CACHE_PATH)
+    analisados = reusados = erros = 0
+    modelo_s = poupado_s = 0.0
+    inicio = time.perf_counter()
+    for ticker in tickers:
+        try:
+            r = analisar_ticker(ticker, detector, args.modelo, args, cache, llm_cache)
+        except Exception as e:
+            erros += 1
+            print(json.dumps({"ticker": ticker, "erro": str(e)}, ensure_ascii=False), flush=True)
+            continue
+        if r["analisado"]:
+            analisados += 1
+            modelo_s += r["modelo_s"]
+        else:
+            reusados += 1
+            poupado_s += r["poupado_s"]
+        print(json.dumps(r, ensure_ascii=False), flush=True)
+    print(
+        f"[lote] {len(tickers)} tickers em {time.perf_counter() - inicio:.2f}s | {analisados} analisados "
+        f"({modelo_s:.1f}s de modelo), {reusados} reusados (~{poupado_s:.1f}s de modelo poupados), {erros} erros",
+        file=sys.stderr,
+    )
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise em lote: o modelo só roda para tickers que mudaram")
+    parser.add_argument("tickers", nargs="*", help="ex.: BBAS3 ITUB4 PETR4")
+    parser.add_argument("-f", "--arquivo", help="arquivo com um ticker por linha")
+    parser.add_argument("--modelo", default=DEFAULT_MODEL)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help=f"variação relativa ignorada por campo (padrão {TOLERANCIA}, env STATUSINVEST_TOLERANCIA)")
+    parser.add_argument("--etag", action="store_true", help="GET condicional antes do scraping (pula no 304)")
+    parser.add_argument("--forcar", action="store_true", help="roda o modelo em todos e atualiza as linhas de base")
+    parser.add_argument("--mudancas", default=MUDANCAS_PATH, help="SQLite das linhas de base")
+    parser.add_argument("--refresh", action="store_true", help="ignora o cache de scraping")
+    parser.add_argument("--ttl", type=int, default=CACHE_TTL, help=f"validade do cache de scraping (padrão {CACHE_TTL})")
+    parser.add_argument("--sem-cache", action="store_true", help="não usa os caches em disco (scraping e LLM)")
+    parser.add_argument("--backend", choices=["http", "cli"], default=OLLAMA_BACKEND)
+    parser.add_argument("--json", action="store_true", help="pede a resposta do modelo em JSON (format: json)")
+    args = parser.parse_args()
+    if not args.tickers and not args.arquivo:
+        parser.error("informe tickers ou --arquivo")
+    sys.exit(main(args))
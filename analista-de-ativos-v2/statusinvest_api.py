@@ -0,0 +1,195 @@
+"""
+Busca direta dos endpoints JSON (XHR) que a página do Status Invest usa para
+preencher indicadores e proventos — sem browser e sem HTML.
+
+  - proventos:   GET  /acao/companytickerprovents?ticker=BBAS3&chartProventsType=2
+  - indicadores: POST /acao/indicatorhistoricallist (codes[]=bbas3, time=10 anos)
+
+Os endpoints foram levantados com a captura de rede do debug
+(`debug_statusinvest.py` grava as respostas XHR em debug_<ticker>_xhr.json).
+As chamadas passam pelo cliente HTTP comum (sessão por host, retries, limite
+de conexões). O resultado tem a mesma estrutura dos scrapers
+({ticker, url, titulo, setor, indicadores, dividendos}); título e setor não
+vêm nesses endpoints (titulo = ticker, setor = None), nem o Payout.
+
+Uma gravação do debug também pode ser parseada offline (`scrape_gravacao`),
+que é como a extração é conferida contra o HTML salvo (verifica_api.py).
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from statusinvest_indicadores import CHAVES, POR_API
+from statusinvest_requests import HEADERS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import CLIENTE_HTTP
+
+# Mude a versão quando a extração mudar: invalida o cache em disco (statusinvest_cache)
+SCRAPER_VERSION = "1"
+
+BASE_URL = "https://statusinvest.com.br"
+
+ENDPOINTS = {
+    "proventos": {
+        "metodo": "GET",
+        "caminho": "/acao/companytickerprovents",
+        "params": {"ticker": "{TICKER}", "chartProventsType": "2"},
+    },
+    "indicadores": {
+        "metodo": "POST",
+        "caminho": "/acao/indicatorhistoricallist",
+        "dados": {"codes[]": "{ticker}", "time": "10", "byQuarter": "false", "futureData": "false"},
+    },
+}
+
+# Chave do indicatorhistoricallist -> indicador do registro (campo "api" em indicadores.json)
+INDICADORES_API = POR_API
+
+# Mesmas chaves (e ordem) dos scrapers
+CHAVES_INDICADORES = CHAVES
+
+def _preencher(modelo: dict, ticker: str) -> dict:
+    return {k: v.format(TICKER=ticker.upper(), ticker=ticker.lower()) for k, v in modelo.items()}
+
+def buscar(nome: str, ticker: str, cliente=CLIENTE_HTTP):
+    """Chama um endpoint de ENDPOINTS para o ticker e devolve o JSON."""
+    ep = ENDPOINTS[nome]
+    headers = dict(HEADERS, **{
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": f"{BASE_URL}/acoes/{ticker.lower()}",
+    })
+    r = cliente.request(ep["metodo"], BASE_URL + ep["caminho"], headers=headers, timeout=(5, 30),
+                        params=_preencher(ep.get("params", {}), ticker),
+                        data=_preencher(ep.get("dados", {}), ticker) or None)
+    r.raise_for_status()
+    return r.json()
+
+def _numero(v) -> Optional[float]:
+    try:
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _serie(dados: dict, ticker: str) -> List[dict]:
+    series = (dados or {}).get("data") or {}
+    return series.get(ticker.lower()) or series.get(ticker.upper()) or next(iter(series.values()), [])
+
+def parse_indicadores_api(dados: dict, ticker: str) -> Dict[str, Optional[float]]:
+    """JSON do indicatorhistoricallist -> {"P/L": 6.71, "ROE": "10,31%", ...}."""
+    indicadores = dict.fromkeys(CHAVES_INDICADORES)
+    for item in _serie(dados, ticker):
+        indicador = INDICADORES_API.get(item.get("key"))
+        valor = _numero(item.get("actual"))
+        if indicador and valor is not None:
+            valor = indicador.valor(valor)
+            indicadores[indicador.chave] = round(valor, 2) if isinstance(valor, float) else valor
+    return indicadores
+
+def _dy_medio(dy: dict, anos: int) -> Optional[float]:
+    """Média do DY dos últimos `anos` anos fechados (ranks do indicatorhistoricallist)."""
+    atual = datetime.now().year
+    valores = sorted(((r.get("rank"), _numero(r.get("value"))) for r in dy.get("ranks") or []
+                      if isinstance(r.get("rank"), int) and r.get("rank") < atual), reverse=True)
+    valores = [v for _, v in valores[:anos] if v is not None]
+    if len(valores) < anos:
+        return None
+    return round(sum(valores) / anos, 2)
+
+def parse_data(texto: str) -> datetime:
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y")
+    except (TypeError, ValueError):
+        return datetime.min
+
+def parse_proventos_api(dados: dict, limite: int = 12) -> List[dict]:
+    """JSON do companytickerprovents -> historico_12m ({data de pagamento, valor}), mais recentes primeiro."""
+    historico = []
+    for p in (dados or {}).get("assetEarningsModels") or []:
+        # Como na tabela da página: provento sem data de pagamento ("-") fica de fora
+        valor = _numero(p.get("v"))
+        if valor is not None and parse_data(p.get("pd")) != datetime.min:
+            historico.append({"data": p["pd"], "valor": valor})
+    historico.sort(key=lambda h: parse_data(h["data"]), reverse=True)
+    return historico[:limite]
+
+def parse_dividendos_api(indicadores: dict, proventos: dict, ticker: str) -> dict:
+    dy = next((i for i in _serie(indicadores, ticker) if i.get("key") == "dy"), {})
+    return {
+        "dy_12m": _numero(dy.get("actual")),
+        "dy_medio_5a": _dy_medio(dy, 5),
+        "dy_medio_10a": _dy_medio(dy, 10),
+        "historico_12m": parse_proventos_api(proventos),
+    }
+
+def montar(ticker: str, indicadores: dict, proventos: dict) -> dict:
+    """Respostas dos dois endpoints -> estrutura dos scrapers."""
+    ticker = ticker.upper().strip()
+    return {
+        "ticker": ticker,
+        "url": f"{BASE_URL}/acoes/{ticker.lower()}",
+        "titulo": ticker,
+        "setor": None,
+        "indicadores": parse_indicadores_api(indicadores, ticker),
+        "dividendos": parse_dividendos_api(indicadores, proventos, ticker),
+    }
+
+def scrape_statusinvest_api(ticker: str, cliente=CLIENTE_HTTP) -> dict:
+    """Dois requests JSON por ticker, sem browser."""
+    return montar(ticker, buscar("indicadores", ticker, cliente), buscar("proventos", ticker, cliente))
+
+def scrape_many_api(tickers: Iterable[str], concorrencia: int = 4, cliente=CLIENTE_HTTP) -> Iterator[dict]:
+    """Vários tickers em threads (o cliente limita as conexões por host); devolve conforme terminam."""
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    with ThreadPoolExecutor(max(1, concorrencia)) as ex:
+        futuros = {ex.submit(scrape_statusinvest_api, t, cliente): t for t in tickers}
+        for fut in as_completed(futuros):
+            try:
+                yield fut.result()
+            except Exception as e:
+                yield {"ticker": futuros[fut], "erro": str(e)}
+
+# --- gravações do debug (debug_<ticker>_xhr.json) ---
+
+def _e_do_ticker(entrada: dict, ticker: str) -> bool:
+    partes = urlsplit(entrada.get("url", ""))
+    valores = [v for vs in parse_qs(partes.query).values() for v in vs]
+    valores += [v for vs in parse_qs(entrada.get("post_data") or "").values() for v in vs]
+    return ticker.lower() in (v.lower() for v in valores)
+
+def resposta_gravada(gravacao: List[dict], nome: str, ticker: str):
+    """JSON gravado do endpoint `nome` para o ticker (ou None)."""
+    caminho = ENDPOINTS[nome]["caminho"].lower()
+    for entrada in gravacao:
+        if urlsplit(entrada.get("url", "")).path.lower() == caminho and _e_do_ticker(entrada, ticker):
+            return entrada.get("json")
+    return None
+
+def scrape_gravacao(gravacao: List[dict], ticker: str) -> dict:
+    """Mesma extração de scrape_statusinvest_api sobre respostas gravadas pelo debug."""
+    return montar(ticker, resposta_gravada(gravacao, "indicadores", ticker) or {},
+                  resposta_gravada(gravacao, "proventos", ticker) or {})
+
+def ler_gravacao(arquivo: str) -> List[dict]:
+    with open(arquivo, encoding="utf-8") as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Status Invest pelos endpoints JSON (sem browser)")
+    parser.add_argument("tickers", nargs="+", help="ex.: BBAS3 ITUB4")
+    parser.add_argument("--gravacao", help="usa as respostas gravadas pelo debug (debug_<ticker>_xhr.json)")
+    parser.add_argument("-c", "--concorrencia", type=int, default=4)
+    args = parser.parse_args()
+    if args.gravacao:
+        gravacao = ler_gravacao(args.gravacao)
+        resultados = (scrape_gravacao(gravacao, t) for t in args.tickers)
+    else:
+        resultados = scrape_many_api(args.tickers, args.concorrencia)
+    for data in resultados:
+        print(json.dumps(data, ensure_ascii=False, indent=2))
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import AsyncIterator, Iterable, List
+
+from playwright.async_api import async_playwright
+
+import statusinvest_pipeline
+import statusinvest_scrape
+import statusinvest_scrape_v2
+from statusinvest_api import scrape_statusinvest_api
+from statusinvest_bloqueio import estatisticas, formatar_resumo
+from statusinvest_parquet import ExportadorParquet
+
+# Cada versão expõe launch_browser / new_context / scrape_page
+SCRAPERS = {
+    "v1": statusinvest_scrape,
+    "v2": statusinvest_scrape_v2,
+}
+
+# Caminho antigo: um browser novo por ticker (usado para comparação)
+SCRAPERS_ISOLADOS = {
+    "v1": statusinvest_scrape.scrape_statusinvest_acao,
+    "v2": statusinvest_scrape_v2.scrape_statusinvest_acao_v2,
+}
+
+async def scrape_many(tickers: Iterable[str], concurrency: int = 4, versao: str = "v1") -> AsyncIterator[dict]:
+    """
+    Faz o scraping de vários tickers com um único Chromium.
+
+    Mantém um pool de `concurrency` páginas (cada uma no seu contexto),
+    distribui os tickers com um semáforo e devolve os resultados conforme
+    terminam, cada um com o tempo gasto em `tempo_s`, os contadores de rede
+    da página em `rede` (statusinvest_bloqueio) e `erro` se falhou.
+    """
+    mod = SCRAPERS[versao]
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    if not tickers:
+        return
+    concurrency = max(1, min(concurrency, len(tickers)))
+
+    async with async_playwright() as p:
+        browser = await mod.launch_browser(p)
+        tasks = []
+        try:
+            pool = asyncio.Queue()
+            for _ in range(concurrency):
+                ctx = await mod.new_context(browser)
+                await pool.put(await ctx.new_page())
+            sem = asyncio.Semaphore(concurrency)
+
+            async def _um_ticker(ticker: str) -> dict:
+                async with sem:
+                    page = await pool.get()
+                    estatisticas(page).zerar()
+                    inicio = time.perf_counter()
+                    try:
+                        data = await mod.scrape_page(page, ticker)
+                        data["rede"] = await estatisticas(page).resumo()
+                    except Exception as e:
+                        data = {"ticker": ticker, "erro": str(e)}
+                        # A página pode ter ficado em estado ruim: troca por uma nova
+                        ctx = page.context
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+                        page = await ctx.new_page()
+                    finally:
+                        await pool.put(page)
+                    data["tempo_s"] = round(time.perf_counter() - inicio, 3)
+                    return data
+
+            tasks = [asyncio.create_task(_um_ticker(t)) for t in tickers]
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
+            # Espera as tarefas canceladas saírem antes de fechar o browser debaixo delas
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await browser.close()
+
+async def scrape_many_isolado(tickers: Iterable[str], concurrency: int = 4, versao: str = "v1") -> AsyncIterator[dict]:
+    """Mesmo contrato de `scrape_many`, mas abrindo um browser por ticker (caminho antigo)."""
+    scrape = SCRAPERS_ISOLADOS[versao]
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _um_ticker(ticker: str) -> dict:
+        async with sem:
+            inicio = time.perf_counter()
+            try:
+                data = await scrape(ticker)
+            except Exception as e:
+                data = {"ticker": ticker, "erro": str(e)}
+            data["tempo_s"] = round(time.perf_counter() - inicio, 3)
+            return data
+
+    tasks = [asyncio.create_task(_um_ticker(t)) for t in tickers]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def scrape_many_api(tickers: Iterable[str], concurrency: int = 4, versao: str = "api") -> AsyncIterator[dict]:
+    """Mesmo contrato de `scrape_many`, sem browser: endpoints JSON (statusinvest_api) em threads."""
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _um_ticker(ticker: str) -> dict:
+        async with sem:
+            inicio = time.perf_counter()
+            try:
+                data = await asyncio.to_thread(scrape_statusinvest_api, ticker)
+            except Exception as e:
+                data = {"ticker": ticker, "erro": str(e)}
+            data["tempo_s"] = round(time.perf_counter() - inicio, 3)
+            return data
+
+    tasks = [asyncio.create_task(_um_ticker(t)) for t in tickers]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def scrape_many_pipeline(tickers: Iterable[str], concurrency: int = 4,
+                               versao: str = "pipeline") -> AsyncIterator[dict]:
+    """Mesmo contrato de `scrape_many`: caminho requests com o parse em processos (statusinvest_pipeline)."""
+    stats = statusinvest_pipeline.EstatisticasPipeline(concurrency, statusinvest_pipeline.PARSERS_PADRAO)
+    async for data in statusinvest_pipeline.scrape_pipeline(tickers, concurrency, estatisticas=stats):
+        yield data
+    print(f"[batch] etapas: {statusinvest_pipeline.formatar_resumo(stats.resumo())}", file=sys.stderr)
+
+def _ler_tickers(args) -> List[str]:
+    tickers = list(args.tickers)
+    if args.arquivo:
+        with open(args.arquivo, encoding="utf-8") as f:
+            tickers += [linha.strip() for linha in f if linha.strip() and not linha.startswith("#")]
+    return tickers
+
+async def _main(args) -> None:
+    tickers = _ler_tickers(args)
+    if args.versao == "api":
+        runner = scrape_many_api
+    elif args.versao == "pipeline":
+        runner = scrape_many_pipeline
+    else:
+        runner = scrape_many_isolado if args.isolado else scrape_many
+    inicio = time.perf_counter()
+    tempos = []
+    erros = 0
+    rede = Counter()
+    exportador = ExportadorParquet(args.parquet, gravar_a_cada=100) if args.parquet else None
+    async for data in runner(tickers, concurrency=args.concorrencia, versao=args.versao):
+        if exportador:
+            exportador.adicionar(data)
+        tempos.append(data["tempo_s"])
+        erros += "erro" in data
+        for chave in ("liberadas", "bloqueadas", "bytes_liberados", "bytes_bloqueados"):
+            rede[chave] += data.get("rede", {}).get(chave, 0)
+        # Uma linha JSON por ticker, na ordem em que terminam
+        print(json.dumps(data, ensure_ascii=False), flush=True)
+    if exportador:
+        exportador.gravar()
+        print(f"[batch] parquet: {len(exportador.arquivos)} arquivo(s) em {args.parquet}", file=sys.stderr)
+    total = time.perf_counter() - inicio
+    modo = "um browser por ticker" if args.isolado else "browser compartilhado"
+    if args.versao == "api":
+        modo = "endpoints JSON, sem browser"
+    elif args.versao == "pipeline":
+        modo = f"requests + parse em {statusinvest_pipeline.PARSERS_PADRAO} processo(s)"
+    if tempos:
+        print(
+            f"[batch] {len(tempos)} tickers ({erros} erros) em {total:.2f}s | {modo}, "
+            f"concorrência {args.concorrencia} | média por ticker {sum(tempos) / len(tempos):.2f}s",
+            file=sys.stderr,
+        )
+    if rede["liberadas"] or rede["bloqueadas"]:
+        print(f"[batch] rede: {formatar_resumo(rede)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraping em lote do Status Invest com um browser compartilhado")
+    parser.add_argument("tickers", nargs="*", help="ex.: BBAS3 ITUB4 PETR4")
+    parser.add_argument("-f", "--arquivo", help="arquivo com um ticker por linha")
+    parser.add_argument("-c", "--concorrencia", type=int, default=4)
+    parser.add_argument("--versao", choices=sorted(SCRAPERS) + ["api", "pipeline"], default="v1",
+                        help="api: endpoints JSON do Status Invest (statusinvest_api), sem browser; "
+                             "pipeline: requests com o parse em processos (statusinvest_pipeline)")
+    parser.add_argument("--parquet", metavar="DIR",
+                        help="grava também indicadores e proventos em Parquet (statusinvest_parquet)")
+    parser.add_argument("--isolado", action="store_true",
+                        help="usa o caminho antigo (um browser por ticker) para comparar os tempos")
+    args = parser.parse_args()
+    if not args.tickers and not args.arquivo:
+        parser.error("informe tickers ou --arquivo")
+    asyncio.run(_main(args))
@@ -0,0 +1,182 @@
+"""
+Política de interceptação de requisições dos scrapers (Playwright).
+
+Bloqueia por tipo de recurso (`request.resource_type`: image, media, font e,
+se pedido, stylesheet) e por domínio de terceiros (analytics, anúncios). A
+allowlist passa sempre, antes de qualquer regra.
+
+Contagem por página: requisições liberadas/bloqueadas (por motivo) e bytes
+recebidos (`request.sizes()`). Requisição abortada não baixa nada, então os
+bytes economizados só aparecem no modo "simular", que libera tudo e conta o
+que teria sido bloqueado.
+
+Config via env:
+  STATUSINVEST_BLOQUEIO            ligado (padrão) | simular | desligado
+  STATUSINVEST_BLOQUEAR_TIPOS      tipos bloqueados (padrão: image,media,font)
+  STATUSINVEST_BLOQUEAR_DOMINIOS   domínios extras a bloquear (somados à lista padrão)
+  STATUSINVEST_PERMITIR            allowlist: domínios ou prefixos de URL
+
+CSS fica liberado por padrão: sem ele `inner_text` passa a incluir texto
+escondido, `is_visible` muda e o screenshot do debug perde o layout.
+"""
+import asyncio
+import os
+import sys
+import weakref
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+def _lista(nome: str, padrao: str = "") -> tuple:
+    return tuple(x.strip().lower() for x in os.environ.get(nome, padrao).split(",") if x.strip())
+
+MODO_BLOQUEIO = os.environ.get("STATUSINVEST_BLOQUEIO", "ligado").lower()
+
+TIPOS_BLOQUEADOS = _lista("STATUSINVEST_BLOQUEAR_TIPOS", "image,media,font")
+
+DOMINIOS_BLOQUEADOS = (
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "hotjar.com",
+    "segment.io",
+    "facebook.net",
+    "clarity.ms",
+    "amazon-adsystem.com",
+    "criteo.com",
+    "onesignal.com",
+) + _lista("STATUSINVEST_BLOQUEAR_DOMINIOS")
+
+PERMITIDOS = _lista("STATUSINVEST_PERMITIR")
+
+def _do_dominio(host: str, dominios: Iterable[str]) -> Optional[str]:
+    for d in dominios:
+        if host == d or host.endswith("." + d):
+            return d
+    return None
+
+class FiltroRequisicoes:
+    def __init__(self, tipos: Iterable[str] = TIPOS_BLOQUEADOS,
+                 dominios: Iterable[str] = DOMINIOS_BLOQUEADOS,
+                 permitidos: Iterable[str] = PERMITIDOS, modo: str = MODO_BLOQUEIO):
+        self.tipos = frozenset(tipos)
+        self.dominios = tuple(dominios)
+        self.permitidos = tuple(permitidos)
+        self.modo = modo
+
+    def motivo(self, url: str, tipo: str) -> Optional[str]:
+        """Por que a requisição seria bloqueada ("tipo:font", "dominio:hotjar.com") ou None."""
+        if self.modo == "desligado":
+            return None
+        host = (urlsplit(url).hostname or "").lower()
+        if any(url.startswith(p) for p in self.permitidos if "/" in p) or _do_dominio(host, self.permitidos):
+            return None
+        if tipo in self.tipos:
+            return f"tipo:{tipo}"
+        dominio = _do_dominio(host, self.dominios)
+        return f"dominio:{dominio}" if dominio else None
+
+class EstatisticasRede:
+    """Contadores de uma página. `zerar()` entre tickers quando a página é reaproveitada."""
+
+    def __init__(self):
+        self.zerar()
+
+    def zerar(self) -> None:
+        self.liberadas = 0
+        self.bloqueadas = Counter()
+        self.bytes_liberados = 0
+        self.bytes_bloqueados = 0
+        self._pendentes = set()
+
+    def _medir(self, request, motivo: Optional[str]) -> None:
+        async def _tamanho():
+            try:
+                sizes = await request.sizes()
+            except Exception:
+                return  # página fechada, data: URL etc.
+            total = sizes["responseHeadersSize"] + sizes["responseBodySize"]
+            if motivo:
+                self.bytes_bloqueados += total
+            else:
+                self.bytes_liberados += total
+
+        tarefa = asyncio.ensure_future(_tamanho())
+        self._pendentes.add(tarefa)
+        tarefa.add_done_callback(self._pendentes.discard)
+
+    async def resumo(self) -> dict:
+        """Espera as medições em andamento e devolve os contadores."""
+        if self._pendentes:
+            await asyncio.gather(*self._pendentes, return_exceptions=True)
+        return {
+            "liberadas": self.liberadas,
+            "bloqueadas": sum(self.bloqueadas.values()),
+            "bytes_liberados": self.bytes_liberados,
+            "bytes_bloqueados": self.bytes_bloqueados,
+            "por_motivo": dict(self.bloqueadas.most_common()),
+        }
+
+_ESTATISTICAS = weakref.WeakKeyDictionary()
+
+def estatisticas(page) -> EstatisticasRede:
+    """Contadores de rede da página (criados na primeira consulta)."""
+    if page not in _ESTATISTICAS:
+        _ESTATISTICAS[page] = EstatisticasRede()
+    return _ESTATISTICAS[page]
+
+def _pagina(request):
+    try:
+        return request.frame.page
+    except Exception:
+        return None  # service worker: sem página
+
+FILTRO_PADRAO = FiltroRequisicoes()
+
+async def instalar_filtro(ctx, filtro: FiltroRequisicoes = FILTRO_PADRAO) -> None:
+    """Instala a política em todas as páginas do contexto e liga a contagem por página."""
+    simular = filtro.modo == "simular"
+
+    async def _rota(route, request):
+        motivo = filtro.motivo(request.url, request.resource_type)
+        page = _pagina(request)
+        if motivo and not simular:
+            if page is not None:
+                estatisticas(page).bloqueadas[motivo] += 1
+            return await route.abort()
+        # fallback: segue para as outras rotas (ex.: replay de HAR) ou para a rede
+        return await route.fallback()
+
+    def _terminou(request):
+        page = _pagina(request)
+        if page is None:
+            return
+        est = estatisticas(page)
+        motivo = filtro.motivo(request.url, request.resource_type) if simular else None
+        if motivo:
+            est.bloqueadas[motivo] += 1
+        else:
+            est.liberadas += 1
+        est._medir(request, motivo)
+
+    if filtro.modo != "desligado":
+        await ctx.route("**/*", _rota)
+    ctx.on("requestfinished", _terminou)
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:.0f} KB"
+
+def formatar_resumo(resumo: dict, modo: str = MODO_BLOQUEIO) -> str:
+    linha = (f"{resumo['liberadas']} liberadas ({_kb(resumo['bytes_liberados'])}), "
+             f"{resumo['bloqueadas']} bloqueadas")
+    if modo == "simular":
+        linha += f" ({_kb(resumo['bytes_bloqueados'])} que seriam economizados)"
+    return linha
+
+async def avisar_rede(ticker: str, page) -> dict:
+    """Imprime no stderr o resumo de rede da página e o devolve."""
+    resumo = await estatisticas(page).resumo()
+    print(f"[rede] {ticker}: {formatar_resumo(resumo)}", file=sys.stderr)
+    return resumo
@@ -0,0 +1,116 @@
+"""
+Cache em disco (SQLite) dos resultados de scraping, por ticker + scraper + versão.
+
+- Dentro do TTL: devolve do cache, sem abrir browser nem fazer requisição.
+- Vencido, mas dentro de `max_stale`: devolve o dado antigo na hora e atualiza em
+  segundo plano (stale-while-revalidate). A thread não é daemon, então um script
+  de linha de comando só termina depois de gravar o dado novo.
+- `refresh=True` ignora o cache e força um scraping novo.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+CACHE_PATH = os.environ.get(
+    "STATUSINVEST_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "statusinvest.sqlite3"),
+)
+CACHE_TTL = int(os.environ.get("STATUSINVEST_CACHE_TTL", 24 * 3600))  # fundamentos mudam no máximo 1x/dia
+CACHE_MAX_STALE = int(os.environ.get("STATUSINVEST_CACHE_MAX_STALE", 7 * 24 * 3600))
+
+class ScrapeCache:
+    def __init__(self, path: str = CACHE_PATH, ttl: int = CACHE_TTL, max_stale: int = CACHE_MAX_STALE):
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " ticker TEXT NOT NULL, scraper TEXT NOT NULL, versao TEXT NOT NULL,"
+                " criado_em REAL NOT NULL, dados TEXT NOT NULL,"
+                " PRIMARY KEY (ticker, scraper, versao))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # Uma conexão por operação: o refresh roda em outra thread
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, ticker: str, scraper: str, versao: str) -> Optional[Tuple[dict, float]]:
+        """Retorna (dados, idade em segundos) ou None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT dados, criado_em FROM resultados WHERE ticker = ? AND scraper = ? AND versao = ?",
+                (ticker.upper(), scraper, versao),
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def estado(self, ticker: str, scraper: str, versao: str) -> Optional[str]:
+        """"fresco" (dentro do TTL), "vencido" (ainda servível por `fetch`) ou None."""
+        hit = self.get(ticker, scraper, versao)
+        if not hit:
+            return None
+        idade = hit[1]
+        if idade <= self.ttl:
+            return "fresco"
+        return "vencido" if idade <= self.ttl + self.max_stale else None
+
+    def put(self, ticker: str, scraper: str, versao: str, dados: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resultados (ticker, scraper, versao, criado_em, dados) VALUES (?, ?, ?, ?, ?)",
+                (ticker.upper(), scraper, versao, time.time(), json.dumps(dados, ensure_ascii=False)),
+            )
+
+    def _revalidate(self, ticker: str, scraper: str, versao: str, fn: Callable[[], dict]) -> None:
+        key = (ticker.upper(), scraper, versao)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run():
+            try:
+                self.put(ticker, scraper, versao, fn())
+                print(f"[cache] {ticker.upper()} ({scraper}) atualizado em segundo plano", file=sys.stderr)
+            except Exception as e:
+                print(f"[cache] falha ao atualizar {ticker.upper()} ({scraper}): {e}", file=sys.stderr)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name=f"revalidate-{ticker}").start()
+
+    def fetch(self, ticker: str, scraper: str, versao: str, fn: Callable[[], dict], refresh: bool = False) -> dict:
+        """Devolve do cache quando possível; senão chama `fn()` e grava o resultado."""
+        if not refresh:
+            hit = self.get(ticker, scraper, versao)
+            if hit:
+                dados, idade = hit
+                if idade <= self.ttl:
+                    print(f"[cache] {ticker.upper()} ({scraper}) do cache, idade {idade / 60:.0f} min", file=sys.stderr)
+                    return dados
+                if idade <= self.ttl + self.max_stale:
+                    print(f"[cache] {ticker.upper()} ({scraper}) vencido ({idade / 3600:.1f} h): "
+                          "usando o antigo e atualizando em segundo plano", file=sys.stderr)
+                    self._revalidate(ticker, scraper, versao, fn)
+                    return dados
+        dados = fn()
+        self.put(ticker, scraper, versao, dados)
+        return dados
@@ -0,0 +1,61 @@
+"""
+Extração do Dividend Yield (12 meses, médio 5 e 10 anos) a partir do texto da página.
+
+Em vez de regexes `dy.*?12.*?meses?...` sobre a página inteira (lentas em páginas
+de 1 MB e capazes de casar textos longe do rótulo), procura só em janelas curtas
+depois de cada âncora ("DY", "D.Y", "Dividend Yield"), com padrões pré-compilados
+e um orçamento de tempo por página.
+"""
+import re
+import time
+from typing import Dict, Optional
+
+from statusinvest_numeros import numero
+
+DY_ANCHOR_RE = re.compile(r"\bd\.?y\b|dividend yield", re.IGNORECASE)
+
+# Período que qualifica o valor dentro da janela
+DY_PERIODS = {
+    "dy_12m": re.compile(r"\b12\s*m(?:eses|ês|es)?\b", re.IGNORECASE),
+    "dy_medio_5a": re.compile(r"\b5\s*anos?\b", re.IGNORECASE),
+    "dy_medio_10a": re.compile(r"\b10\s*anos?\b", re.IGNORECASE),
+}
+
+# Percentual em formato brasileiro: 7,85% | 7,85 % | 12%
+DY_VALUE_RE = re.compile(r"(-?\d{1,3}(?:\.\d{3})*(?:,\d+)?)\s*%")
+
+DY_WINDOW = 120
+DY_BUDGET_S = 0.05
+DY_MAX_ANCHORS = 500
+
+def _to_float(s: str) -> Optional[float]:
+    return numero(s)[0]
+
+def extract_dy(text: str, window: int = DY_WINDOW, budget_s: float = DY_BUDGET_S,
+               max_anchors: int = DY_MAX_ANCHORS) -> Dict[str, Optional[float]]:
+    """
+    Retorna {"dy_12m", "dy_medio_5a", "dy_medio_10a"} (float ou None).
+
+    Para cada âncora, olha só os `window` caracteres seguintes: o valor é o primeiro
+    percentual da janela e o período é o primeiro qualificador (12 meses, 5 ou 10 anos)
+    encontrado nela. Ao estourar `budget_s` devolve o que já achou.
+    """
+    found = {key: None for key in DY_PERIODS}
+    deadline = time.perf_counter() + budget_s
+    for n, anchor in enumerate(DY_ANCHOR_RE.finditer(text)):
+        if n >= max_anchors or time.perf_counter() > deadline:
+            break
+        start, end = anchor.end(), anchor.end() + window
+        value = DY_VALUE_RE.search(text, start, end)
+        if not value:
+            continue
+        period_key, period_pos = None, end
+        for key, rx in DY_PERIODS.items():
+            m = rx.search(text, start, end)
+            if m and m.start() < period_pos:
+                period_key, period_pos = key, m.start()
+        if period_key and found[period_key] is None:
+            found[period_key] = _to_float(value.group(1))
+            if all(v is not None for v in found.values()):
+                break
+    return found
@@ -0,0 +1,203 @@
+"""
+Gravação e replay de visitas ao Status Invest em HAR (sem tocar no site).
+
+Gravação: o debug abre o contexto com `record_har_path` (HAR com os corpos
+embutidos) e salva debug_<ticker>.har ao fechar — documento, XHRs, scripts,
+tudo o que não foi bloqueado por statusinvest_bloqueio.
+
+Replay:
+  - Playwright: `instalar_replay(ctx)` responde do HAR com `route_from_har`
+    (route.fulfill); o que não estiver gravado é abortado, nada vai à rede.
+    Os `new_context` de v1 e v2 chamam isso quando STATUSINVEST_HAR está
+    definido (arquivos .har ou diretórios, separados por os.pathsep).
+  - requests: `HarAdapter` é um transport adapter do requests que devolve as
+    respostas gravadas; `instalar_replay_requests` monta-o no cliente HTTP comum.
+
+Sem gravação: `python statusinvest_har.py debug_bbas3_structure.html` monta um
+HAR sintético só com o documento (GET /acoes/<ticker>) a partir da página salva,
+enxuta (sem scripts, estilos, SVG, comentários e espaços repetidos).
+"""
+import argparse
+import base64
+import glob
+import json
+import os
+import re
+import sys
+from typing import Iterable, List, Optional
+
+import lxml.etree
+import lxml.html
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import CLIENTE_HTTP
+
+# Cabeçalhos que não valem mais para o corpo já decodificado guardado no HAR
+CABECALHOS_IGNORADOS = {"content-encoding", "content-length", "transfer-encoding"}
+
+def arquivos_har(caminhos: Optional[str] = None) -> List[str]:
+    """Arquivos .har de STATUSINVEST_HAR (ou de `caminhos`): arquivos ou diretórios."""
+    caminhos = os.environ.get("STATUSINVEST_HAR", "") if caminhos is None else caminhos
+    hars = []
+    for c in filter(None, caminhos.split(os.pathsep)):
+        hars.extend(sorted(glob.glob(os.path.join(c, "*.har"))) if os.path.isdir(c) else [c])
+    return hars
+
+def opcoes_gravacao(arquivo: str) -> dict:
+    """kwargs de browser.new_context para gravar a visita em `arquivo`."""
+    return {"record_har_path": arquivo, "record_har_content": "embed"}
+
+async def instalar_replay(ctx, hars: Optional[Iterable[str]] = None) -> bool:
+    """Responde as requisições do contexto a partir dos HARs. Retorna False se não houver HAR.
+
+    Instale antes de statusinvest_bloqueio.instalar_filtro: as rotas registradas
+    por último rodam primeiro, então o filtro decide e o que ele deixar passar
+    (route.fallback) cai no HAR; o que não estiver em nenhum HAR é abortado."""
+    hars = arquivos_har() if hars is None else list(hars)
+    if not hars:
+        return False
+    await ctx.route("**/*", lambda route: route.abort())
+    for har in hars:
+        await ctx.route_from_har(har, not_found="fallback")
+    return True
+
+def ler_har(arquivo: str) -> List[dict]:
+    with open(arquivo, encoding="utf-8") as f:
+        return json.load(f)["log"]["entries"]
+
+def corpo(entrada: dict) -> bytes:
+    content = entrada["response"].get("content", {})
+    texto = content.get("text") or ""
+    if content.get("encoding") == "base64":
+        return base64.b64decode(texto)
+    return texto.encode("utf-8")
+
+def documento(arquivo: str) -> Optional[bytes]:
+    """HTML da página principal (primeira resposta text/html 200 do HAR)."""
+    for entrada in ler_har(arquivo):
+        resp = entrada["response"]
+        if resp.get("status") == 200 and "text/html" in resp.get("content", {}).get("mimeType", ""):
+            return corpo(entrada)
+    return None
+
+class HarAdapter(BaseAdapter):
+    """Transport adapter do requests que responde com as entradas de HARs."""
+
+    def __init__(self, hars: Iterable[str]):
+        super().__init__()
+        self.entradas = {}
+        for har in hars:
+            for e in ler_har(har):
+                chave = (e["request"]["method"], e["request"]["url"].split("#")[0])
+                # POSTs iguais com corpos diferentes: guarda pelo corpo também
+                self.entradas.setdefault(chave, []).append(e)
+
+    def hosts(self) -> set:
+        return {requests.utils.urlparse(url)._replace(path="", params="", query="", fragment="").geturl()
+                for _, url in self.entradas}
+
+    def _achar(self, request) -> Optional[dict]:
+        candidatas = self.entradas.get((request.method, request.url.split("#")[0]), [])
+        post = request.body.decode() if isinstance(request.body, bytes) else request.body
+        for e in candidatas:
+            if (e["request"].get("postData") or {}).get("text") == post:
+                return e
+        # Corpo diferente do gravado não é a mesma requisição: 404, em vez de outra resposta qualquer
+        return None
+
+    def send(self, request, **kwargs):
+        entrada = self._achar(request)
+        resp = requests.Response()
+        resp.request = request
+        resp.url = request.url
+        if entrada is None:
+            resp.status_code = 404
+            resp.reason = "Not in HAR"
+            resp._content = b""
+            return resp
+        gravada = entrada["response"]
+        resp.status_code = gravada["status"]
+        resp.reason = gravada.get("statusText", "")
+        resp.headers = CaseInsensitiveDict({h["name"]: h["value"] for h in gravada.get("headers", [])
+                                            if h["name"].lower() not in CABECALHOS_IGNORADOS})
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp._content = corpo(entrada)
+        return resp
+
+    def close(self):
+        pass
+
+def instalar_replay_requests(cliente=CLIENTE_HTTP, hars: Optional[Iterable[str]] = None) -> Optional[HarAdapter]:
+    """Monta o HarAdapter nas sessões do cliente HTTP comum para os hosts gravados."""
+    hars = arquivos_har() if hars is None else list(hars)
+    if not hars:
+        return None
+    adapter = HarAdapter(hars)
+    for host in adapter.hosts():
+        cliente.sessao(host).mount(f"{host}/", adapter)
+    return adapter
+
+# O que a página salva carrega e nenhum extrator lê: código, estilo, ícones, atributos de
+# estilo/JS e o JSON escondido das notícias (#news-text-hidden, ~80 KB, e #news-video-hidden)
+TAGS_DESCARTADAS = ("script", "style", "noscript", "svg", "link")
+IDS_DESCARTADOS = ("news-text-hidden", "news-video-hidden")
+ATRIBUTOS_DESCARTADOS = ("style", "tabindex", "role", "onclick")
+ESPACOS_RE = re.compile(r"[ \t\r\f\v]*\n\s*|[ \t\r\f\v]{2,}")
+
+def enxugar_html(html: str) -> str:
+    """Página salva sem o que não afeta a extração (ver TAGS_DESCARTADAS)."""
+    doc = lxml.html.fromstring(html)
+    for el in list(doc.iter(lxml.etree.Comment, *TAGS_DESCARTADAS)):
+        el.drop_tree()
+    for id_ in IDS_DESCARTADOS:
+        for el in doc.xpath("//*[@id=$id]", id=id_):
+            el.drop_tree()
+    for el in doc.iter(lxml.etree.Element):
+        for nome in [n for n in el.attrib if n in ATRIBUTOS_DESCARTADOS or n.startswith(("data-", "aria-"))]:
+            del el.attrib[nome]
+    saida = lxml.html.tostring(doc, encoding="unicode", doctype="<!DOCTYPE html>")
+    return ESPACOS_RE.sub(lambda m: "\n" if "\n" in m.group(0) else " ", saida)
+
+def har_sintetico(html_path: str, url: str) -> dict:
+    """HAR com uma entrada: GET `url` respondendo a página salva (enxuta)."""
+    with open(html_path, encoding="utf-8") as f:
+        html = enxugar_html(f.read())
+    return {"log": {
+        "version": "1.2",
+        "creator": {"name": "statusinvest_har", "version": "1",
+                    "comment": f"documento de {os.path.basename(html_path)}, enxuto, sem rede"},
+        "comment": f"HAR sintético: só o documento da página (GET {url}), montado a partir de "
+                   f"{os.path.basename(html_path)} por statusinvest_har.py",
+        "pages": [],
+        "entries": [{
+            "startedDateTime": "1970-01-01T00:00:00.000Z",
+            "time": 0,
+            "request": {"method": "GET", "url": url, "httpVersion": "HTTP/1.1", "cookies": [],
+                        "headers": [], "queryString": [], "headersSize": -1, "bodySize": 0},
+            "response": {"status": 200, "statusText": "OK", "httpVersion": "HTTP/1.1", "cookies": [],
+                         "headers": [{"name": "Content-Type", "value": "text/html; charset=utf-8"}],
+                         "content": {"size": len(html.encode("utf-8")),
+                                     "mimeType": "text/html; charset=utf-8", "text": html},
+                         "redirectURL": "", "headersSize": -1, "bodySize": -1},
+            "cache": {},
+            "timings": {"send": 0, "wait": 0, "receive": 0},
+        }],
+    }}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HAR sintético a partir de uma página salva pelo debug")
+    parser.add_argument("html", help="ex.: debug_bbas3_structure.html")
+    parser.add_argument("-o", "--saida", help="padrão: debug_<ticker>.har ao lado do HTML")
+    parser.add_argument("--url", help="padrão: https://statusinvest.com.br/acoes/<ticker>")
+    args = parser.parse_args()
+    ticker = re.match(r"(?:debug_)?(.+?)_structure\.html$", os.path.basename(args.html)).group(1)
+    url = args.url or f"https://statusinvest.com.br/acoes/{ticker}"
+    saida = args.saida or os.path.join(os.path.dirname(args.html), f"debug_{ticker}.har")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(har_sintetico(args.html, url), f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"{saida}: {os.path.getsize(saida) / 1024:.0f} KB")
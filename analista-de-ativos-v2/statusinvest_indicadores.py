@@ -0,0 +1,192 @@
+"""
+Registro dos indicadores: uma tabela declarativa (indicadores.json) para todos os backends.
+
+Cada entrada tem a chave (a mesma em v1, v2, requests, parser offline e API), a
+coluna do Parquet, a unidade esperada ("%" ou "x"), uma faixa plausível, as
+variantes do rótulo na página, a chave no endpoint JSON (`api`) e se o card é
+essencial para a página ser considerada carregada.
+
+Para estender sem mexer em código: STATUSINVEST_INDICADORES aponta para um ou
+mais JSON no mesmo formato (separados por os.pathsep). Entrada com chave já
+existente troca só os campos informados; chave nova entra no fim.
+
+Tudo é compilado uma vez no import:
+  - LABEL_MATCHER: todas as variantes numa única regex (sem acento, sem caixa,
+    com borda de palavra: "roe" não casa "heroes", "dy" não casa "body");
+  - NUM_RE: os números de um texto, com o % colado ou separado por um espaço;
+  - VAZIO_RE: o traço que a página mostra num card sem valor;
+  - Indicador.valor(bruto): float, "x,xx%" (unidade "%") ou None quando a
+    unidade não bate (P/L com %) ou o valor cai fora da faixa;
+  - Indicador.primeiro_valor(texto): primeiro (ou último) número do texto que passa
+    nessa validação, em vez do primeiro número qualquer.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+from statusinvest_numeros import formatar_percentual, numero
+
+REGISTRO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indicadores.json")
+
+NUM_RE = re.compile(r"-?\d{1,3}(?:[.\s]\d{3})*(?:,\d+)?(?: ?%)?|-?\d+,\d+(?: ?%)?")
+# Card sem valor: traço solto, com ou sem % ("-", "-%", "—"); "-0,14" não conta
+VAZIO_RE = re.compile(r"(?<![\w,])[-—](?: ?%)?(?![\w,])")
+
+_ACCENTS = bytes.maketrans("áàâãäéèêëíìîïóòôõöúùûüçñ".encode("latin-1"), b"aaaaaeeeeiiiiooooouuuucn")
+
+def lower_text(text: str) -> str:
+    """Minúsculas mantendo os índices do texto original."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # raro: algum caractere muda de tamanho ao virar minúsculo (ex.: 'İ')
+        lowered = "".join(c.lower()[:1] for c in text)
+    return lowered
+
+def label_pattern(label: str, borda: bool = True) -> str:
+    """Regex do rótulo sem acento (casa o texto já passado por sem_acento), com borda de palavra."""
+    sem = sem_acento(label.lower())
+    corpo = re.escape(sem)
+    if not borda:
+        return corpo
+    inicio = r"(?<!\w)" if sem[:1].isalnum() else ""
+    fim = r"(?!\w)" if sem[-1:].isalnum() else ""
+    return inicio + corpo + fim
+
+def sem_acento(lowered: str) -> str:
+    """Tira os acentos de um texto em minúsculas sem mudar os índices ("dívida" -> "divida").
+    Passa por latin-1 (um byte por caractere; o que não couber vira "?") para usar o
+    bytes.translate, bem mais rápido que str.translate ou re.sub no texto da página inteira."""
+    return lowered.encode("latin-1", "replace").translate(_ACCENTS).decode("latin-1")
+
+class Indicador:
+    """Uma entrada do registro, com a validação de valores já pronta."""
+
+    def __init__(self, chave: str, coluna: str, rotulos: Iterable[str], unidade: str = "x",
+                 faixa: Optional[List[float]] = None, api: Optional[str] = None, essencial: bool = False):
+        if unidade not in ("%", "x"):
+            raise ValueError(f"{chave}: unidade deve ser '%' ou 'x', não {unidade!r}")
+        self.chave = chave
+        self.coluna = coluna
+        self.rotulos = list(rotulos)
+        self.unidade = unidade
+        self.faixa = tuple(faixa) if faixa else None
+        self.api = api
+        self.essencial = essencial
+
+    def valor(self, bruto) -> Union[float, str, None]:
+        """Valor no formato dos scrapers, ou None se não for um valor plausível deste indicador."""
+        v, percentual = numero(bruto)
+        if v is None or (percentual and self.unidade != "%"):
+            return None
+        if self.faixa and not self.faixa[0] <= v <= self.faixa[1]:
+            return None
+        return formatar_percentual(v) if self.unidade == "%" else v
+
+    def primeiro_valor(self, texto: str, inicio: int = 0, fim: Optional[int] = None,
+                       ultimo: bool = False) -> Union[float, str, None]:
+        """Primeiro número válido de texto[inicio:fim] (`ultimo=True`: o último)."""
+        achados = NUM_RE.finditer(texto or "", inicio, len(texto or "") if fim is None else fim)
+        if ultimo:
+            achados = reversed(list(achados))
+        for m in achados:
+            v = self.valor(m.group(0))
+            if v is not None:
+                return v
+        return None
+
+def carregar_registro(extras: Optional[str] = None) -> Dict[str, Indicador]:
+    """indicadores.json + os arquivos de STATUSINVEST_INDICADORES (ou `extras`), na ordem."""
+    extras = os.environ.get("STATUSINVEST_INDICADORES", "") if extras is None else extras
+    entradas = {}
+    for arquivo in [REGISTRO_PATH] + [a for a in extras.split(os.pathsep) if a]:
+        with open(arquivo, encoding="utf-8") as f:
+            for e in json.load(f):
+                entradas.setdefault(e["chave"], {}).update(e)
+    try:
+        return {chave: Indicador(**e) for chave, e in entradas.items()}
+    except TypeError as e:
+        raise ValueError(f"registro de indicadores inválido: {e}") from None
+
+class LabelMatcher:
+    """
+    Todas as variantes de rótulos compiladas numa única regex (sem acento, sem caixa).
+    Uma passada pelo texto em minúsculas dá a primeira posição de cada variante.
+    """
+
+    def __init__(self, labels_map: dict):
+        self.labels_map = labels_map
+        labels = {v for vs in labels_map.values() for v in vs}
+        self.variants = {label_pattern(v): re.compile(label_pattern(v)) for v in labels}
+        # Rótulos e texto sem acento: as alternativas viram literais. A varredura usa os rótulos
+        # sem as bordas e sem lookahead, para o re filtrar as posições pelo primeiro caractere
+        # (lookbehind/lookahead em volta da alternância deixam a busca várias vezes mais lenta);
+        # a borda é conferida depois, pela regex de cada variante.
+        corpos = sorted({label_pattern(v, borda=False) for v in labels}, key=len, reverse=True)
+        self.regex = re.compile("|".join(corpos))
+
+    def first_positions(self, lowered: str) -> dict:
+        """{padrão da variante: (início, fim)} da primeira ocorrência de cada variante."""
+        lowered = sem_acento(lowered)
+        pos = {}
+        pending = dict(self.variants)
+        i = 0
+        while pending:
+            m = self.regex.search(lowered, i)
+            if m is None:
+                break
+            inicio = m.start()
+            for p, rx in list(pending.items()):
+                achado = rx.match(lowered, inicio)
+                if achado:
+                    pos[p] = achado.span()
+                    del pending[p]
+            # recomeça na posição seguinte (não no fim do casamento): acha também variantes
+            # que começam na mesma posição ou dentro de outra (ex.: "p/l" e "p/lucro")
+            i = inicio + 1
+        return pos
+
+    def extract(self, text: str, lowered: str = None, after: int = 160) -> dict:
+        """
+        Primeiro valor válido (Indicador.primeiro_valor) logo depois de cada rótulo encontrado.
+        A janela começa no fim do rótulo ("CAGR Lucros 5 anos" não vira 5%) e para num
+        traço solto ("-", "-%"), que é como a página mostra um card vazio.
+        """
+        pos = self.first_positions(lowered if lowered is not None else lower_text(text))
+        indicadores = {}
+        for key, variants in self.labels_map.items():
+            indicador = REGISTRO.get(key)
+            val = None
+            for label in variants:
+                span = pos.get(label_pattern(label))
+                if span is None:
+                    continue
+                inicio, fim = span[1], span[1] + after
+                vazio = VAZIO_RE.search(text, inicio, fim)
+                if vazio:
+                    fim = vazio.start()
+                if indicador is not None:
+                    val = indicador.primeiro_valor(text, inicio, fim)
+                else:
+                    m = NUM_RE.search(text, inicio, fim)
+                    val = numero(m.group(0))[0] if m else None
+                if val is not None:
+                    break
+            indicadores[key] = val
+        return indicadores
+
+REGISTRO = carregar_registro()
+
+CHAVES = list(REGISTRO)
+ROTULOS = {k: ind.rotulos for k, ind in REGISTRO.items()}
+ESSENCIAIS = {k: ind.rotulos for k, ind in REGISTRO.items() if ind.essencial}
+COLUNAS = {k: ind.coluna for k, ind in REGISTRO.items()}
+POR_API = {ind.api: ind for ind in REGISTRO.values() if ind.api}
+
+LABEL_MATCHER = LabelMatcher(ROTULOS)
+
+_POR_ROTULO = {sem_acento(lower_text(r)): k for k, ind in REGISTRO.items() for r in [k] + ind.rotulos}
+
+def chave_canonica(nome: str) -> Optional[str]:
+    """Chave do registro para uma chave ou rótulo qualquer ("Dividend Yield" -> "DY")."""
+    return _POR_ROTULO.get(sem_acento(lower_text(nome or "")))
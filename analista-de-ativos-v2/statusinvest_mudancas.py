@@ -0,0 +1,154 @@
+"""
+Detecção de mudanças por ticker, para o lote diário não rodar o modelo à toa.
+
+Guarda em SQLite, por ticker, a "linha de base" da última análise: o payload
+normalizado (indicadores e dividendos, sem título/tempos/rede), a impressão
+digital (sha256 dele), a análise do modelo e, opcionalmente, o ETag/Last-Modified
+da página.
+
+A comparação é por campo: números mudam quando a diferença relativa passa da
+tolerância (STATUSINVEST_TOLERANCIA, padrão 1%); aparecer/sumir um valor ou um
+provento novo no histórico sempre conta. A linha de base só anda quando o modelo
+roda de novo, então variações pequenas que se acumulam acabam disparando.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from statusinvest_cache import CACHE_PATH
+from statusinvest_numeros import numero
+from statusinvest_requests import CLIENTE_HTTP, HEADERS
+
+MUDANCAS_PATH = os.environ.get(
+    "STATUSINVEST_MUDANCAS", os.path.join(os.path.dirname(CACHE_PATH), "mudancas.sqlite3"))
+TOLERANCIA = float(os.environ.get("STATUSINVEST_TOLERANCIA", 0.01))
+
+def _valor(v):
+    """"10,31%", "1.234,5" e 10.31 viram float; o que não é número vira None."""
+    return numero(v)[0]
+
+def normalizar(dados: dict) -> dict:
+    """Só os campos materiais do scraping, em forma estável para comparar e fazer hash."""
+    dividendos = dados.get("dividendos") or {}
+    return {
+        "indicadores": {k: _valor(v) for k, v in sorted((dados.get("indicadores") or {}).items())},
+        "dividendos": {k: _valor(dividendos.get(k)) for k in ("dy_12m", "dy_medio_5a", "dy_medio_10a")},
+        "historico": sorted([h["data"], round(float(h["valor"]), 8)]
+                            for h in dividendos.get("historico_12m") or []),
+    }
+
+def impressao(normalizado: dict) -> str:
+    return hashlib.sha256(json.dumps(normalizado, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+def _numero_mudou(antes, depois, tolerancia: float) -> bool:
+    if antes is None or depois is None or not isinstance(antes, float) or not isinstance(depois, float):
+        return antes != depois
+    return abs(depois - antes) > tolerancia * max(abs(antes), abs(depois))
+
+def campos_mudados(antes: dict, depois: dict, tolerancia: float = TOLERANCIA,
+                   tolerancias: Optional[Dict[str, float]] = None) -> List[str]:
+    """Campos que mudaram além da tolerância (`tolerancias`: por campo, ex. {"P/L": 0.05})."""
+    tolerancias = tolerancias or {}
+    mudados = []
+    for grupo in ("indicadores", "dividendos"):
+        a, d = antes.get(grupo, {}), depois.get(grupo, {})
+        for campo in sorted(set(a) | set(d)):
+            if _numero_mudou(a.get(campo), d.get(campo), tolerancias.get(campo, tolerancia)):
+                mudados.append(campo)
+    if antes.get("historico") != depois.get("historico"):
+        mudados.append("historico_12m")
+    return mudados
+
+class DetectorMudancas:
+    def __init__(self, path: str = MUDANCAS_PATH, tolerancia: float = TOLERANCIA,
+                 tolerancias: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.tolerancia = tolerancia
+        self.tolerancias = tolerancias or {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS linhas_de_base ("
+                " ticker TEXT PRIMARY KEY, impressao TEXT NOT NULL, dados TEXT NOT NULL,"
+                " modelo TEXT NOT NULL, analise TEXT NOT NULL, duracao_s REAL,"
+                " etag TEXT, last_modified TEXT, analisado_em REAL NOT NULL, verificado_em REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def linha_de_base(self, ticker: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM linhas_de_base WHERE ticker = ?", (ticker.upper(),)).fetchone()
+        if not row:
+            return None
+        base = dict(row)
+        base["dados"] = json.loads(base["dados"])
+        return base
+
+    def comparar(self, ticker: str, dados: dict, modelo: str) -> Tuple[bool, List[str], Optional[dict]]:
+        """(precisa analisar?, campos mudados, linha de base). Sem base ou com outro modelo: analisa."""
+        base = self.linha_de_base(ticker)
+        if base is None:
+            return True, ["(primeira análise)"], None
+        if base["modelo"] != modelo:
+            return True, [f"(modelo: {base['modelo']} -> {modelo})"], base
+        atual = normalizar(dados)
+        if impressao(atual) == base["impressao"]:
+            return False, [], base
+        mudados = campos_mudados(base["dados"], atual, self.tolerancia, self.tolerancias)
+        return bool(mudados), mudados, base
+
+    def registrar_analise(self, ticker: str, dados: dict, modelo: str, analise: str,
+                          duracao_s: Optional[float] = None, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None) -> None:
+        """Nova linha de base: o payload que foi analisado e a resposta do modelo."""
+        normalizado = normalizar(dados)
+        agora = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO linhas_de_base (ticker, impressao, dados, modelo, analise, duracao_s,"
+                " etag, last_modified, analisado_em, verificado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ticker.upper(), impressao(normalizado), json.dumps(normalizado, ensure_ascii=False), modelo,
+                 analise, duracao_s, etag, last_modified, agora, agora),
+            )
+
+    def registrar_verificacao(self, ticker: str, etag: Optional[str] = None,
+                              last_modified: Optional[str] = None) -> None:
+        """Ticker conferido sem mudança: a linha de base fica, só os validadores HTTP andam."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE linhas_de_base SET verificado_em = ?, etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified) WHERE ticker = ?",
+                (time.time(), etag, last_modified, ticker.upper()),
+            )
+
+def validadores_http(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                     cliente=CLIENTE_HTTP) -> Tuple[Optional[bool], Optional[str], Optional[str]]:
+    """GET condicional da página (o corpo não é lido). Retorna (mudou?, etag, last_modified):
+    False no 304; None quando o servidor não manda validadores (não dá para saber)."""
+    headers = dict(HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with cliente.stream("GET", url, headers=headers, timeout=(5, 30)) as r:
+        novo_etag, novo_lm = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        if r.status_code == 304:
+            return False, novo_etag or etag, novo_lm or last_modified
+        r.raise_for_status()
+    if not (novo_etag or novo_lm) or not (etag or last_modified):
+        return None, novo_etag, novo_lm
+    return (novo_etag, novo_lm) != (etag, last_modified), novo_etag, novo_lm
@@ -0,0 +1,104 @@
+"""
+Números no formato brasileiro, um a um ou em lote (vetorizado, pyarrow.compute).
+
+Regras (iguais nos dois caminhos e em todos os scrapers):
+  - "1.234,56" -> 1234.56; ponto é milhar quando separa grupos de 3 dígitos
+    ("1.234" -> 1234.0), senão é decimal ("10.31" -> 10.31, como sai de um float);
+  - sinal: "-12,5", "+3" e o menos tipográfico ("−12,5");
+  - espaços, NBSP (\\xa0, \\u202f) e "R$" são ignorados;
+  - "%" no fim marca percentual: o valor é o número em pontos ("7,5%" -> 7.5, percentual);
+  - "-", "—", "N/A", "" e qualquer texto que não seja só um número -> NaN/None.
+
+`normalizar_numeros(valores)` recebe uma Series ou lista de textos e devolve um
+DataFrame com `valor` (float64) e `percentual` (bool). `numero(texto)` faz o mesmo
+para um valor só. `normalize_number` é o contrato dos scrapers: float, percentual
+como texto canônico ("7,50%", é o que vai para o prompt do modelo) ou None.
+
+Com `extrair=True` o número é o primeiro que aparecer no texto ("R$ 0,45 por ação").
+"""
+import re
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Milhar com ponto e decimal com vírgula: 1.234,56 | 1234,56 | 12
+_BR = r"[+-]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?"
+# Decimal com ponto: 10.31 | .5 (só quando não é milhar)
+_PONTO = r"[+-]?\d*\.\d+"
+# Primeiro número de um texto, com o % colado ou separado por um espaço
+_TOKEN = r"[+-]?\d(?:[\d.]*\d)?(?:,\d+)?(?: ?%)?"
+_NBSP = "[\u00a0\u202f]"
+_IGNORAR = "[\\s\u00a0\u202f]+|R\\$"
+
+_BR_RE = re.compile(_BR)
+_PONTO_RE = re.compile(_PONTO)
+_TOKEN_RE = re.compile(_TOKEN)
+_IGNORAR_RE = re.compile(_IGNORAR)
+_NBSP_RE = re.compile(_NBSP)
+
+def formatar_percentual(valor: float) -> str:
+    """Mesmo formato dos cards do Status Invest: 10.31 -> "10,31%"."""
+    return f"{valor:.2f}".replace(".", ",") + "%"
+
+def numero(texto, extrair: bool = False) -> Tuple[Optional[float], bool]:
+    """(valor, percentual?) de um texto; (None, False) se não for número."""
+    if texto is None or isinstance(texto, bool):
+        return None, False
+    if isinstance(texto, (int, float)):
+        return (None, False) if texto != texto else (float(texto), False)  # NaN
+    texto = str(texto).replace("\u2212", "-")
+    if extrair:
+        m = _TOKEN_RE.search(_NBSP_RE.sub(" ", texto).replace("R$", ""))
+        if not m:
+            return None, False
+        texto = m.group(0)
+    texto = _IGNORAR_RE.sub("", texto)
+    percentual = texto.endswith("%")
+    if percentual:
+        texto = texto.rstrip("%")
+    if _BR_RE.fullmatch(texto):
+        return float(texto.replace(".", "").replace(",", ".")), percentual
+    if _PONTO_RE.fullmatch(texto):
+        return float(texto), percentual
+    return None, False
+
+def normalize_number(texto, extrair: bool = False) -> Union[float, str, None]:
+    """Contrato dos scrapers: float, "x,xx%" para percentuais ou None."""
+    valor, percentual = numero(texto, extrair)
+    if valor is None:
+        return None
+    return formatar_percentual(valor) if percentual else valor
+
+def normalizar_numeros(valores: Union["pd.Series", Iterable], extrair: bool = False) -> "pd.DataFrame":
+    """
+    Lote de textos -> DataFrame {valor: float64, percentual: bool}, mesmo índice da Series.
+
+    Cada passo é um kernel do pyarrow.compute sobre a coluna inteira (regex RE2,
+    substituições e o cast para float), sem loop em Python. Números (int/float)
+    entram pela sua representação em texto.
+    """
+    # Import tardio: os scrapers só usam o caminho escalar e não precisam carregar pandas/pyarrow
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype=object)
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        return pd.DataFrame({"valor": serie.astype("float64"), "percentual": False}, index=serie.index)
+    texto = pc.replace_substring(pa.array(serie.astype("string[pyarrow]")), "\u2212", "-")
+    if extrair:
+        texto = pc.replace_substring(pc.replace_substring_regex(texto, _NBSP, " "), "R$", "")
+        texto = pc.struct_field(pc.extract_regex(texto, f"(?P<n>{_TOKEN})"), [0])
+    texto = pc.replace_substring_regex(texto, _IGNORAR, "")
+    percentual = pc.ends_with(texto, "%")
+    texto = pc.utf8_rtrim(texto, "%")
+    br = pc.match_substring_regex(texto, f"^(?:{_BR})$")
+    ponto = pc.match_substring_regex(texto, f"^(?:{_PONTO})$")
+    sem_milhar = pc.replace_substring(pc.replace_substring(texto, ".", ""), ",", ".")
+    numeros = pc.if_else(pc.or_(br, ponto), pc.if_else(br, sem_milhar, texto), pa.scalar(None, pa.string()))
+    valor = pc.cast(numeros, pa.float64())
+    percentual = pc.fill_null(pc.and_(percentual, pc.is_valid(valor)), False)
+    return pd.DataFrame({"valor": valor.to_numpy(zero_copy_only=False),
+                         "percentual": percentual.to_numpy(zero_copy_only=False)}, index=serie.index)
@@ -0,0 +1,213 @@
+"""
+Saída colunar dos fundamentos em Parquet, particionada por data de coleta.
+
+Duas tabelas, cada uma num diretório com partições hive (data=AAAA-MM-DD/):
+
+  indicadores/  uma linha por ticker e coleta: ticker, coletado_em, um float64
+                por indicador (p_l, p_vp, dy, roe, ...) e os DYs de dividendos
+  proventos/    uma linha por provento de historico_12m: ticker, coletado_em,
+                data_pagamento, valor
+
+Os valores são convertidos por coluna, em lote (statusinvest_numeros):
+percentuais ("10,31%") viram o número em pontos percentuais (10.31). O ticker é
+gravado como dictionary (categórico no pandas). Cada gravação cria um arquivo
+novo na partição do dia, nada é reescrito.
+
+`carregar()` lê com memory map e filtros empurrados para o Parquet (partição e
+estatísticas dos row groups), então triagem de centenas de tickers x anos de
+coletas é um filtro vetorizado no DataFrame, não um loop por arquivos JSON.
+
+Config via env: STATUSINVEST_DADOS (padrão: ./dados)
+
+Uso:
+  python statusinvest_batch.py -f tickers.txt --parquet dados          # grava durante o lote
+  python statusinvest_parquet.py exportar saida_do_lote.jsonl           # JSON lines -> Parquet
+  python statusinvest_parquet.py triagem "dy >= 6 and p_l < 10" [--desde 2025-01-01]
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from statusinvest_indicadores import COLUNAS, chave_canonica
+from statusinvest_numeros import normalizar_numeros
+
+DADOS_DIR = os.environ.get(
+    "STATUSINVEST_DADOS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados"))
+
+# Chave do scraper -> coluna (campo "coluna" em indicadores.json)
+COLUNAS_INDICADORES = COLUNAS
+COLUNAS_DIVIDENDOS = ("dy_12m", "dy_medio_5a", "dy_medio_10a")
+
+_TICKER = pa.dictionary(pa.int32(), pa.string())
+_COLETADO = pa.timestamp("s")
+
+ESQUEMAS = {
+    "indicadores": pa.schema(
+        [("ticker", _TICKER), ("coletado_em", _COLETADO)]
+        + [(c, pa.float64()) for c in dict.fromkeys(COLUNAS_INDICADORES.values())]
+        + [(c, pa.float64()) for c in COLUNAS_DIVIDENDOS]
+    ),
+    "proventos": pa.schema([
+        ("ticker", _TICKER), ("coletado_em", _COLETADO),
+        ("data_pagamento", pa.date32()), ("valor", pa.float64()),
+    ]),
+}
+
+def linhas(data: dict, coletado_em: Optional[datetime] = None) -> dict:
+    """Resultado de um scraper -> {"indicadores": [linha], "proventos": [linhas]}, valores ainda brutos."""
+    coletado_em = (coletado_em or datetime.now()).replace(microsecond=0)
+    ticker = (data.get("ticker") or "").upper()
+    dividendos = data.get("dividendos") or {}
+    indicador = {"ticker": ticker, "coletado_em": coletado_em}
+    for chave, valor in (data.get("indicadores") or {}).items():
+        # chave_canonica: saídas antigas do caminho requests usavam "Dividend Yield"
+        coluna = COLUNAS_INDICADORES.get(chave_canonica(chave))
+        if coluna and indicador.get(coluna) in (None, "", "-"):
+            indicador[coluna] = valor
+    for chave in COLUNAS_DIVIDENDOS:
+        indicador[chave] = dividendos.get(chave)
+    proventos = []
+    for h in dividendos.get("historico_12m") or []:
+        try:
+            pagamento = datetime.strptime(h["data"], "%d/%m/%Y").date()
+        except (KeyError, TypeError, ValueError):
+            continue
+        proventos.append({"ticker": ticker, "coletado_em": coletado_em,
+                          "data_pagamento": pagamento, "valor": h.get("valor")})
+    return {"indicadores": [indicador], "proventos": proventos}
+
+class ExportadorParquet:
+    """
+    Acumula resultados dos scrapers e grava em lote, um arquivo por tabela e dia.
+
+    Use como context manager (grava ao sair) ou chame `gravar()`; com
+    `gravar_a_cada` > 0 grava sozinho a cada tantos tickers.
+    """
+
+    def __init__(self, diretorio: str = DADOS_DIR, gravar_a_cada: int = 0):
+        self.diretorio = diretorio
+        self.gravar_a_cada = gravar_a_cada
+        self._pendentes = {tabela: [] for tabela in ESQUEMAS}
+        self._tickers = 0
+        self.arquivos = []
+
+    def adicionar(self, data: dict, coletado_em: Optional[datetime] = None) -> None:
+        if "erro" in data or not data.get("ticker"):
+            return
+        for tabela, novas in linhas(data, coletado_em).items():
+            self._pendentes[tabela].extend(novas)
+        self._tickers += 1
+        if self.gravar_a_cada and self._tickers % self.gravar_a_cada == 0:
+            self.gravar()
+
+    def gravar(self) -> List[str]:
+        """Grava o que está pendente; devolve os arquivos criados."""
+        criados = []
+        for tabela, pendentes in self._pendentes.items():
+            if not pendentes:
+                continue
+            esquema = ESQUEMAS[tabela]
+            df = pd.DataFrame(pendentes)
+            for campo in esquema:
+                if pa.types.is_floating(campo.type) and campo.name in df:
+                    df[campo.name] = normalizar_numeros(df[campo.name])["valor"]
+            for dia, grupo in df.groupby(df["coletado_em"].dt.strftime("%Y-%m-%d")):
+                particao = os.path.join(self.diretorio, tabela, f"data={dia}")
+                os.makedirs(particao, exist_ok=True)
+                arquivo = os.path.join(particao, f"{uuid.uuid4().hex}.parquet")
+                t = pa.Table.from_pandas(grupo.reindex(columns=esquema.names), schema=esquema,
+                                         preserve_index=False)
+                pq.write_table(t, arquivo, compression="zstd")
+                criados.append(arquivo)
+            pendentes.clear()
+        self.arquivos += criados
+        return criados
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.gravar()
+
+def carregar(tabela: str = "indicadores", diretorio: str = DADOS_DIR, colunas: Optional[List[str]] = None,
+             tickers: Optional[Iterable[str]] = None, desde: Optional[str] = None,
+             ate: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lê uma tabela com memory map. `desde`/`ate` (AAAA-MM-DD) podam partições;
+    `tickers` filtra no Parquet. O ticker vem categórico.
+    """
+    caminho = os.path.join(diretorio, tabela)
+    if not os.path.isdir(caminho):
+        return ESQUEMAS[tabela].empty_table().to_pandas()
+    filtros = []
+    if desde:
+        filtros.append(("data", ">=", desde))
+    if ate:
+        filtros.append(("data", "<=", ate))
+    if tickers:
+        filtros.append(("ticker", "in", [t.upper() for t in tickers]))
+    particionamento = ds.partitioning(pa.schema([("data", pa.string())]), flavor="hive")
+    t = pq.read_table(caminho, columns=colunas, filters=filtros or None, memory_map=True,
+                      partitioning=particionamento, schema=ESQUEMAS[tabela].append(pa.field("data", pa.string())))
+    df = t.to_pandas()
+    return df.drop(columns="data", errors="ignore")
+
+def ultima_coleta(df: pd.DataFrame) -> pd.DataFrame:
+    """Linha mais recente de cada ticker."""
+    return (df.sort_values("coletado_em")
+              .drop_duplicates("ticker", keep="last")
+              .sort_values("ticker")
+              .reset_index(drop=True))
+
+def triagem(expressao: str, diretorio: str = DADOS_DIR, desde: Optional[str] = None,
+            todas: bool = False) -> pd.DataFrame:
+    """Filtra a tabela de indicadores com `DataFrame.query` (ex.: "dy >= 6 and p_l < 10").
+    Por padrão só a última coleta de cada ticker; `todas=True` filtra o histórico inteiro."""
+    df = carregar("indicadores", diretorio, desde=desde)
+    if not todas:
+        df = ultima_coleta(df)
+    return df.query(expressao) if expressao else df
+
+def _ler_json(arquivo: str) -> Iterable[dict]:
+    """Um JSON (saída de um scraper) ou JSON lines (saída do lote)."""
+    with (sys.stdin if arquivo == "-" else open(arquivo, encoding="utf-8")) as f:
+        texto = f.read()
+    try:
+        yield json.loads(texto)
+    except json.JSONDecodeError:
+        for linha in texto.splitlines():
+            if linha.strip().startswith("{"):
+                yield json.loads(linha)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fundamentos do Status Invest em Parquet")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    exp = sub.add_parser("exportar", help="JSON lines do lote (ou JSON de um scraper) -> Parquet")
+    exp.add_argument("arquivos", nargs="+", help='"-" lê do stdin')
+    tri = sub.add_parser("triagem", help="filtra a última coleta de cada ticker")
+    tri.add_argument("expressao", nargs="?", default="", help='ex.: "dy >= 6 and p_l < 10"')
+    tri.add_argument("--desde", help="AAAA-MM-DD")
+    tri.add_argument("--todas", action="store_true", help="filtra todas as coletas, não só a última")
+    parser.add_argument("--dados", default=DADOS_DIR, help=f"diretório (padrão {DADOS_DIR}, env STATUSINVEST_DADOS)")
+    args = parser.parse_args()
+
+    if args.comando == "exportar":
+        with ExportadorParquet(args.dados) as exportador:
+            for arquivo in args.arquivos:
+                for data in _ler_json(arquivo):
+                    exportador.adicionar(data)
+        print(f"{len(exportador.arquivos)} arquivo(s) em {args.dados}", file=sys.stderr)
+    else:
+        df = triagem(args.expressao, args.dados, args.desde, args.todas)
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(df.to_string(index=False))
+        print(f"{len(df)} linha(s)", file=sys.stderr)
@@ -0,0 +1,155 @@
+"""
+Parser offline da página de uma ação no Status Invest.
+
+Recebe o HTML bruto (de requests, de page.content() ou de um arquivo salvo pelo
+debug) e devolve a mesma estrutura dos scrapers:
+{ticker, url, titulo, setor, indicadores, dividendos}.
+
+O HTML é parseado uma única vez (lxml) e todos os extratores consultam a mesma árvore.
+"""
+import json
+import re
+import sys
+from typing import Dict, List, Optional
+
+import lxml.html
+
+from statusinvest_indicadores import REGISTRO, ROTULOS
+from statusinvest_numeros import numero
+
+# Rótulos dos cards do Status Invest para cada indicador: registro comum (indicadores.json)
+CARD_LABELS = ROTULOS
+
+DATE_RE = re.compile(r"\d{2}/\d{2}/\d{4}")
+DY_MEDIO_RE = re.compile(r"(?:dy|dividend yield).*?m[ée]dio.*?(\d+)\s*anos", re.IGNORECASE)
+
+_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+def _text(el) -> str:
+    return " ".join(el.text_content().split()) if el is not None else ""
+
+def _to_float(s: str) -> Optional[float]:
+    return numero(s)[0]
+
+class StatusInvestPage:
+    """Árvore do HTML parseada uma vez, com os cards (rótulo -> valor) indexados sob demanda."""
+
+    def __init__(self, html):
+        self.tree = lxml.html.fromstring(html)
+        self._cards = None
+
+    def xpath(self, expr: str) -> list:
+        return self.tree.xpath(expr)
+
+    @property
+    def cards(self) -> Dict[str, Optional[str]]:
+        """{rótulo em minúsculas: valor bruto} do primeiro card de cada rótulo ("-" vira None)."""
+        if self._cards is None:
+            self._cards = {}
+            for h3 in self.xpath(f"//h3[{_CLASS.format('title')}]"):
+                label = _text(h3).lower()
+                if not label or label in self._cards:
+                    continue
+                # O valor fica a no máximo 3 divs do título; mais longe já é outro card
+                box = h3.xpath(f"ancestor::div[position() <= 3][.//strong[{_CLASS.format('value')}]][1]")
+                if not box:
+                    continue
+                strong = box[0].xpath(f".//strong[{_CLASS.format('value')}]")[0]
+                raw = _text(strong)
+                icon = strong.getnext()
+                if icon is not None and "icon" in (icon.get("class") or "") and _text(icon) == "%":
+                    raw += "%"
+                self._cards[label] = raw if raw not in ("", "-", "-%") else None
+        return self._cards
+
+    def card(self, labels: List[str]) -> Optional[str]:
+        for label in labels:
+            raw = self.cards.get(label.lower())
+            if raw:
+                return raw
+        return None
+
+def parse_ticker(doc: StatusInvestPage) -> Optional[str]:
+    href = doc.xpath("//link[@rel='canonical']/@href")
+    return href[0].rstrip("/").rsplit("/", 1)[-1].upper() if href else None
+
+def parse_titulo(doc: StatusInvestPage) -> Optional[str]:
+    for tag in ("h1", "h2"):
+        el = doc.xpath(f"//{tag}")
+        if el and _text(el[0]):
+            return _text(el[0])
+    title = doc.xpath("//title")
+    return _text(title[0]) if title else None
+
+def parse_setor(doc: StatusInvestPage) -> Optional[str]:
+    el = doc.xpath(
+        f"//span[{_CLASS.format('sub-value')}][normalize-space()='Setor de Atuação']"
+        f"/following-sibling::*//strong[{_CLASS.format('value')}]"
+    )
+    return _text(el[0]) if el else None
+
+def parse_payout(doc: StatusInvestPage) -> Optional[str]:
+    el = doc.xpath("//*[@id='payout-section']//*[@data-item='actual_F']")
+    raw = _text(el[0]) if el else ""
+    return raw if raw and raw != "-" else None
+
+def parse_indicadores(doc: StatusInvestPage) -> Dict[str, Optional[float]]:
+    indicadores = {}
+    for key, labels in CARD_LABELS.items():
+        raw = doc.card(labels)
+        if raw is None and key == "Payout":
+            raw = parse_payout(doc)
+        indicadores[key] = REGISTRO[key].valor(raw) if raw else None
+    return indicadores
+
+def parse_historico(doc: StatusInvestPage, limite: int = 12) -> List[dict]:
+    """Linhas da tabela de proventos (Tipo | DATA COM | Pagamento | Valor)."""
+    historico = []
+    for table in doc.xpath("//table"):
+        header = [_text(th).lower() for th in table.xpath(".//tr[1]/th | .//thead//th")]
+        if "pagamento" not in header or "valor" not in header:
+            continue
+        i_data, i_valor = header.index("pagamento"), header.index("valor")
+        for row in table.xpath(".//tbody/tr | .//tr[td]"):
+            cells = [_text(td) for td in row.xpath("./td")]
+            if len(cells) <= max(i_data, i_valor) or not DATE_RE.match(cells[i_data]):
+                continue
+            valor = _to_float(cells[i_valor])
+            if valor is not None:
+                historico.append({"data": cells[i_data], "valor": valor})
+            if len(historico) >= limite:
+                break
+        break
+    return historico
+
+def parse_dividendos(doc: StatusInvestPage) -> dict:
+    dividendos = {
+        "dy_12m": _to_float(doc.card(["Dividend Yield"])),
+        "dy_medio_5a": None,
+        "dy_medio_10a": None,
+        "historico_12m": parse_historico(doc),
+    }
+    for label, raw in doc.cards.items():
+        m = DY_MEDIO_RE.search(label) if raw else None
+        if m and m.group(1) in ("5", "10"):
+            dividendos[f"dy_medio_{m.group(1)}a"] = _to_float(raw)
+    return dividendos
+
+def parse_html(html, ticker: Optional[str] = None) -> dict:
+    """Parseia o HTML uma vez e roda todos os extratores sobre a mesma árvore."""
+    doc = StatusInvestPage(html)
+    ticker = (ticker or parse_ticker(doc) or "").upper().strip()
+    return {
+        "ticker": ticker,
+        "url": f"https://statusinvest.com.br/acoes/{ticker.lower()}",
+        "titulo": parse_titulo(doc) or ticker,
+        "setor": parse_setor(doc),
+        "indicadores": parse_indicadores(doc),
+        "dividendos": parse_dividendos(doc),
+    }
+
+if __name__ == "__main__":
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "debug_bbas3_structure.html"
+    ticker = sys.argv[2] if len(sys.argv) > 2 else None
+    with open(arquivo, "rb") as f:
+        print(json.dumps(parse_html(f.read(), ticker), ensure_ascii=False, indent=2))
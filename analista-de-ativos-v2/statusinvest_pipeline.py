@@ -0,0 +1,212 @@
+"""
+Lote pelo caminho requests em duas etapas: busca assíncrona e parse em processos.
+
+  buscadores (asyncio + threads, `concorrencia`)  ->  fila limitada (bytes do HTML)
+      ->  parseadores (ProcessPoolExecutor, um por núcleo)  ->  resultados
+
+O parse (BeautifulSoup/lxml e as regex sobre o texto) é CPU e segura o GIL;
+rodando no mesmo loop que a rede, ele trava os buscadores. Aqui ele vai para
+outros processos e a fila limitada segura os buscadores quando o parse fica
+para trás (sem acumular HTML na memória). A concorrência da busca e o número
+de parseadores são independentes.
+
+Config via env:
+  STATUSINVEST_PARSERS   processos de parse (padrão: núcleos disponíveis)
+  STATUSINVEST_FILA      tamanho da fila entre as etapas (padrão: 2 x parsers)
+
+Uso: python statusinvest_pipeline.py BBAS3 ITUB4 [-c 8] [-p 4] [--extrator requests|parser]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional, Tuple
+
+from statusinvest_har import instalar_replay_requests
+from statusinvest_parser import parse_html
+from statusinvest_requests import CLIENTE_HTTP, HEADERS, extract_requests_html
+
+def _nucleos() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # respeita taskset/cgroups
+    except AttributeError:
+        return os.cpu_count() or 1
+
+PARSERS_PADRAO = int(os.environ.get("STATUSINVEST_PARSERS", 0)) or _nucleos()
+FILA_PADRAO = int(os.environ.get("STATUSINVEST_FILA", 0))  # 0: 2 x parsers
+
+def _extrair_parser(html: bytes, ticker: str, url: str) -> dict:
+    return parse_html(html, ticker)
+
+# Funções de módulo: vão por nome para os processos
+EXTRATORES = {
+    "requests": extract_requests_html,
+    "parser": _extrair_parser,
+}
+
+def baixar_html(ticker: str) -> Tuple[str, bytes]:
+    """Busca da página (sem decodificar): (url, bytes do HTML)."""
+    url = f"https://statusinvest.com.br/acoes/{ticker.lower()}"
+    r = CLIENTE_HTTP.get(url, headers=HEADERS, timeout=(5, 30))
+    r.raise_for_status()
+    return url, r.content
+
+def _parsear(extrator: str, html: bytes, ticker: str, url: str) -> Tuple[dict, float]:
+    """Roda no processo de parse. Devolve (dados, segundos de CPU gastos)."""
+    inicio = time.process_time()
+    data = EXTRATORES[extrator](html, ticker, url)
+    return data, time.process_time() - inicio
+
+class EstatisticasEtapa:
+    """Itens, bytes e tempo ocupado de uma etapa, mais a janela em que ela trabalhou."""
+
+    def __init__(self, nome: str, trabalhadores: int):
+        self.nome = nome
+        self.trabalhadores = trabalhadores
+        self.itens = 0
+        self.erros = 0
+        self.bytes = 0
+        self.ocupado_s = 0.0
+        self.inicio = None
+        self.fim = None
+
+    def registrar(self, inicio: float, ocupado_s: float, n_bytes: int = 0, erro: bool = False) -> None:
+        self.inicio = inicio if self.inicio is None else min(self.inicio, inicio)
+        self.fim = time.perf_counter()
+        self.itens += 1
+        self.erros += erro
+        self.bytes += n_bytes
+        self.ocupado_s += ocupado_s
+
+    def resumo(self) -> dict:
+        janela = (self.fim - self.inicio) if self.itens else 0.0
+        return {
+            "itens": self.itens,
+            "erros": self.erros,
+            "trabalhadores": self.trabalhadores,
+            "janela_s": round(janela, 3),
+            "itens_por_s": round(self.itens / janela, 2) if janela else None,
+            "mb_por_s": round(self.bytes / janela / 2**20, 2) if janela else None,
+            "ocupacao": round(self.ocupado_s / (janela * self.trabalhadores), 2) if janela else None,
+        }
+
+class EstatisticasPipeline:
+    def __init__(self, concorrencia: int, parsers: int):
+        self.busca = EstatisticasEtapa("busca", concorrencia)
+        self.parse = EstatisticasEtapa("parse", parsers)
+        self.fila_max = 0
+        self.espera_fila_s = 0.0  # tempo dos buscadores bloqueados na fila cheia
+
+    def resumo(self) -> dict:
+        return {"busca": self.busca.resumo(), "parse": self.parse.resumo(),
+                "fila_max": self.fila_max, "espera_fila_s": round(self.espera_fila_s, 3)}
+
+def formatar_resumo(resumo: dict) -> str:
+    linhas = []
+    for etapa in ("busca", "parse"):
+        r = resumo[etapa]
+        if not r["itens"]:
+            continue
+        linhas.append(f"{etapa}: {r['itens']} em {r['janela_s']:.2f}s ({r['itens_por_s']}/s, {r['mb_por_s']} MB/s), "
+                      f"{r['trabalhadores']} trabalhadores, ocupação {r['ocupacao']:.0%}")
+    linhas.append(f"fila: máximo {resumo['fila_max']}, buscadores esperando {resumo['espera_fila_s']:.2f}s")
+    return " | ".join(linhas)
+
+async def scrape_pipeline(tickers: Iterable[str], concorrencia: int = 4, parsers: int = PARSERS_PADRAO,
+                          fila: Optional[int] = None, extrator: str = "requests",
+                          baixar: Callable[[str], Tuple[str, bytes]] = baixar_html,
+                          estatisticas: Optional[EstatisticasPipeline] = None) -> AsyncIterator[dict]:
+    """
+    Busca `concorrencia` páginas por vez e parseia em `parsers` processos.
+
+    Devolve os resultados conforme terminam, cada um com `tempo_s` (da busca ao
+    fim do parse) e `erro` se falhou. Passe `estatisticas` para ler a vazão de
+    cada etapa no fim.
+    """
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    if not tickers:
+        return
+    concorrencia = max(1, min(concorrencia, len(tickers)))
+    parsers = max(1, min(parsers, len(tickers)))
+    stats = estatisticas or EstatisticasPipeline(concorrencia, parsers)
+    stats.busca.trabalhadores, stats.parse.trabalhadores = concorrencia, parsers
+    loop = asyncio.get_running_loop()
+    paginas = asyncio.Queue(maxsize=fila or FILA_PADRAO or 2 * parsers)
+    resultados = asyncio.Queue()
+    pendentes = iter(tickers)
+
+    # spawn: fork com as threads da busca já rodando pode herdar locks travados
+    processos = ProcessPoolExecutor(parsers, mp_context=multiprocessing.get_context("spawn"))
+    threads = ThreadPoolExecutor(concorrencia, thread_name_prefix="busca")
+
+    async def _buscador():
+        for ticker in pendentes:
+            inicio = time.perf_counter()
+            try:
+                url, html = await loop.run_in_executor(threads, baixar, ticker)
+            except Exception as e:
+                stats.busca.registrar(inicio, time.perf_counter() - inicio, erro=True)
+                await resultados.put({"ticker": ticker, "erro": str(e),
+                                      "tempo_s": round(time.perf_counter() - inicio, 3)})
+                continue
+            stats.busca.registrar(inicio, time.perf_counter() - inicio, len(html))
+            espera = time.perf_counter()
+            await paginas.put((ticker, url, html, inicio))
+            stats.espera_fila_s += time.perf_counter() - espera
+            stats.fila_max = max(stats.fila_max, paginas.qsize())
+
+    async def _parseador():
+        while True:
+            item = await paginas.get()
+            if item is None:
+                return
+            ticker, url, html, inicio = item
+            inicio_parse = time.perf_counter()
+            try:
+                data, cpu = await loop.run_in_executor(processos, _parsear, extrator, html, ticker, url)
+                stats.parse.registrar(inicio_parse, cpu, len(html))
+            except Exception as e:
+                stats.parse.registrar(inicio_parse, time.perf_counter() - inicio_parse, erro=True)
+                data = {"ticker": ticker, "erro": str(e)}
+            data["tempo_s"] = round(time.perf_counter() - inicio, 3)
+            await resultados.put(data)
+
+    async def _buscar_tudo():
+        await asyncio.gather(*(_buscador() for _ in range(concorrencia)))
+        for _ in range(parsers):
+            await paginas.put(None)
+
+    tarefas = [asyncio.create_task(_buscar_tudo())] + [asyncio.create_task(_parseador()) for _ in range(parsers)]
+    try:
+        for _ in tickers:
+            yield await resultados.get()
+    finally:
+        for t in tarefas:
+            t.cancel()
+        threads.shutdown(wait=False, cancel_futures=True)
+        processos.shutdown(wait=True, cancel_futures=True)
+
+async def _main(args) -> None:
+    instalar_replay_requests()  # STATUSINVEST_HAR definido: busca responde do HAR
+    stats = EstatisticasPipeline(args.concorrencia, args.parsers)
+    inicio = time.perf_counter()
+    async for data in scrape_pipeline(args.tickers, args.concorrencia, args.parsers, args.fila,
+                                      args.extrator, estatisticas=stats):
+        print(json.dumps(data, ensure_ascii=False), flush=True)
+    print(f"[pipeline] {len(args.tickers)} tickers em {time.perf_counter() - inicio:.2f}s | "
+          f"{formatar_resumo(stats.resumo())}", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca assíncrona + parse em processos (caminho requests)")
+    parser.add_argument("tickers", nargs="+", help="ex.: BBAS3 ITUB4")
+    parser.add_argument("-c", "--concorrencia", type=int, default=4, help="buscas simultâneas")
+    parser.add_argument("-p", "--parsers", type=int, default=PARSERS_PADRAO,
+                        help=f"processos de parse (padrão {PARSERS_PADRAO}, env STATUSINVEST_PARSERS)")
+    parser.add_argument("--fila", type=int, default=None, help="tamanho da fila (padrão 2 x parsers)")
+    parser.add_argument("--extrator", choices=sorted(EXTRATORES), default="requests",
+                        help="requests: extract_requests_html (bs4); parser: statusinvest_parser")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,186 @@
+"""
+Prontidão da página do Status Invest orientada a eventos (sem esperas fixas).
+
+Em vez de `wait_for_timeout`, um MutationObserver no browser confere, a cada
+lote de mutações do DOM (o HTML inicial e o que chega depois por XHR), se os
+cards pedidos já têm valor: o rótulo num nó de texto e algum número no
+container (div/li/tr/td) dele ou no de cima. Cards vazios ("P/L -") não contam.
+
+A espera termina assim que todos os campos aparecem ou quando o prazo acaba;
+nesse caso devolve o que faltou e o scraper segue com o resultado parcial.
+
+Prazo total (navegação + prontidão) via env STATUSINVEST_PRAZO_S (padrão 30 s).
+"""
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+import lxml.html
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from statusinvest_indicadores import ESSENCIAIS
+
+PRAZO_MS = float(os.environ.get("STATUSINVEST_PRAZO_S", 30)) * 1000
+
+# Cards que existem em toda página de ação (ROIC, Margem EBITDA etc. faltam nos bancos):
+# os marcados como "essencial" em indicadores.json
+CAMPOS_ESSENCIAIS = ESSENCIAIS
+
+# Linhas da tabela de proventos (seção #earning-section)
+SELETOR_PROVENTOS = "#earning-section table tr"
+
+# Resolve com {pronto, faltando, ms, verificacoes}. As verificações são agrupadas
+# (no máximo uma a cada `intervalo` ms) para não varrer o DOM a cada mutação.
+PRONTIDAO_JS = """
+({campos, prazo, intervalo}) => new Promise((resolve) => {
+  const inicio = performance.now();
+  const norm = (t) => (t || "").replace(/\\s+/g, " ").trim().toLowerCase();
+  const skip = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+  const pendentes = new Map(Object.entries(campos).map(([k, ls]) => [k, ls.map(norm)]));
+  let verificacoes = 0, agendada = null, observer = null, limite = null;
+
+  const temValor = (el) => {
+    let box = el;
+    for (let nivel = 0; nivel < 2 && box; nivel++) {
+      box = box.closest("div, li, tr, td");
+      if (!box) return false;
+      if (/\\d/.test(box.textContent)) return true;
+      box = box.parentElement;
+    }
+    return false;
+  };
+
+  const verificar = () => {
+    agendada = null;
+    verificacoes++;
+    const raiz = document.body || document.documentElement;
+    const walker = document.createTreeWalker(raiz, NodeFilter.SHOW_TEXT);
+    for (let no = walker.nextNode(); no && pendentes.size; no = walker.nextNode()) {
+      const el = no.parentElement;
+      if (!el || skip.has(el.tagName)) continue;
+      const texto = norm(no.nodeValue);
+      if (!texto) continue;
+      for (const [campo, rotulos] of pendentes) {
+        if (rotulos.some((l) => texto === l || texto.startsWith(l + " ")) && temValor(el)) {
+          pendentes.delete(campo);
+        }
+      }
+    }
+    if (!pendentes.size) terminar(true);
+  };
+
+  const terminar = (pronto) => {
+    if (observer === null) return;
+    observer.disconnect();
+    observer = null;
+    clearTimeout(limite);
+    clearTimeout(agendada);
+    resolve({pronto, faltando: Array.from(pendentes.keys()),
+             ms: Math.round(performance.now() - inicio), verificacoes});
+  };
+
+  observer = new MutationObserver(() => {
+    if (agendada === null) agendada = setTimeout(verificar, intervalo);
+  });
+  observer.observe(document, {childList: true, subtree: true, characterData: true});
+  limite = setTimeout(() => { verificar(); terminar(false); }, Math.max(0, prazo));
+  verificar();
+})
+"""
+
+_ESPACOS = re.compile(r"\s+")
+_DIGITO = re.compile(r"[0-9]")  # o \d do JS: só dígitos ASCII
+_PULAR = {"script", "style", "noscript", "template"}
+_CONTAINERS = {"div", "li", "tr", "td"}
+
+def _norm(texto: str) -> str:
+    return _ESPACOS.sub(" ", texto or "").strip().lower()
+
+def _container(el):
+    """el.closest("div, li, tr, td") do lxml (inclui o próprio el)."""
+    while el is not None and el.tag not in _CONTAINERS:
+        el = el.getparent()
+    return el
+
+def _tem_valor(el) -> bool:
+    box = el
+    for _ in range(2):
+        box = _container(box)
+        if box is None:
+            return False
+        if _DIGITO.search(box.text_content()):
+            return True
+        box = box.getparent()
+    return False
+
+def _nos_de_texto(el):
+    """(elemento pai, texto) na ordem do documento, como o TreeWalker de SHOW_TEXT."""
+    if not isinstance(el.tag, str) or el.tag in _PULAR:
+        return
+    if el.text:
+        yield el, el.text
+    for filho in el:
+        yield from _nos_de_texto(filho)
+        if filho.tail:
+            yield el, filho.tail
+
+def campos_prontos_html(html: str, campos: Optional[Dict[str, List[str]]] = None) -> dict:
+    """A mesma regra do PRONTIDAO_JS aplicada a um HTML estático (lxml, sem browser):
+    {campo: texto do rótulo achado} e a lista do que falta. Serve para conferir uma
+    página salva e o JS contra ela (verifica_prontidao.py)."""
+    campos = CAMPOS_ESSENCIAIS if campos is None else campos
+    pendentes = {k: [_norm(r) for r in rotulos] for k, rotulos in campos.items()}
+    doc = lxml.html.fromstring(html)
+    raiz = doc.find("body") if doc.find("body") is not None else doc
+    achados = {}
+    for el, texto in _nos_de_texto(raiz):
+        if not pendentes:
+            break
+        texto = _norm(texto)
+        if not texto:
+            continue
+        for campo, rotulos in list(pendentes.items()):
+            if any(texto == r or texto.startswith(r + " ") for r in rotulos) and _tem_valor(el):
+                achados[campo] = texto
+                del pendentes[campo]
+    return {"achados": achados, "faltando": list(pendentes)}
+
+async def aguardar_prontidao(page, campos: Optional[Dict[str, List[str]]] = None,
+                             prazo_ms: float = PRAZO_MS, intervalo_ms: int = 50) -> dict:
+    """Espera os `campos` ({nome: [rótulos]}) terem valor na página, até `prazo_ms`.
+    Não levanta por prazo: devolve {"pronto", "faltando", "ms", "verificacoes"}."""
+    campos = CAMPOS_ESSENCIAIS if campos is None else campos
+    try:
+        return await page.evaluate(PRONTIDAO_JS, {"campos": campos, "prazo": max(0, prazo_ms),
+                                                  "intervalo": intervalo_ms})
+    except Exception as e:
+        # ex.: a página navegou no meio da espera e o contexto JS foi destruído
+        return {"pronto": False, "faltando": list(campos), "ms": None, "verificacoes": 0,
+                "erro": str(e)}
+
+async def carregar(page, url: str, campos: Optional[Dict[str, List[str]]] = None,
+                   prazo_ms: float = PRAZO_MS) -> dict:
+    """goto até o DOM pronto + aguardar_prontidao, tudo dentro de um único prazo.
+    Se o próprio goto estourar o prazo, confere o que já chegou: com ao menos um
+    campo segue com o resultado parcial; sem nenhum, levanta o timeout (página
+    não carregou, e quem chamou pode cair no fallback em vez de guardar um vazio)."""
+    campos = CAMPOS_ESSENCIAIS if campos is None else campos
+    inicio = time.monotonic()
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=prazo_ms)
+    except PlaywrightTimeoutError:
+        prontidao = await aguardar_prontidao(page, campos, 0)
+        if len(prontidao["faltando"]) >= len(campos):
+            raise
+        prontidao["erro"] = "navegação estourou o prazo"
+        return prontidao
+    restante = prazo_ms - (time.monotonic() - inicio) * 1000
+    return await aguardar_prontidao(page, campos, restante)
+
+def avisar_parcial(ticker: str, prontidao: dict) -> None:
+    """Avisa no stderr quando o prazo acabou sem todos os campos (o resultado sai parcial)."""
+    if not prontidao.get("pronto"):
+        motivo = prontidao.get("erro") or "prazo esgotado"
+        print(f"⚠️ {ticker}: {motivo}; faltando {', '.join(prontidao['faltando'])}", file=sys.stderr)
@@ -1,27 +1,32 @@
 import json
+import os
 import re
-import requests
+import sys
 from bs4 import BeautifulSoup
 
-NUM_RE = re.compile(r"-?\d{1,3}([.\s]\d{3})*(,\d+)?%?|-?\d+,\d+%?")
+from statusinvest_dy import extract_dy
+from statusinvest_indicadores import LABEL_MATCHER, ROTULOS, lower_text
+from statusinvest_numeros import numero
+from statusinvest_parser import parse_html
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import CLIENTE_HTTP
+
+# Mude a versão quando a extração mudar: invalida o cache em disco (statusinvest_cache)
+SCRAPER_VERSION = "3"
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127 Safari/537.36",
     "Accept-Language": "pt-BR,pt;q=0.9"
 }
 
-def normalize_number(s):
-    if not s: return None
-    s = s.strip()
-    if s.endswith("%"): return s
-    s = s.replace(".", "").replace(" ", "").replace("\xa0","").replace(",", ".")
-    try:
-        return float(s)
-    except:
-        return None
+def extract_number_from_text(text):
+    """Extrai o número de uma célula (sem R$ e %)."""
+    return numero(text)[0]
 
-def scrape_dividend_history_requests(soup, ticker):
-    """Captura histórico de dividendos usando requests/BeautifulSoup"""
+def scrape_dividend_history_requests(soup, ticker, text_content=None):
+    """Captura histórico de dividendos usando requests/BeautifulSoup.
+    `text_content`: texto da página já em minúsculas (evita refazer o get_text)."""
     try:
         dividend_data = {
             "dy_12m": None,
@@ -31,25 +36,11 @@ def scrape_dividend_history_requests(soup, ticker):
         }
         
         # Procurar por textos com DY e períodos
-        text_content = soup.get_text().lower()
-        
-        # Regex para capturar DY com períodos
-        import re
+        if text_content is None:
+            text_content = soup.get_text(" ", strip=True).lower()
         
-        # DY 12 meses
-        dy_12m_match = re.search(r'dy.*12.*meses?.*?(\d+[,.]?\d*)', text_content)
-        if dy_12m_match:
-            dividend_data["dy_12m"] = float(dy_12m_match.group(1).replace(',', '.'))
-            
-        # DY médio 5 anos
-        dy_5a_match = re.search(r'dy.*5.*anos?.*?(\d+[,.]?\d*)', text_content)
-        if dy_5a_match:
-            dividend_data["dy_medio_5a"] = float(dy_5a_match.group(1).replace(',', '.'))
-            
-        # DY médio 10 anos
-        dy_10a_match = re.search(r'dy.*10.*anos?.*?(\d+[,.]?\d*)', text_content)
-        if dy_10a_match:
-            dividend_data["dy_medio_10a"] = float(dy_10a_match.group(1).replace(',', '.'))
+        # DY 12 meses / médio 5 e 10 anos: só em janelas curtas perto dos rótulos
+        dividend_data.update(extract_dy(text_content))
             
         # Procurar tabelas de histórico
         tables = soup.find_all('table')
@@ -84,41 +75,36 @@ def scrape_dividend_history_requests(soup, ticker):
             "historico_12m": []
         }
 
-def scrape_statusinvest_requests(ticker="bbas3"):
+def fetch_html(ticker="bbas3"):
+    """Baixa o HTML da página do ticker (sem browser). Retorna (url, html)."""
     url = f"https://statusinvest.com.br/acoes/{ticker.lower()}"
-    r = requests.get(url, headers=HEADERS, timeout=30)
+    r = CLIENTE_HTTP.get(url, headers=HEADERS, timeout=(5, 30))
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
+    return url, r.text
+
+def scrape_statusinvest_parser(ticker="bbas3"):
+    """Baixa o HTML com requests e extrai tudo com o parser offline."""
+    _, html = fetch_html(ticker)
+    return parse_html(html, ticker)
+
+# Rótulos, unidade e faixa de cada indicador vêm do registro (indicadores.json)
+LABELS_MAP = ROTULOS
+
+def extract_requests_html(html, ticker="bbas3", url=None):
+    """Extração do caminho requests/bs4 a partir do HTML já baixado."""
+    url = url or f"https://statusinvest.com.br/acoes/{ticker.lower()}"
+    soup = BeautifulSoup(html, "lxml")
 
     h = soup.find(["h1","h2"])
     titulo = h.get_text(strip=True) if h else ticker.upper()
 
-    labels_map = {
-        "P/L": ["P/L", "Preço/Lucro"],
-        "P/VP": ["P/VP", "Preço/Valor Patrimonial"],
-        "Dividend Yield": ["Dividend", "Dividend Yield", "Dividendo"],
-        "ROE": ["ROE"],
-        "ROIC": ["ROIC"],
-        "Margem Líquida": ["Margem Líquida"],
-        "Dív. Líq/EBITDA": ["Dívida Líquida / EBITDA", "DL/EBITDA"]
-    }
-
-    indicadores = {}
+    # Texto da página extraído e passado para minúsculas uma única vez
     text = soup.get_text(" ", strip=True)
-    for key, variants in labels_map.items():
-        val = None
-        for label in variants:
-            i = text.lower().find(label.lower())
-            if i != -1:
-                snippet = text[max(0, i-60): i+160]
-                m = NUM_RE.search(snippet)
-                if m:
-                    val = m.group(0)
-                    break
-        indicadores[key] = normalize_number(val) if val else None
+    lowered = lower_text(text)
+    indicadores = LABEL_MATCHER.extract(text, lowered)
 
     # Adicionar captura de dividendos
-    dividend_history = scrape_dividend_history_requests(soup, ticker)
+    dividend_history = scrape_dividend_history_requests(soup, ticker, text_content=lowered)
     
     data = {
         "ticker": ticker,
@@ -130,7 +116,11 @@ def scrape_statusinvest_requests(ticker="bbas3"):
     
     return data
 
+def scrape_statusinvest_requests(ticker="bbas3"):
+    url, html = fetch_html(ticker)
+    return extract_requests_html(html, ticker, url)
+
 if __name__ == "__main__":
-    import sys
     t = sys.argv[1] if len(sys.argv) > 1 else "bbas3"
-    print(json.dumps(scrape_statusinvest_requests(t), ensure_ascii=False, indent=2))
+    scrape = scrape_statusinvest_parser if "--parser" in sys.argv else scrape_statusinvest_requests
+    print(json.dumps(scrape(t), ensure_ascii=False, indent=2))
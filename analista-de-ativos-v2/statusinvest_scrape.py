@@ -1,39 +1,25 @@
 import asyncio
 import json
-import re
 from typing import Dict, Optional, List
 
 from playwright.async_api import async_playwright
 
-LABELS_PT = {
-    "P/L": ["P/L", "Preço/Lucro"],
-    "P/VP": ["P/VP", "Preço/Valor Patrimonial"],
-    "DY": ["Dividend", "Dividend Yield", "Dividendo"],
-    "ROE": ["ROE", "Return on Equity"],
-    "ROIC": ["ROIC"],
-    "Margem Líquida": ["Margem Líquida", "Net Margin"],
-    "Margem EBITDA": ["Margem EBITDA", "EBITDA Margin"],
-    "Crescimento Lucros": ["Crescimento de Lucros", "Cresc. Lucro"],
-    "Dív. Líq/EBITDA": ["Dívida Líquida / EBITDA", "Divida Liquida / EBITDA", "DL/EBITDA"],
-    "Payout": ["Payout"],
-}
+from statusinvest_bloqueio import avisar_rede, instalar_filtro
+from statusinvest_har import instalar_replay
+from statusinvest_indicadores import REGISTRO, ROTULOS, Indicador
+from statusinvest_numeros import numero
+from statusinvest_parser import parse_html
+from statusinvest_prontidao import PRAZO_MS, SELETOR_PROVENTOS, avisar_parcial, carregar
 
-NUM_RE = re.compile(r"-?\d{1,3}([.\s]\d{3})*(,\d+)?%?|-?\d+,\d+%?")
+# Mude a versão quando a extração mudar: invalida o cache em disco (statusinvest_cache)
+SCRAPER_VERSION = "3"
 
-def normalize_number(s: str) -> Optional[float]:
-    if not s:
-        return None
-    s = s.strip()
-    if s.endswith('%'):
-        return s
-    s = s.replace('.', '').replace(' ', '').replace('\xa0', '').replace(',', '.')
-    try:
-        return float(s)
-    except:
-        return None
+# Rótulos, unidade e faixa de cada indicador vêm do registro (indicadores.json)
+LABELS_PT = ROTULOS
 
-async def extract_by_labels(page, label_candidates: List[str]) -> Optional[str]:
-    for label in label_candidates:
+async def extract_by_labels(page, indicador: Indicador) -> Optional[float]:
+    """Primeiro valor válido para o indicador (unidade e faixa do registro) perto de um dos rótulos."""
+    for label in indicador.rotulos:
         locator = page.locator(
             "xpath=//*[contains(translate(normalize-space(text()), "
             "'ABCDEFGHIJKLMNOPQRSTUVWXYZÁÂÃÀÉÊÍÓÔÕÚÇ', "
@@ -48,18 +34,96 @@ async def extract_by_labels(page, label_candidates: List[str]) -> Optional[str]:
                 text = await box.inner_text()
             except:
                 continue
-            m = NUM_RE.search(text)
-            if m:
-                return m.group(0).strip()
+            value = indicador.primeiro_valor(text)
+            if value is not None:
+                return value
+    return None
+
+# Uma única ida ao browser: percorre o DOM e devolve, para cada rótulo,
+# o texto dos containers dos elementos que o contêm (em ordem de documento).
+#  - smallest=false: compara só o 1º nó de texto do elemento (igual ao XPath de extract_by_labels)
+#  - smallest=true: compara o texto completo e fica só com o elemento mais interno
+#    (igual aos seletores "text=/.../i" do scraper v2)
+SNAPSHOT_JS = """
+({labels, containers, smallest, prop}) => {
+  const norm = (t) => (t || "").replace(/\\s+/g, " ").trim().toLowerCase();
+  const skip = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+  const out = {};
+  for (const l of labels) out[l] = [];
+  const cache = new Map();
+  const boxText = (el) => {
+    const box = el.parentElement ? el.parentElement.closest(containers) : null;
+    if (!box) return null;
+    if (!cache.has(box)) cache.set(box, box[prop]);
+    return cache.get(box);
+  };
+  const full = new Map();
+  const fullText = (el) => {
+    if (!full.has(el)) full.set(el, norm(el.textContent));
+    return full.get(el);
+  };
+  for (const el of document.querySelectorAll("*")) {
+    if (skip.has(el.tagName)) continue;
+    let own;
+    if (smallest) {
+      own = fullText(el);
+    } else {
+      const node = Array.from(el.childNodes).find((n) => n.nodeType === Node.TEXT_NODE);
+      own = node ? norm(node.nodeValue) : "";
+    }
+    if (!own) continue;
+    for (const l of labels) {
+      if (!own.includes(l)) continue;
+      if (smallest && Array.from(el.children).some((c) => !skip.has(c.tagName) && fullText(c).includes(l))) continue;
+      const t = boxText(el);
+      if (t !== null) out[l].push(t);
+    }
+  }
+  return out;
+}
+"""
+
+async def snapshot_labels(page, labels: List[str], containers: str = "div, li, tr",
+                          smallest: bool = False, prop: str = "innerText") -> Dict[str, List[str]]:
+    """Retorna {rótulo em minúsculas: [texto do container, ...]} com um único page.evaluate."""
+    labels = sorted({l.lower() for l in labels})
+    return await page.evaluate(
+        SNAPSHOT_JS,
+        {"labels": labels, "containers": containers, "smallest": smallest, "prop": prop},
+    )
+
+def match_labels(snapshot: Dict[str, List[str]], indicador: Indicador) -> Optional[float]:
+    """Mesma regra de extract_by_labels, aplicada em Python sobre o snapshot."""
+    for label in indicador.rotulos:
+        for text in snapshot.get(label.lower(), []):
+            value = indicador.primeiro_valor(text)
+            if value is not None:
+                return value
     return None
 
+async def extract_indicators_snapshot(page) -> Dict[str, Optional[float]]:
+    """Extrai todos os indicadores de LABELS_PT com uma única ida ao browser."""
+    snapshot = await snapshot_labels(page, [l for variants in LABELS_PT.values() for l in variants])
+    indicadores = {}
+    for key in LABELS_PT:
+        indicadores[key] = match_labels(snapshot, REGISTRO[key])
+    return indicadores
+
+async def extract_indicators_locators(page) -> Dict[str, Optional[float]]:
+    """Extração antiga: um locator por variante de rótulo (várias idas ao browser)."""
+    indicadores = {}
+    for key in LABELS_PT:
+        indicadores[key] = await extract_by_labels(page, REGISTRO[key])
+    return indicadores
+
+EXTRACTORS = {
+    "snapshot": extract_indicators_snapshot,
+    "locators": extract_indicators_locators,
+}
+
 def extract_number_from_text(text: str) -> Optional[float]:
-    """Extrai o primeiro número válido de um texto."""
-    text = text.replace('R$', '').replace('%', '').strip()
-    try:
-        return normalize_number(text)
-    except:
-        return None
+    """Número do texto (sem R$ e %), ou None se o texto não for só o número."""
+    return numero(text)[0]
 
 async def scrape_dividend_history(page, ticker):
     """Captura histórico de dividendos e DY médios"""
@@ -108,7 +172,10 @@ async def scrape_dividend_history(page, ticker):
             dividend_tab = page.locator("text=/dividendos?/i").first
             if await dividend_tab.is_visible():
                 await dividend_tab.click()
-                await page.wait_for_timeout(2000)
+                try:
+                    await page.wait_for_selector(SELETOR_PROVENTOS, state="attached", timeout=5000)
+                except:
+                    pass
                 
                 # Capturar tabela de histórico
                 dividend_rows = page.locator("table tr:has-text('/')")  # linhas com datas
@@ -151,91 +218,103 @@ async def scrape_dividend_history(page, ticker):
             "historico_12m": []
         }
 
-async def scrape_statusinvest_acao(ticker: str) -> dict:
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+]
+
+CONTEXT_OPTIONS = {
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/127 Safari/537.36"
+    ),
+    "locale": "pt-BR",
+    "viewport": {"width": 1366, "height": 768},
+}
+
+async def launch_browser(p):
+    """Abre o Chromium headless com as flags usadas pelo scraper."""
+    return await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+
+async def new_context(browser):
+    """Cria um contexto (UA, locale, viewport, bloqueio de recursos) pronto para o Status Invest."""
+    ctx = await browser.new_context(**CONTEXT_OPTIONS)
+    # Replay de HAR se STATUSINVEST_HAR estiver definido (statusinvest_har)
+    await instalar_replay(ctx)
+    # Imagens, fontes e rastreadores (statusinvest_bloqueio)
+    await instalar_filtro(ctx)
+    return ctx
+
+async def scrape_page(page, ticker: str, modo: str = "snapshot",
+                      campos: Optional[dict] = None, prazo_ms: float = PRAZO_MS) -> dict:
     """
-    Faz scraping da página de uma ação na Status Invest.
+    Faz o scraping de um ticker usando uma página já aberta.
+    Permite reaproveitar o mesmo browser/contexto entre vários tickers.
+    `modo` escolhe a extração: "snapshot" (padrão), "locators" ou "parser"
+    (o browser só busca o HTML, que é parseado offline por statusinvest_parser).
+    A espera acaba quando os `campos` (padrão: CAMPOS_ESSENCIAIS) têm valor ou,
+    no fim de `prazo_ms`, com resultado parcial (statusinvest_prontidao).
     """
     ticker = ticker.upper().strip()
     url = f"https://statusinvest.com.br/acoes/{ticker.lower()}"
-    
-    async with async_playwright() as p:
-        try:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    "--disable-dev-shm-usage",
-                    "--no-sandbox",
-                    "--disable-gpu",
-                    "--disable-software-rasterizer",
-                ],
-            )
-            ctx = await browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/127 Safari/537.36"
-                ),
-                locale="pt-BR",
-                viewport={"width": 1366, "height": 768},
-            )
-            page = await ctx.new_page()
 
-            # Bloqueia recursos que atrapalham o 'idle' e só pesam
-            async def _route(route, request):
-                u = request.url
-                if any(u.endswith(ext) for ext in (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".woff", ".woff2")):
-                    return await route.abort()
-                if any(h in u for h in ("googletagmanager.com", "google-analytics.com", "doubleclick.net", "hotjar", "segment.io")):
-                    return await route.abort()
-                return await route.continue_()
-            await page.route("**/*", _route)
+    # Carrega até DOM pronto ('networkidle' é instável em sites com long-polling)
+    # e espera os cards de indicadores ganharem valor
+    prontidao = await carregar(page, url, campos, prazo_ms)
+    avisar_parcial(ticker, prontidao)
 
-            # Carrega até DOM pronto; 'networkidle' é instável em sites com long-polling
-            await page.goto(url, wait_until="domcontentloaded", timeout=180000)
+    if modo == "parser":
+        return parse_html(await page.content(), ticker)
 
-            # Espera por um elemento que comprove que a página carregou os indicadores
-            try:
-                await page.wait_for_selector("text=/P\\/L|Preço\\/Lucro/i", timeout=120000)
-            except:
-                # como fallback, espere o título
-                await page.wait_for_selector("h1, h2", timeout=60000)
+    # título / setor (heurística simples)
+    try:
+        titulo = await page.locator("h1, h2").first.inner_text()
+    except:
+        titulo = ticker.upper()
 
-            # título / setor (heurística simples)
-            try:
-                titulo = await page.locator("h1, h2").first.inner_text()
-            except:
-                titulo = ticker.upper()
+    setor = None
+    try:
+        chips = page.locator("a, span")
+        n = await chips.count()
+        n = min(200, n)
+        for i in range(n):
+            t = await chips.nth(i).inner_text()
+            if any(k in t.lower() for k in ["setor", "bancos", "energia", "utilidades", "consumo", "imobiliário", "industrial", "financeiro"]):
+                setor = t.strip()
+                break
+    except:
+        pass
 
-            setor = None
-            try:
-                chips = page.locator("a, span")
-                n = await chips.count()
-                n = min(200, n)
-                for i in range(n):
-                    t = await chips.nth(i).inner_text()
-                    if any(k in t.lower() for k in ["setor", "bancos", "energia", "utilidades", "consumo", "imobiliário", "industrial", "financeiro"]):
-                        setor = t.strip()
-                        break
-            except:
-                pass
+    indicadores = await EXTRACTORS[modo](page)
 
-            indicadores = {}
-            for key, variants in LABELS_PT.items():
-                raw = await extract_by_labels(page, variants)
-                indicadores[key] = normalize_number(raw) if raw else None
+    # Capturar histórico de dividendos
+    dividend_history = await scrape_dividend_history(page, ticker)
+
+    return {
+        "ticker": ticker,
+        "url": url,
+        "titulo": titulo,
+        "setor": setor,
+        "indicadores": indicadores,
+        "dividendos": dividend_history  # Nova seção
+    }
+
+async def scrape_statusinvest_acao(ticker: str) -> dict:
+    """
+    Faz scraping da página de uma ação na Status Invest.
+    """
+    async with async_playwright() as p:
+        try:
+            browser = await launch_browser(p)
+            ctx = await new_context(browser)
+            page = await ctx.new_page()
+
+            data = await scrape_page(page, ticker)
+            await avisar_rede(data["ticker"], page)
 
-            # Capturar histórico de dividendos
-            dividend_history = await scrape_dividend_history(page, ticker)
-            
-            data = {
-                "ticker": ticker,
-                "url": url,
-                "titulo": titulo,
-                "setor": setor,
-                "indicadores": indicadores,
-                "dividendos": dividend_history  # Nova seção
-            }
-            
             await browser.close()
             return data
             
@@ -1,62 +1,36 @@
 import asyncio
 import json
 import re
+import time
 from typing import Dict, Optional, List
 from playwright.async_api import async_playwright
 
-async def wait_for_page_load(page):
-    """Aguarda o carregamento completo da página"""
-    try:
-        # Aguarda por indicadores específicos do Status Invest
-        await page.wait_for_selector("text=/P\\/L|DY|ROE/i", timeout=30000)
-        await page.wait_for_timeout(3000)  # Aguarda um pouco mais para AJAX
-    except:
-        await page.wait_for_timeout(5000)
+from statusinvest_bloqueio import avisar_rede, instalar_filtro
+from statusinvest_dy import extract_dy
+from statusinvest_har import instalar_replay
+from statusinvest_indicadores import REGISTRO, ROTULOS, Indicador
+from statusinvest_numeros import normalize_number
+from statusinvest_prontidao import (PRAZO_MS, SELETOR_PROVENTOS, avisar_parcial,
+                                    carregar)
+from statusinvest_scrape import SNAPSHOT_JS, snapshot_labels
 
 def extract_number_from_string(text: str) -> Optional[float]:
-    """Extrai número de uma string, lidando com formatos brasileiros"""
-    if not text:
-        return None
-    
-    # Remove caracteres não numéricos, mantendo pontos, vírgulas e sinais
-    text = re.sub(r'[^\d,.\-+%]', '', text.strip())
-    
-    if '%' in text:
-        # Retorna como string se for porcentagem
-        return text
-    
-    # Converte formato brasileiro (1.234,56) para float
-    if ',' in text and '.' in text:
-        # Formato: 1.234,56
-        text = text.replace('.', '').replace(',', '.')
-    elif ',' in text and text.count(',') == 1:
-        # Formato: 123,56
-        text = text.replace(',', '.')
-    
-    try:
-        return float(text)
-    except:
-        return None
+    """Primeiro número da string em formato brasileiro; percentual volta como "x,xx%"."""
+    return normalize_number(text, extrair=True)
+
+# Rótulos, unidade e faixa de cada indicador vêm do registro (indicadores.json)
+INDICATOR_MAPPINGS = ROTULOS
+
+def _value_from_container(parent_text: str, indicador: Indicador) -> Optional[float]:
+    """Pega o último número válido do container (geralmente é o valor)"""
+    return indicador.primeiro_valor(parent_text, ultimo=True)
 
 async def scrape_basic_indicators(page) -> Dict:
     """Scraping dos indicadores básicos"""
     indicators = {}
     
-    # Mapeamento mais específico baseado no Status Invest
-    mappings = {
-        "P/L": ["P/L", "Preço/Lucro"],
-        "P/VP": ["P/VP", "Preço/Valor Patrimonial"],
-        "DY": ["DY", "Dividend Yield", "Div. Yield"],
-        "ROE": ["ROE"],
-        "ROIC": ["ROIC"],
-        "Margem Líquida": ["Margem Líquida", "Marg. Líquida"],
-        "Margem EBITDA": ["Margem EBITDA", "Marg. EBITDA"],
-        "Dív. Líq/EBITDA": ["Dív. Líq./EBITDA", "Divida Liquida/EBITDA"],
-        "Payout": ["Payout"]
-    }
-    
     # Procurar em diferentes estruturas do Status Invest
-    for key, labels in mappings.items():
+    for key, labels in INDICATOR_MAPPINGS.items():
         value = None
         
         for label in labels:
@@ -74,12 +48,9 @@ async def scrape_basic_indicators(page) -> Dict:
                         parent_text = await parent.text_content()
                         
                         # Extrair número do texto
-                        numbers = re.findall(r'-?\d{1,3}(?:[.\s]\d{3})*(?:,\d+)?%?', parent_text)
-                        if numbers:
-                            # Pegar o último número encontrado (geralmente é o valor)
-                            value = extract_number_from_string(numbers[-1])
-                            if value is not None:
-                                break
+                        value = _value_from_container(parent_text, REGISTRO[key])
+                        if value is not None:
+                            break
                                 
                     except:
                         continue
@@ -94,8 +65,112 @@ async def scrape_basic_indicators(page) -> Dict:
     
     return indicators
 
-async def scrape_dividend_data(page) -> Dict:
-    """Scraping específico para dados de dividendos"""
+# Containers e modo do snapshot de rótulos do v2 (elemento mais interno, textContent)
+SNAPSHOT_LABELS_ARGS = {"containers": "div, li, tr, td", "smallest": True, "prop": "textContent"}
+
+async def scrape_basic_indicators_snapshot(page) -> Dict:
+    """Mesmos indicadores de scrape_basic_indicators, com um único page.evaluate"""
+    labels = [label for labels in INDICATOR_MAPPINGS.values() for label in labels]
+    snapshot = await snapshot_labels(page, labels, **SNAPSHOT_LABELS_ARGS)
+    return indicators_from_snapshot(snapshot)
+
+def indicators_from_snapshot(snapshot: Dict[str, List[str]]) -> Dict:
+    """Indicadores a partir de um snapshot de rótulos já lido (sem ir ao browser)"""
+    indicators = {}
+    for key, labels in INDICATOR_MAPPINGS.items():
+        value = None
+        for label in labels:
+            for parent_text in snapshot.get(label.lower(), []):
+                value = _value_from_container(parent_text, REGISTRO[key])
+                if value is not None:
+                    break
+            if value is not None:
+                break
+        indicators[key] = value
+    return indicators
+
+INDICATOR_EXTRACTORS = {
+    "snapshot": scrape_basic_indicators_snapshot,
+    "locators": scrape_basic_indicators,
+}
+
+# Linhas da tabela de proventos (já vem no HTML da página; a aba só é clicada se não houver)
+DIVIDEND_ROWS_SELECTOR = SELETOR_PROVENTOS
+DIVIDEND_TAB_TIMEOUT = 5000
+
+# Textos das tabelas e das suas linhas num único page.evaluate
+TABLES_JS = """
+tables => tables.map(t => ({
+    text: t.textContent,
+    rows: Array.from(t.querySelectorAll('tr')).map(r => r.textContent),
+}))
+"""
+
+TITLE_SELECTORS = ["h1", "h2", "[class*='title']", "[class*='header']"]
+
+# Tudo o que as etapas leem, num único page.evaluate e antes de qualquer clique:
+# texto visível, candidatos a título, containers dos rótulos e tabelas de proventos
+PAGE_SNAPSHOT_JS = """
+({labels, containers, smallest, prop, titulos, linhas}) => {
+  const tabelas = (sel) => (__TABLES__)(Array.from(document.querySelectorAll(sel)));
+  return {
+    texto: document.body.innerText,
+    titulos: titulos.map((s) => { const el = document.querySelector(s); return el ? el.textContent : null; }),
+    rotulos: (__SNAPSHOT__)({labels, containers, smallest, prop}),
+    tabelas_proventos: tabelas("#earning-section table"),
+    tabelas: tabelas("table"),
+    linhas_proventos: document.querySelectorAll(linhas).length,
+  };
+}
+""".replace("__TABLES__", TABLES_JS.strip()).replace("__SNAPSHOT__", SNAPSHOT_JS.strip())
+
+async def page_snapshot(page) -> dict:
+    """Snapshot da página carregada para todas as etapas de scrape_page (uma ida ao browser)"""
+    labels = sorted({label.lower() for labels in INDICATOR_MAPPINGS.values() for label in labels})
+    return await page.evaluate(PAGE_SNAPSHOT_JS, dict(
+        SNAPSHOT_LABELS_ARGS, labels=labels, titulos=TITLE_SELECTORS, linhas=DIVIDEND_ROWS_SELECTOR))
+
+async def open_dividend_tab(page) -> None:
+    """Clica na aba/seção de dividendos e espera as linhas da tabela (não um tempo fixo)"""
+    # Procurar por seção de dividendos ou abas
+    dividend_sections = await page.locator("text=/dividend|divid|rend/i").all()
+    
+    for section in dividend_sections:
+        try:
+            # Clicar se for um botão/aba
+            if await section.is_visible():
+                section_text = await section.text_content()
+                if any(word in section_text.lower() for word in ['dividendo', 'dividend', 'histórico']):
+                    await section.click()
+                    await page.wait_for_selector(DIVIDEND_ROWS_SELECTOR, state="attached",
+                                                 timeout=DIVIDEND_TAB_TIMEOUT)
+                    break
+        except:
+            continue
+
+def parse_dividend_tables(tables: List[dict]) -> List[dict]:
+    """Histórico (até 12 linhas) da primeira tabela que parece de proventos"""
+    historico = []
+    for table in tables:
+        if any(word in table["text"].lower() for word in ['data', 'valor', 'dividendo', 'jcp']):
+            for row_text in table["rows"][1:13]:  # Pular header e pegar até 12 linhas
+                # Procurar por data no formato brasileiro
+                date_match = re.search(r'\d{2}/\d{2}/\d{4}', row_text)
+                # Procurar por valor monetário
+                value_match = re.search(r'R?\$?\s*(\d+[,.]?\d*)', row_text)
+                
+                if date_match and value_match:
+                    historico.append({
+                        "data": date_match.group(0),
+                        "valor": extract_number_from_string(value_match.group(1))
+                    })
+            break
+    return historico
+
+async def scrape_dividend_data(page, snapshot: dict) -> Dict:
+    """Scraping específico para dados de dividendos.
+    DY e tabelas vêm do `snapshot` (page_snapshot); a aba de proventos só é clicada
+    se a tabela não estava no DOM, e então as tabelas são lidas de novo."""
     dividend_data = {
         "dy_12m": None,
         "dy_medio_5a": None,
@@ -104,140 +179,126 @@ async def scrape_dividend_data(page) -> Dict:
     }
     
     try:
-        # Procurar por seção de dividendos ou abas
-        dividend_sections = await page.locator("text=/dividend|divid|rend/i").all()
-        
-        for section in dividend_sections:
-            try:
-                # Clicar se for um botão/aba
-                if await section.is_visible():
-                    section_text = await section.text_content()
-                    if any(word in section_text.lower() for word in ['dividendo', 'dividend', 'histórico']):
-                        await section.click()
-                        await page.wait_for_timeout(2000)
-                        break
-            except:
-                continue
-        
-        # Procurar por dados específicos de DY
-        page_content = await page.content()
-        
-        # Regex para capturar DY com períodos específicos
-        dy_12m_match = re.search(r'dy.*?12.*?meses?.*?(\d+[,.]?\d*%?)', page_content, re.IGNORECASE)
-        if dy_12m_match:
-            dividend_data["dy_12m"] = extract_number_from_string(dy_12m_match.group(1))
-        
-        dy_5a_match = re.search(r'dy.*?5.*?anos?.*?(\d+[,.]?\d*%?)', page_content, re.IGNORECASE)
-        if dy_5a_match:
-            dividend_data["dy_medio_5a"] = extract_number_from_string(dy_5a_match.group(1))
+        # DY com períodos: janelas curtas perto dos rótulos, no texto visível
+        # (não no HTML inteiro de page.content())
+        dividend_data.update(extract_dy(snapshot["texto"]))
         
-        dy_10a_match = re.search(r'dy.*?10.*?anos?.*?(\d+[,.]?\d*%?)', page_content, re.IGNORECASE)
-        if dy_10a_match:
-            dividend_data["dy_medio_10a"] = extract_number_from_string(dy_10a_match.group(1))
+        # Procurar tabelas de histórico (preferindo a seção de proventos)
+        tables = snapshot["tabelas_proventos"] or snapshot["tabelas"]
         
-        # Procurar tabelas de histórico
-        tables = await page.locator("table").all()
-        for table in tables:
-            try:
-                table_text = await table.text_content()
-                if any(word in table_text.lower() for word in ['data', 'valor', 'dividendo', 'jcp']):
-                    rows = await table.locator("tr").all()
-                    for row in rows[1:13]:  # Pular header e pegar até 12 linhas
-                        try:
-                            row_text = await row.text_content()
-                            # Procurar por data no formato brasileiro
-                            date_match = re.search(r'\d{2}/\d{2}/\d{4}', row_text)
-                            # Procurar por valor monetário
-                            value_match = re.search(r'R?\$?\s*(\d+[,.]?\d*)', row_text)
-                            
-                            if date_match and value_match:
-                                dividend_data["historico_12m"].append({
-                                    "data": date_match.group(0),
-                                    "valor": extract_number_from_string(value_match.group(1))
-                                })
-                        except:
-                            continue
-                    break
-            except:
-                continue
+        # A tabela costuma estar no DOM desde o carregamento: só clica na aba se faltar
+        if not snapshot["linhas_proventos"]:
+            await open_dividend_tab(page)
+            tables = await page.locator("#earning-section table").evaluate_all(TABLES_JS)
+            if not tables:
+                tables = await page.locator("table").evaluate_all(TABLES_JS)
+        dividend_data["historico_12m"] = parse_dividend_tables(tables)
                 
     except Exception as e:
         print(f"Erro ao capturar dados de dividendos: {e}")
     
     return dividend_data
 
-async def scrape_company_info(page) -> tuple:
-    """Scraping de informações básicas da empresa"""
+def company_info_from_snapshot(snapshot: dict) -> tuple:
+    """Informações básicas da empresa a partir do snapshot da página"""
+    # Título - geralmente em h1 ou elemento principal (primeiro seletor com texto)
+    titulo = next((t for t in snapshot["titulos"] if t and t.strip()), None)
+    
+    # Setor - procurar em elementos que contenham palavras-chave de setores
+    setor = None
+    setor_keywords = ["banco", "energia", "petróleo", "varejo", "imobiliário", "siderurgia", "telecom"]
+    
+    page_text = snapshot["texto"]
+    for keyword in setor_keywords:
+        if keyword.lower() in page_text.lower():
+            # Procurar contexto mais específico
+            setor_match = re.search(f'setor[^a-z]*([^.]*{keyword}[^.]*)', page_text, re.IGNORECASE)
+            if setor_match:
+                setor = setor_match.group(1).strip()
+                break
+            else:
+                setor = keyword.title()
+                break
+    
+    return titulo, setor
+
+async def _cronometrar(tempos: dict, etapa: str, coro):
+    """Aguarda `coro` e guarda a duração da etapa em ms"""
+    inicio = time.perf_counter()
     try:
-        # Título - geralmente em h1 ou elemento principal
-        title_selectors = ["h1", "h2", "[class*='title']", "[class*='header']"]
-        titulo = None
-        
-        for selector in title_selectors:
-            try:
-                titulo = await page.locator(selector).first.text_content()
-                if titulo and len(titulo.strip()) > 0:
-                    break
-            except:
-                continue
-        
-        # Setor - procurar em elementos que contenham palavras-chave de setores
-        setor = None
-        setor_keywords = ["banco", "energia", "petróleo", "varejo", "imobiliário", "siderurgia", "telecom"]
-        
-        page_text = await page.text_content()
-        for keyword in setor_keywords:
-            if keyword.lower() in page_text.lower():
-                # Procurar contexto mais específico
-                setor_match = re.search(f'setor[^a-z]*([^.]*{keyword}[^.]*)', page_text, re.IGNORECASE)
-                if setor_match:
-                    setor = setor_match.group(1).strip()
-                    break
-                else:
-                    setor = keyword.title()
-                    break
-        
-        return titulo, setor
-        
-    except Exception as e:
-        print(f"Erro ao capturar informações da empresa: {e}")
-        return None, None
+        return await coro
+    finally:
+        tempos[etapa] = round((time.perf_counter() - inicio) * 1000, 1)
 
-async def scrape_statusinvest_acao_v2(ticker: str) -> dict:
-    """Versão melhorada do scraping Status Invest"""
+BROWSER_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+async def launch_browser(p):
+    """Abre o Chromium headless com as flags da versão v2"""
+    return await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+
+async def new_context(browser):
+    """Cria o contexto de navegação da versão v2 (com o bloqueio de recursos)"""
+    ctx = await browser.new_context(user_agent=USER_AGENT)
+    await instalar_replay(ctx)
+    await instalar_filtro(ctx)
+    return ctx
+
+async def scrape_page(page, ticker: str, modo: str = "snapshot",
+                      campos: Optional[dict] = None, prazo_ms: float = PRAZO_MS) -> dict:
+    """Scraping v2 de um ticker usando uma página já aberta (reaproveitável).
+    `modo`: "snapshot" (um page.evaluate) ou "locators" (um locator por rótulo)
+    
+    O carregamento termina quando os `campos` (padrão: CAMPOS_ESSENCIAIS) têm
+    valor, ou no fim de `prazo_ms` com o que houver (statusinvest_prontidao).
+    Depois do carregamento um único snapshot (page_snapshot, antes de qualquer
+    clique) alimenta empresa, indicadores e dividendos; no modo "locators" os
+    indicadores são lidos ao vivo, mas ainda antes do clique. A aba de proventos
+    só é aberta no fim, em sequência. "tempos" traz a duração de cada etapa em ms."""
     ticker = ticker.upper().strip()
     url = f"https://statusinvest.com.br/acoes/{ticker.lower()}"
+    tempos = {}
+    inicio = time.perf_counter()
+    
+    # Ir para a página e aguardar os cards (eventos do DOM, sem espera fixa)
+    prontidao = await _cronometrar(tempos, "carregamento", carregar(page, url, campos, prazo_ms))
+    avisar_parcial(ticker, prontidao)
+    
+    # Um snapshot da página, antes de qualquer clique, compartilhado pelas etapas
+    snapshot = await _cronometrar(tempos, "snapshot", page_snapshot(page))
     
+    # Capturar dados: nada aqui mexe no DOM até scrape_dividend_data (que pode clicar na aba)
+    inicio_extracao = time.perf_counter()
+    titulo, setor = company_info_from_snapshot(snapshot)
+    if modo == "snapshot":
+        indicadores = indicators_from_snapshot(snapshot["rotulos"])
+    else:
+        indicadores = await _cronometrar(tempos, "indicadores", INDICATOR_EXTRACTORS[modo](page))
+    dividendos = await _cronometrar(tempos, "dividendos", scrape_dividend_data(page, snapshot))
+    tempos["extracao"] = round((time.perf_counter() - inicio_extracao) * 1000, 1)
+    tempos["total"] = round((time.perf_counter() - inicio) * 1000, 1)
+    
+    return {
+        "ticker": ticker,
+        "url": url,
+        "titulo": titulo or f"{ticker} - Status Invest",
+        "setor": setor,
+        "indicadores": indicadores,
+        "dividendos": dividendos,
+        "tempos": tempos
+    }
+
+async def scrape_statusinvest_acao_v2(ticker: str) -> dict:
+    """Versão melhorada do scraping Status Invest"""
     async with async_playwright() as p:
         try:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=["--disable-blink-features=AutomationControlled"]
-            )
-            
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            
+            browser = await launch_browser(p)
+            context = await new_context(browser)
             page = await context.new_page()
             
-            # Ir para a página e aguardar carregamento
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            await wait_for_page_load(page)
-            
-            # Capturar dados
-            titulo, setor = await scrape_company_info(page)
-            indicadores = await scrape_basic_indicators(page)
-            dividendos = await scrape_dividend_data(page)
-            
-            data = {
-                "ticker": ticker,
-                "url": url,
-                "titulo": titulo or f"{ticker} - Status Invest",
-                "setor": setor,
-                "indicadores": indicadores,
-                "dividendos": dividendos
-            }
+            data = await scrape_page(page, ticker)
+            await avisar_rede(data["ticker"], page)
             
             await browser.close()
             return data
@@ -0,0 +1,84 @@
+"""
+Confere a extração pelos endpoints JSON (statusinvest_api) contra o HTML salvo.
+
+Para cada gravação do debug (debug_<ticker>_xhr.json) com o HTML da mesma
+sessão (debug_<ticker>_structure.html), compara o resultado de
+`scrape_gravacao` com o de `statusinvest_parser.parse_html`: indicadores que
+os dois acharam, DY 12m e as datas/valores do histórico de proventos. Mostra
+também o custo de parse de cada caminho.
+
+Sem argumentos usa as gravações ao lado do script. O repositório traz
+debug_bbas3_xhr.json, uma gravação sintética montada a partir de
+debug_bbas3_structure.html (mesmos valores da página salva), para a verificação
+rodar sem rede; gravações reais saem de: make debug TICKER=BBAS3
+
+Uso: python verifica_api.py [debug_bbas3_xhr.json ...]   (sai com código 1 se divergir)
+"""
+import glob
+import os
+import re
+import sys
+import time
+
+from statusinvest_api import parse_data, ler_gravacao, scrape_gravacao
+from statusinvest_parser import parse_html
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+def _numero(v):
+    """"10,31%" e 10.31 comparam iguais."""
+    if isinstance(v, str):
+        v = float(v.replace("%", "").replace(".", "").replace(",", "."))
+    return round(v, 2) if v is not None else None
+
+def _ms(fn, *args, repeticoes: int = 20):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = fn(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000 / repeticoes
+
+def comparar(api: dict, html: dict) -> list:
+    diferencas = []
+    for chave, valor in api["indicadores"].items():
+        esperado = html["indicadores"].get(chave)
+        if valor is not None and esperado is not None and _numero(valor) != _numero(esperado):
+            diferencas.append(f"{chave}: api={valor} html={esperado}")
+    dy_api, dy_html = api["dividendos"]["dy_12m"], html["dividendos"]["dy_12m"]
+    if dy_api is not None and dy_html is not None and _numero(dy_api) != _numero(dy_html):
+        diferencas.append(f"dy_12m: api={dy_api} html={dy_html}")
+    hist_api = {(h["data"], round(h["valor"], 6)) for h in api["dividendos"]["historico_12m"]}
+    hist_html = {(h["data"], round(h["valor"], 6)) for h in html["dividendos"]["historico_12m"]}
+    # A API corta nos 12 pagamentos mais recentes; a tabela não vem ordenada por data
+    desde = min((parse_data(d) for d, _ in hist_api), default=None)
+    faltando = {h for h in hist_html - hist_api if desde is None or parse_data(h[0]) >= desde}
+    if hist_api and faltando:
+        diferencas.append(f"histórico: {len(faltando)} proventos do HTML fora da API, ex.: {sorted(faltando)[:3]}")
+    return diferencas
+
+def main(arquivos: list) -> int:
+    arquivos = arquivos or sorted(glob.glob(os.path.join(AQUI, "debug_*_xhr.json")))
+    if not arquivos:
+        print("Nenhuma gravação (debug_<ticker>_xhr.json). Gere com: make debug TICKER=BBAS3")
+        return 1
+    falhas = 0
+    for arquivo in arquivos:
+        ticker = re.match(r"debug_(.+)_xhr\.json", os.path.basename(arquivo)).group(1).upper()
+        with open(arquivo.replace("_xhr.json", "_structure.html"), "rb") as f:
+            html = f.read()
+        gravacao = ler_gravacao(arquivo)
+        api, ms_api = _ms(scrape_gravacao, gravacao, ticker)
+        ref, ms_html = _ms(parse_html, html, ticker)
+        achados = sum(v is not None for v in api["indicadores"].values())
+        print(f"{ticker}: {achados} indicadores, {len(api['dividendos']['historico_12m'])} proventos | "
+              f"parse JSON {ms_api:.2f} ms x HTML {ms_html:.1f} ms")
+        diferencas = comparar(api, ref)
+        if not achados:
+            diferencas.append("nenhum indicador na gravação (endpoint mudou?)")
+        for d in diferencas:
+            print("  FALHA:", d)
+        falhas += bool(diferencas)
+    print("OK" if not falhas else f"{falhas} ticker(s) divergente(s)")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,91 @@
+"""
+Verificação do cliente HTTP do Ollama (ollama_http.py) contra o Ollama falso (comum/stub_ollama.py).
+
+Cenários:
+  1. generate: texto completo, payload sem stream, com keep_alive e system;
+  2. chat: conteúdo da mensagem do assistente;
+  3. format="json": o pedido leva "format" e a resposta é um JSON válido;
+  4. métricas: todas as de METRICAS, com tokens/s calculado;
+  5. erro: um 500 do servidor vira RuntimeError com a mensagem do Ollama.
+
+Uso: python verifica_ollama_http.py   (sai com código 1 se algo falhar)
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import ClienteHTTP
+from stub_ollama import iniciar_stub, parar_stub
+
+from ollama_http import METRICAS, OllamaHTTP
+
+TOKENS = 5
+
+def main() -> int:
+    falhas = []
+    servidor, url = iniciar_stub(tokens=TOKENS)
+    config = servidor.RequestHandlerClass.config
+    # sem retries: o cenário de erro quer ver o 500 na primeira tentativa
+    cliente = OllamaHTTP(url, keep_alive="5m", timeout=(2, 10), cliente=ClienteHTTP(retries=0))
+    esperado = " ".join(f"palavra{i}" for i in range(TOKENS))
+    try:
+        r = cliente.generate("stub", "Responda apenas: ok", system="Seja breve.")
+        corpo = config.ultimo_corpo or {}
+        print(f"1) generate: {r['resposta']!r}")
+        if r["resposta"].strip() != esperado:
+            falhas.append(f"generate: {r['resposta']!r}")
+        if corpo.get("stream") is not False or corpo.get("keep_alive") != "5m" or corpo.get("system") != "Seja breve.":
+            falhas.append(f"payload do generate: {corpo}")
+
+        r = cliente.chat("stub", [{"role": "user", "content": "Responda apenas: ok"}])
+        corpo = config.ultimo_corpo or {}
+        print(f"2) chat: {r['resposta']!r}")
+        if r["resposta"].strip() != esperado:
+            falhas.append(f"chat: {r['resposta']!r}")
+        if not corpo.get("messages") or "prompt" in corpo:
+            falhas.append(f"payload do chat: {corpo}")
+
+        for nome, chamar in (("generate", lambda: cliente.generate("stub", "json", formato="json")),
+                             ("chat", lambda: cliente.chat("stub", [{"role": "user", "content": "json"}],
+                                                           formato="json"))):
+            r = chamar()
+            corpo = config.ultimo_corpo or {}
+            try:
+                saida = json.loads(r["resposta"])
+            except ValueError:
+                saida = None
+            print(f"3) format=json ({nome}): {saida}")
+            if corpo.get("format") != "json":
+                falhas.append(f"{nome} sem format no payload: {corpo}")
+            if not isinstance(saida, dict):
+                falhas.append(f"{nome} com format=json não devolveu JSON: {r['resposta']!r}")
+
+        metricas = cliente.generate("stub", "ok")["metricas"]
+        print(f"4) métricas: {metricas}")
+        faltando = [m for m in METRICAS if m not in metricas]
+        if faltando:
+            falhas.append(f"métricas faltando: {faltando}")
+        if metricas.get("eval_count") != TOKENS or not metricas.get("tokens_por_s", 0) > 0:
+            falhas.append(f"eval_count/tokens_por_s: {metricas}")
+    finally:
+        parar_stub(servidor)
+
+    servidor, url = iniciar_stub(falhar=1.0)
+    try:
+        OllamaHTTP(url, timeout=(2, 10), cliente=ClienteHTTP(retries=0)).generate("stub", "ok")
+        falhas.append("500 do servidor não levantou RuntimeError")
+    except RuntimeError as e:
+        print(f"5) erro: {e}")
+        if "500" not in str(e) or "falha simulada" not in str(e):
+            falhas.append(f"mensagem de erro: {e}")
+    finally:
+        parar_stub(servidor)
+
+    for f in falhas:
+        print("FALHA:", f)
+    print("OK" if not falhas else f"{len(falhas)} falha(s)")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
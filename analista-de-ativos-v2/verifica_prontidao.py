@@ -0,0 +1,111 @@
+"""
+Verificação da prontidão por eventos (statusinvest_prontidao) sobre as páginas salvas.
+
+Sem browser (lxml, campos_prontos_html, a mesma regra do PRONTIDAO_JS):
+  1. página completa: os campos essenciais (P/L, P/VP, DY, ROE) têm valor;
+  2. página com a #indicators-section vazia (como antes do XHR): P/L, P/VP e ROE
+     ainda faltam, isto é, a espera não termina antes da hora.
+
+Com Chromium (page.set_content, sem rede), o PRONTIDAO_JS de verdade:
+  3. página completa: pronto bem antes do prazo, nada faltando;
+  4. seção vazia preenchida 800 ms depois: pronto só depois disso;
+  5. seção vazia que nunca chega: prazo esgotado, faltando o mesmo que no passo 2.
+
+Uso: python verifica_prontidao.py [arquivos.html]
+(sai com 1 se algo falhar e com 2 se o Chromium não abrir e só a parte sem browser rodou)
+"""
+import asyncio
+import glob
+import os
+import sys
+
+import bench_prontidao
+from statusinvest_prontidao import CAMPOS_ESSENCIAIS, aguardar_prontidao, campos_prontos_html
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+ATRASO_MS = 800
+
+PREENCHER_JS = """([html, ms]) => setTimeout(() => {
+  document.getElementById("indicators-section").innerHTML = html;
+}, ms)"""
+
+def paginas(arquivos: list) -> dict:
+    """{arquivo: (html sem scripts, html com a seção de indicadores vazia, fragmento da seção)}"""
+    saida = {}
+    for arquivo in arquivos:
+        vazia, fragmento = bench_prontidao.preparar(arquivo, "x")
+        with open(arquivo, encoding="utf-8") as f:
+            completa = bench_prontidao.SCRIPT_RE.sub("", f.read())
+        # sem o <script> de XHR do bench: aqui quem preenche a seção é o PREENCHER_JS
+        saida[arquivo] = (completa, bench_prontidao.SCRIPT_RE.sub("", vazia), fragmento)
+    return saida
+
+def offline(nome: str, completa: str, vazia: str, falhas: list) -> list:
+    cheia = campos_prontos_html(completa)
+    print(f"1) {nome} completa: {cheia['achados']}")
+    if cheia["faltando"]:
+        falhas.append(f"{nome}: faltando na página completa {cheia['faltando']}")
+    antes = campos_prontos_html(vazia)
+    print(f"2) {nome} sem os indicadores: faltando {antes['faltando']}")
+    if not {"P/L", "P/VP", "ROE"} <= set(antes["faltando"]):
+        falhas.append(f"{nome}: pronto antes do XHR ({antes['achados']})")
+    return antes["faltando"]
+
+async def no_browser(casos: dict, faltando_offline: dict, falhas: list) -> bool:
+    """Roda os passos 3-5; False se o Chromium não abrir."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            print(f"sem Chromium ({str(e).splitlines()[0]}): passos 3-5 não rodaram")
+            return False
+        ctx = await browser.new_context()
+        await ctx.route("**/*", lambda route: route.abort())  # set_content não precisa de rede
+        page = await ctx.new_page()
+        for arquivo, (completa, vazia, fragmento) in casos.items():
+            nome = os.path.basename(arquivo)
+            await page.set_content(completa, wait_until="domcontentloaded")
+            r = await aguardar_prontidao(page, prazo_ms=5000)
+            print(f"3) {nome} completa: pronto={r['pronto']} em {r['ms']} ms, {r['verificacoes']} verificação(ões)")
+            if not r["pronto"] or r["faltando"]:
+                falhas.append(f"{nome}: JS não achou {r['faltando']} na página completa ({r.get('erro')})")
+
+            await page.set_content(vazia, wait_until="domcontentloaded")
+            await page.evaluate(PREENCHER_JS, [fragmento, ATRASO_MS])
+            r = await aguardar_prontidao(page, prazo_ms=5000)
+            print(f"4) {nome} XHR em {ATRASO_MS} ms: pronto={r['pronto']} em {r['ms']} ms, "
+                  f"{r['verificacoes']} verificações")
+            if not r["pronto"] or (r["ms"] or 0) < ATRASO_MS:
+                falhas.append(f"{nome}: com XHR atrasado {r}")
+
+            await page.set_content(vazia, wait_until="domcontentloaded")
+            r = await aguardar_prontidao(page, prazo_ms=500)
+            print(f"5) {nome} sem XHR: pronto={r['pronto']} em {r['ms']} ms, faltando {r['faltando']}")
+            if r["pronto"] or sorted(r["faltando"]) != sorted(faltando_offline[arquivo]):
+                falhas.append(f"{nome}: JS e lxml divergem sem o XHR ({r['faltando']} x {faltando_offline[arquivo]})")
+        await browser.close()
+    return True
+
+def main(arquivos: list) -> int:
+    falhas = []
+    arquivos = arquivos or sorted(glob.glob(os.path.join(AQUI, "debug_*_structure.html")))
+    if not arquivos:
+        print("nenhuma página salva (debug_*_structure.html)")
+        return 1
+    print(f"campos: {', '.join(CAMPOS_ESSENCIAIS)}")
+    casos = paginas(arquivos)
+    faltando = {a: offline(os.path.basename(a), c, v, falhas) for a, (c, v, _) in casos.items()}
+    com_browser = asyncio.run(no_browser(casos, faltando, falhas))
+
+    for f in falhas:
+        print("FALHA:", f)
+    if falhas:
+        print(f"{len(falhas)} falha(s)")
+        return 1
+    print("OK" if com_browser else "OK (só sem browser)")
+    return 0 if com_browser else 2
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,125 @@
+"""
+Controle de admissão na frente do Ollama local.
+
+No máximo `limite` gerações rodam ao mesmo tempo; as seguintes esperam numa
+fila FIFO de até `fila_max` posições, por no máximo `espera_max` segundos.
+Fila cheia ou espera esgotada levantam FilaCheia na hora, com uma sugestão de
+Retry-After (tempo médio de geração x posição na fila), para a rota responder
+503 em vez de deixar todo mundo estourar o timeout junto.
+
+Config via env: OLLAMA_CONCORRENCIA, OLLAMA_FILA_MAX, OLLAMA_FILA_ESPERA_MAX.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+OLLAMA_CONCORRENCIA = int(os.environ.get("OLLAMA_CONCORRENCIA", 2))
+OLLAMA_FILA_MAX = int(os.environ.get("OLLAMA_FILA_MAX", 16))
+OLLAMA_FILA_ESPERA_MAX = float(os.environ.get("OLLAMA_FILA_ESPERA_MAX", 60))
+
+class FilaCheia(RuntimeError):
+    def __init__(self, mensagem: str, retry_after: int):
+        super().__init__(mensagem)
+        self.retry_after = retry_after
+
+class _Espera:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.admitido = False
+
+class Admissao:
+    def __init__(self, limite: int = OLLAMA_CONCORRENCIA, fila_max: int = OLLAMA_FILA_MAX,
+                 espera_max: float = OLLAMA_FILA_ESPERA_MAX):
+        self.limite = limite
+        self.fila_max = fila_max
+        self.espera_max = espera_max
+        self._lock = threading.Lock()
+        self._fila = deque()
+        self.ativos = 0
+        self.admitidas = 0
+        self.rejeitadas = 0   # fila cheia
+        self.expiradas = 0    # esperaram espera_max sem vaga
+        self.fila_pico = 0
+        self._esperas = deque(maxlen=1000)  # segundos na fila das últimas admissões
+        self._servico = None  # média móvel (EWMA) da duração de uma geração
+
+    def _retry_after(self, posicao: int) -> int:
+        servico = self._servico or 5.0
+        return max(1, math.ceil(servico * (posicao // self.limite + 1)))
+
+    def cheia(self) -> bool:
+        """Verificação rápida (sem reservar vaga): uma nova requisição seria rejeitada agora?"""
+        with self._lock:
+            return self.ativos >= self.limite and len(self._fila) >= self.fila_max
+
+    def carga(self) -> int:
+        """Gerações em andamento + esperando na fila."""
+        with self._lock:
+            return self.ativos + len(self._fila)
+
+    def retry_after(self) -> int:
+        with self._lock:
+            return self._retry_after(len(self._fila))
+
+    @contextmanager
+    def vaga(self):
+        """Reserva uma vaga (esperando na fila se preciso) durante o bloco `with`."""
+        inicio = time.perf_counter()
+        with self._lock:
+            if self.ativos < self.limite and not self._fila:
+                self.ativos += 1
+                espera = None
+            elif len(self._fila) >= self.fila_max:
+                self.rejeitadas += 1
+                raise FilaCheia("Servidor ocupado: fila do Ollama cheia.", self._retry_after(len(self._fila)))
+            else:
+                espera = _Espera()
+                self._fila.append(espera)
+                self.fila_pico = max(self.fila_pico, len(self._fila))
+
+        if espera is not None:
+            espera.evento.wait(self.espera_max)
+            with self._lock:
+                if not espera.admitido:
+                    self._fila.remove(espera)
+                    self.expiradas += 1
+                    raise FilaCheia("Servidor ocupado: tempo máximo na fila esgotado.",
+                                    self._retry_after(len(self._fila)))
+
+        inicio_servico = time.perf_counter()
+        with self._lock:
+            self.admitidas += 1
+            self._esperas.append(inicio_servico - inicio)
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio_servico
+            with self._lock:
+                self._servico = duracao if self._servico is None else 0.8 * self._servico + 0.2 * duracao
+                if self._fila:
+                    # passa a vaga direto para o próximo da fila (FIFO); ativos não muda
+                    proximo = self._fila.popleft()
+                    proximo.admitido = True
+                    proximo.evento.set()
+                else:
+                    self.ativos -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            esperas = sorted(self._esperas)
+            return {
+                "limite": self.limite,
+                "ativos": self.ativos,
+                "fila": len(self._fila),
+                "fila_max": self.fila_max,
+                "fila_pico": self.fila_pico,
+                "admitidas": self.admitidas,
+                "rejeitadas": self.rejeitadas,
+                "expiradas": self.expiradas,
+                "espera_media_s": round(sum(esperas) / len(esperas), 4) if esperas else 0.0,
+                "espera_p95_s": round(esperas[int(0.95 * (len(esperas) - 1))], 4) if esperas else 0.0,
+                "geracao_media_s": round(self._servico or 0.0, 4),
+            }
@@ -1,18 +1,33 @@
 import os
+import sys
 import json
+import time
+from contextlib import contextmanager
 import requests
-from flask import Flask, request, render_template_string, redirect, url_for, flash
+from flask import Flask, Response, g, request, render_template_string, redirect, url_for, flash, stream_with_context
 from dotenv import load_dotenv  # pip install python-dotenv
 
 # Carrega variáveis do .env
 load_dotenv()
 
+# Módulos compartilhados com o analista-de-ativos-v2 (../comum)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from http_cliente import CLIENTE_HTTP, HTTP_MAX_POR_HOST, HTTP_RETRIES, ClienteHTTP
+from llm_cache import LLMCache, ollama_model_digest
+
+from admissao import OLLAMA_CONCORRENCIA, FilaCheia
+from metricas import BUCKETS_TOKENS_S, CONTENT_TYPE, Registro
+from roteador import OLLAMA_BACKENDS, Backend, Roteador, parse_backends
+from singleflight import SingleFlight
+
 # ----------------------------
 # Config via variáveis de ambiente
 # ----------------------------
 PROVIDER = os.environ.get("PROVIDER", "ollama").lower()  # "openai" ou "ollama"
 # OpenAI
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+if OPENAI_API_KEY.strip() in ("", "coloque_sua_chave_aqui"):  # placeholder do .env = sem chave
+    OPENAI_API_KEY = ""
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com")  # pode apontar para um proxy compatível
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_USE_RESPONSES_API = os.environ.get("OPENAI_USE_RESPONSES_API", "false").lower() == "true"
@@ -20,6 +35,92 @@ OPENAI_USE_RESPONSES_API = os.environ.get("OPENAI_USE_RESPONSES_API", "false").l
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "qwen:0.5b")
 OLLAMA_STREAM = os.environ.get("OLLAMA_STREAM", "false").lower() == "true"
+# Várias instâncias: OLLAMA_BACKENDS="http://h1:11434=2,http://h2:11434" (url=peso); vazio = só OLLAMA_BASE_URL
+OLLAMA_BACKEND_LIST = parse_backends(OLLAMA_BACKENDS, OLLAMA_BASE_URL)
+# Com todos os Ollama fora (não só ocupados), usa a OpenAI; desligado por padrão, precisa de OPENAI_API_KEY
+OPENAI_FALLBACK = os.environ.get("OPENAI_FALLBACK", "false").lower() == "true"
+# Cache de respostas (LLM_CACHE=auto|sempre|nunca, LLM_CACHE_DIR para o nível em disco)
+LLM_CACHE = LLMCache()
+# Pedidos idênticos em andamento compartilham uma geração (provedor, modelo, instrução, opções)
+SINGLE_FLIGHT = SingleFlight()
+# Roteador entre os backends Ollama; cada um com gerações simultâneas + fila FIFO limitada
+# (OLLAMA_CONCORRENCIA, OLLAMA_FILA_MAX, OLLAMA_FILA_ESPERA_MAX)
+ROTEADOR = Roteador([Backend(url, peso) for url, peso in OLLAMA_BACKEND_LIST])
+# Cliente próprio para o Ollama: quem limita as gerações é a admissão de cada backend, então a
+# vaga por host do cliente HTTP (HTTP_MAX_POR_HOST, 8) não pode ser menor que OLLAMA_CONCORRENCIA,
+# senão as requisições já admitidas esperam de novo e estouram em HostOcupado.
+# Com mais de um backend quem cobre falhas é o roteador: sem retries no mesmo host.
+OLLAMA_HTTP = ClienteHTTP(retries=HTTP_RETRIES if len(OLLAMA_BACKEND_LIST) == 1 else 0,
+                          max_por_host=max(HTTP_MAX_POR_HOST, OLLAMA_CONCORRENCIA))
+
+# ----------------------------
+# Métricas (/metrics, formato Prometheus; METRICAS=false desliga)
+# ----------------------------
+METRICAS = Registro()
+REQUISICOES = METRICAS.contador("poema_requisicoes_total", "Requisições HTTP ao app",
+                                ("rota", "metodo", "provider", "status"))
+REQUISICAO_SEGUNDOS = METRICAS.histograma("poema_requisicao_segundos",
+                                          "Duração das requisições HTTP (no /stream, até o início da resposta)",
+                                          ("rota",))
+UPSTREAM_SEGUNDOS = METRICAS.histograma("llm_upstream_segundos", "Duração das chamadas ao provedor", ("provider",))
+UPSTREAM_ERROS = METRICAS.contador("llm_upstream_erros_total",
+                                   "Erros nas chamadas ao provedor (status HTTP, conexao, timeout, fila_cheia)",
+                                   ("provider", "status"))
+TTFT_SEGUNDOS = METRICAS.histograma("llm_ttft_segundos", "Tempo até o primeiro token no streaming", ("provider",))
+TOKENS_POR_S = METRICAS.histograma("llm_tokens_por_segundo",
+                                   "Tokens gerados por segundo (Ollama eval_count/eval_duration, OpenAI usage)",
+                                   ("provider",), buckets=BUCKETS_TOKENS_S)
+TOKENS = METRICAS.contador("llm_tokens_gerados_total", "Tokens gerados", ("provider",))
+FILA_ESPERA = METRICAS.histograma("ollama_fila_espera_segundos", "Espera na fila de admissão do backend", ("backend",))
+METRICAS.coletor("ollama_fila_profundidade", "Requisições esperando na fila do backend", "gauge",
+                 lambda: {(b.url,): b.admissao.stats()["fila"] for b in ROTEADOR.backends}, ("backend",))
+METRICAS.coletor("ollama_geracoes_ativas", "Gerações em andamento no backend", "gauge",
+                 lambda: {(b.url,): b.admissao.stats()["ativos"] for b in ROTEADOR.backends}, ("backend",))
+METRICAS.coletor("ollama_fila_recusadas_total", "Requisições recusadas pela fila (cheia ou espera esgotada)",
+                 "counter", lambda: {(b.url, motivo): b.admissao.stats()[motivo]
+                                     for b in ROTEADOR.backends for motivo in ("rejeitadas", "expiradas")},
+                 ("backend", "motivo"))
+METRICAS.coletor("ollama_backend_disponivel", "1 se o backend está em circulação", "gauge",
+                 lambda: {(b.url,): int(b.disponivel(time.monotonic())) for b in ROTEADOR.backends}, ("backend",))
+METRICAS.coletor("roteador_failovers_total", "Trocas de backend por falha", "counter",
+                 lambda: {(): ROTEADOR.failovers})
+METRICAS.coletor("roteador_fallbacks_total", "Gerações enviadas à OpenAI com todos os Ollama fora", "counter",
+                 lambda: {(): ROTEADOR.fallbacks})
+METRICAS.coletor("llm_cache_consultas_total", "Consultas ao cache de respostas", "counter",
+                 lambda: {("hit",): LLM_CACHE.hits, ("miss",): LLM_CACHE.misses}, ("resultado",))
+METRICAS.coletor("llm_cache_hit_ratio", "Acertos / consultas do cache de respostas", "gauge",
+                 lambda: {(): LLM_CACHE.hits / max(1, LLM_CACHE.hits + LLM_CACHE.misses)})
+METRICAS.coletor("singleflight_chamadas_total", "Gerações emitidas x coalescidas", "counter",
+                 lambda: {("emitida",): SINGLE_FLIGHT.emitidas, ("coalescida",): SINGLE_FLIGHT.coalescidas},
+                 ("tipo",))
+
+def _status_erro(e: Exception) -> str:
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return str(e.response.status_code)
+    if isinstance(e, requests.Timeout):
+        return "timeout"
+    if isinstance(e, requests.ConnectionError):
+        return "conexao"
+    if isinstance(e, FilaCheia):
+        return "fila_cheia"
+    return "erro"
+
+@contextmanager
+def medir_upstream(provider: str):
+    """Duração e erros de uma chamada ao provedor (também serve dentro de geradores)."""
+    inicio = time.perf_counter()
+    try:
+        yield inicio
+    except Exception as e:
+        UPSTREAM_ERROS.inc(provider=provider, status=_status_erro(e))
+        raise
+    finally:
+        UPSTREAM_SEGUNDOS.observar(time.perf_counter() - inicio, provider=provider)
+
+def registrar_tokens(provider: str, tokens, segundos) -> None:
+    if tokens and segundos and segundos > 0:
+        TOKENS.inc(tokens, provider=provider)
+        TOKENS_POR_S.observar(tokens / segundos, provider=provider)
 
 # Flask
 SECRET_KEY = os.environ.get("FLASK_SECRET_KEY", "dev-secret")  # para flash messages
@@ -102,10 +203,66 @@ TEMPLATE = """
     <button type="submit">Criar 1 poema</button>
   </form>
 
-  {% if poem %}
+  <div id="saida" {% if not poem %}hidden{% endif %}>
     <h2>Poema</h2>
-    <div class="result">{{ poem }}</div>
-  {% endif %}
+    <div class="result" id="poema">{{ poem or "" }}</div>
+    <p class="env" id="status"></p>
+  </div>
+
+  <script>
+    // Streaming: envia o formulário para /stream e vai escrevendo os tokens (SSE)
+    // conforme chegam. Sem JavaScript o formulário faz o POST normal em "/".
+    const form = document.querySelector("form");
+    form.addEventListener("submit", async (ev) => {
+      if (!window.ReadableStream) return;
+      ev.preventDefault();
+      const saida = document.getElementById("saida");
+      const poema = document.getElementById("poema");
+      const status = document.getElementById("status");
+      const botao = form.querySelector("button");
+      saida.hidden = false;
+      poema.textContent = "";
+      status.textContent = "gerando…";
+      botao.disabled = true;
+      const inicio = performance.now();
+      let primeiro = null;
+      try {
+        const resp = await fetch("{{ url_for('generate_stream') }}", { method: "POST", body: new FormData(form) });
+        if (!resp.ok) throw new Error(await resp.text());
+        const reader = resp.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let fim;
+          while ((fim = buffer.indexOf("\\n\\n")) >= 0) {
+            const bloco = buffer.slice(0, fim);
+            buffer = buffer.slice(fim + 2);
+            let evento = "message", dados = "";
+            for (const linha of bloco.split("\\n")) {
+              if (linha.startsWith("event:")) evento = linha.slice(6).trim();
+              else if (linha.startsWith("data:")) dados += linha.slice(5).trim();
+            }
+            if (!dados) continue;
+            const msg = JSON.parse(dados);
+            if (evento === "erro") throw new Error(msg.erro);
+            if (evento === "token") {
+              if (primeiro === null) primeiro = performance.now() - inicio;
+              poema.textContent += msg.token;
+            }
+          }
+        }
+        const total = performance.now() - inicio;
+        status.textContent = `primeiro token em ${(primeiro ?? total).toFixed(0)} ms, total ${total.toFixed(0)} ms`;
+      } catch (e) {
+        status.textContent = "Erro ao gerar poema: " + e.message;
+      } finally {
+        botao.disabled = false;
+      }
+    });
+  </script>
 </body>
 </html>
 """
@@ -135,20 +292,58 @@ def call_openai(prompt_text: str) -> str:
     Faz chamada à API OpenAI.
     Usa Responses API se OPENAI_USE_RESPONSES_API=true, senão usa Chat Completions.
     """
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json",
-    }
+    options = _openai_options()
+    return SINGLE_FLIGHT.fazer(
+        SINGLE_FLIGHT.chave("openai", OPENAI_MODEL, prompt_text, options),
+        lambda: LLM_CACHE.obter_ou_gerar(
+            f"openai:{OPENAI_MODEL}", prompt_text, options, lambda: _generate_openai(prompt_text)
+        ),
+    )
+
+def _openai_options() -> dict:
+    """Opções que entram na chave do cache para a OpenAI."""
+    if OPENAI_USE_RESPONSES_API:
+        # Responses API sem temperatura explícita: padrão da OpenAI (1.0)
+        return {"api": "responses", "temperature": 1.0}
+    return {"api": "chat", "temperature": 0.9}
+
+def _openai_request(prompt_text: str, stream: bool = False) -> tuple:
+    """URL e payload da chamada OpenAI (Responses API ou Chat Completions)."""
     if OPENAI_USE_RESPONSES_API:
-        # Responses API
         url = f"{OPENAI_BASE_URL.rstrip('/')}/v1/responses"
+        payload = {"model": OPENAI_MODEL, "input": prompt_text}
+    else:
+        url = f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions"
         payload = {
             "model": OPENAI_MODEL,
-            "input": prompt_text,
+            "messages": [
+                {"role": "system", "content": "You are a helpful literary assistant."},
+                {"role": "user", "content": prompt_text},
+            ],
+            "temperature": 0.9,
         }
-        r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=60)
+    if stream:
+        payload["stream"] = True
+        if not OPENAI_USE_RESPONSES_API:
+            # último evento traz o "usage" (tokens gerados, para as métricas)
+            payload["stream_options"] = {"include_usage": True}
+    return url, payload
+
+def _generate_openai(prompt_text: str) -> str:
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    url, payload = _openai_request(prompt_text)
+    with medir_upstream("openai") as inicio:
+        r = CLIENTE_HTTP.post(url, headers=headers, data=json.dumps(payload), timeout=(5, 60))
         r.raise_for_status()
         data = r.json()
+    usage = data.get("usage") or {}
+    registrar_tokens("openai", usage.get("completion_tokens") or usage.get("output_tokens"),
+                     time.perf_counter() - inicio)
+    if OPENAI_USE_RESPONSES_API:
+        # Responses API
         # resposta pode vir em data["output_text"] (OpenAI SDK) ou em "content"→"text"
         # fallback defensivo:
         if "output_text" in data:
@@ -170,42 +365,220 @@ def call_openai(prompt_text: str) -> str:
         return json.dumps(data, ensure_ascii=False)
     else:
         # Chat Completions
-        url = f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions"
-        payload = {
-            "model": OPENAI_MODEL,
-            "messages": [
-                {"role": "system", "content": "You are a helpful literary assistant."},
-                {"role": "user", "content": prompt_text},
-            ],
-            "temperature": 0.9,
-        }
-        r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=60)
-        r.raise_for_status()
-        data = r.json()
         return data["choices"][0]["message"]["content"]
 
+def stream_openai(prompt_text: str):
+    """
+    Gera os pedaços de texto do stream SSE da OpenAI, conforme chegam.
+    Chat Completions: choices[0].delta.content; Responses API: eventos response.output_text.delta.
+    """
+    url, payload = _openai_request(prompt_text, stream=True)
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    with medir_upstream("openai") as inicio, \
+            CLIENTE_HTTP.stream("POST", url, headers=headers, data=json.dumps(payload), timeout=(5, 60)) as r:
+        r.raise_for_status()
+        primeiro = True
+        for line in r.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip().decode("utf-8")
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            usage = event.get("usage") or (event.get("response") or {}).get("usage")
+            if usage:
+                registrar_tokens("openai", usage.get("completion_tokens") or usage.get("output_tokens"),
+                                 time.perf_counter() - inicio)
+            if event.get("type") == "response.output_text.delta":
+                text = event.get("delta", "")
+            elif event.get("choices"):
+                text = event["choices"][0].get("delta", {}).get("content") or ""
+            else:
+                continue
+            if text:
+                if primeiro:
+                    TTFT_SEGUNDOS.observar(time.perf_counter() - inicio, provider="openai")
+                    primeiro = False
+                yield text
+
 def call_ollama(prompt_text: str) -> str:
     """
     Faz chamada à API do Ollama (endpoint /api/generate).
+    Respostas passam pelo LLM_CACHE (chave: digest do modelo + prompt + opções);
+    chamadas idênticas simultâneas compartilham uma geração (SINGLE_FLIGHT).
+    Se quem respondeu foi o fallback da OpenAI, a resposta não é guardada com a chave do Ollama.
     """
-    url = f"{OLLAMA_BASE_URL.rstrip('/')}/api/generate"
+    options = {"temperature": 0.9}
+    respondeu = {}
+    return SINGLE_FLIGHT.fazer(
+        SINGLE_FLIGHT.chave("ollama", OLLAMA_MODEL, prompt_text, options),
+        lambda: LLM_CACHE.obter_ou_gerar(
+            _digest_ollama,
+            prompt_text,
+            options,
+            lambda: _generate_ollama_admitido(prompt_text, options, respondeu),
+            guardar=lambda: respondeu.get("provider") != "openai",
+        ),
+    )
+
+def _digest_ollama() -> str:
+    """Digest do modelo num backend que o roteador considera disponível (o 1º da configuração)."""
+    disponiveis = ROTEADOR.disponiveis()
+    if not disponiveis:
+        # todos em quarentena: não vale sondar ninguém só para montar a chave
+        return OLLAMA_MODEL
+    return ollama_model_digest(disponiveis[0].url, OLLAMA_MODEL)
+
+def _openai_fallback() -> bool:
+    return OPENAI_FALLBACK and bool(OPENAI_API_KEY)
+
+def _fallback_openai(gerar, respondeu: dict = None):
+    """`gerar` como fallback do roteador (ou None se desligado), anotando em `respondeu` quem respondeu."""
+    if not _openai_fallback():
+        return None
+
+    def _fallback():
+        if respondeu is not None:
+            respondeu["provider"] = "openai"
+        return gerar()
+
+    return _fallback
+
+def _generate_ollama_admitido(prompt_text: str, options: dict, respondeu: dict = None) -> str:
+    # Só a geração de fato ocupa vaga: acertos de cache e chamadas coalescidas não entram na fila
+    def _no_backend(backend):
+        inicio = time.perf_counter()
+        with backend.admissao.vaga():
+            FILA_ESPERA.observar(time.perf_counter() - inicio, backend=backend.url)
+            return _generate_ollama(prompt_text, options, backend.url)
+
+    return ROTEADOR.executar(
+        _no_backend,
+        fallback=_fallback_openai(lambda: _generate_openai(prompt_text), respondeu),
+    )
+
+def _stream_ollama_admitido(prompt_text: str, options: dict, respondeu: dict = None):
+    def _no_backend(backend):
+        # A vaga fica ocupada até o último token
+        inicio = time.perf_counter()
+        with backend.admissao.vaga():
+            FILA_ESPERA.observar(time.perf_counter() - inicio, backend=backend.url)
+            yield from stream_ollama(prompt_text, options, backend.url)
+
+    return ROTEADOR.executar_stream(
+        _no_backend,
+        fallback=_fallback_openai(lambda: stream_openai(prompt_text), respondeu),
+    )
+
+def _generate_ollama(prompt_text: str, options: dict, base_url: str = OLLAMA_BASE_URL) -> str:
+    if OLLAMA_STREAM:
+        # stream=true: NDJSON linha a linha, agregado aqui
+        return "".join(stream_ollama(prompt_text, options, base_url))
+    url = f"{base_url.rstrip('/')}/api/generate"
     payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt_text,
-        "stream": OLLAMA_STREAM,
-        "options": {
-            "temperature": 0.9
-        }
+        "stream": False,
+        "options": options
     }
     headers = {"Content-Type": "application/json"}
-    r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=120)
-    r.raise_for_status()
-    # Se stream=false, resposta vem como JSON único
-    # Se stream=true, resposta vem linha-a-linha (precisaria agregar) — aqui usamos stream=false por padrão
-    data = r.json()
+    with medir_upstream("ollama"):
+        r = OLLAMA_HTTP.post(url, headers=headers, data=json.dumps(payload), timeout=(5, 120))
+        r.raise_for_status()
+        data = r.json()
+    registrar_tokens("ollama", data.get("eval_count"), (data.get("eval_duration") or 0) / 1e9)
     # Campo pode ser "response"
     return data.get("response", json.dumps(data, ensure_ascii=False))
 
+def stream_ollama(prompt_text: str, options: dict = None, base_url: str = OLLAMA_BASE_URL):
+    """
+    Gera os tokens do /api/generate com stream=true (uma linha JSON por pedaço).
+    """
+    url = f"{base_url.rstrip('/')}/api/generate"
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt_text,
+        "stream": True,
+        "options": options or {"temperature": 0.9},
+    }
+    headers = {"Content-Type": "application/json"}
+    # timeout de leitura vale entre pedaços, não para a geração inteira
+    with medir_upstream("ollama") as inicio, \
+            OLLAMA_HTTP.stream("POST", url, headers=headers, data=json.dumps(payload), timeout=(5, 120)) as r:
+        r.raise_for_status()
+        primeiro = True
+        for line in r.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            if data.get("response"):
+                if primeiro:
+                    TTFT_SEGUNDOS.observar(time.perf_counter() - inicio, provider="ollama")
+                    primeiro = False
+                yield data["response"]
+            if data.get("done"):
+                registrar_tokens("ollama", data.get("eval_count"), (data.get("eval_duration") or 0) / 1e9)
+                break
+
+def stream_poem(provider: str, prompt_text: str):
+    """
+    Tokens do poema para a rota de streaming, passando pelo LLM_CACHE:
+    com o cache ativo, um acerto sai de uma vez e um stream completo é guardado.
+    Streams idênticos simultâneos compartilham a geração (SINGLE_FLIGHT); só a
+    geração líder grava no cache, e não grava se quem respondeu foi o fallback da OpenAI.
+    """
+    respondeu = {}
+    if provider == "openai":
+        options = _openai_options()
+        model = OPENAI_MODEL
+        digest = lambda: f"openai:{OPENAI_MODEL}"
+        gerar = lambda: stream_openai(prompt_text)
+    else:
+        options = {"temperature": 0.9}
+        model = OLLAMA_MODEL
+        digest = _digest_ollama
+        gerar = lambda: _stream_ollama_admitido(prompt_text, options, respondeu)
+    voo = SINGLE_FLIGHT.chave("stream", provider, model, prompt_text, options)
+
+    if not LLM_CACHE.ativo(options):
+        yield from SINGLE_FLIGHT.fazer_stream(voo, gerar)
+        return
+    chave = LLM_CACHE.chave(digest(), prompt_text, options)
+    resposta = LLM_CACHE.get(chave)
+    if resposta is not None:
+        yield resposta
+        return
+
+    def gerar_e_guardar():
+        partes = []
+        for token in gerar():
+            partes.append(token)
+            yield token
+        if respondeu.get("provider") != "openai":
+            LLM_CACHE.put(chave, "".join(partes))
+
+    yield from SINGLE_FLIGHT.fazer_stream(voo, gerar_e_guardar)
+
+def mensagem_erro(provider: str, e: Exception, prefixo: str = "Erro ao gerar poema: ") -> str:
+    """Texto do erro para o usuário; se falhou o fallback da OpenAI, mostra também o erro do Ollama.
+    No /stream o prefixo fica vazio (a página já põe o dela)."""
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        msg = f"Erro HTTP ao chamar {provider}: {e.response.status_code} - {e.response.text}"
+    else:
+        msg = f"{prefixo}{e}"
+    if e.__cause__ is not None:
+        msg += f" (fallback da OpenAI, depois de o Ollama falhar com: {e.__cause__})"
+    return msg
+
+def sse(evento: str, dados: dict) -> str:
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
 def get_provider(request_provider: str) -> str:
     """
     Decide qual provedor usar: form > env.
@@ -217,6 +590,22 @@ def get_provider(request_provider: str) -> str:
 # ----------------------------
 # Rotas
 # ----------------------------
+@app.before_request
+def _inicio_requisicao():
+    g.inicio = time.perf_counter()
+
+@app.after_request
+def _fim_requisicao(response):
+    rota = request.url_rule.rule if request.url_rule else "outra"
+    REQUISICOES.inc(rota=rota, metodo=request.method, provider=g.get("provider", ""),
+                    status=str(response.status_code))
+    REQUISICAO_SEGUNDOS.observar(time.perf_counter() - g.inicio, rota=rota)
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(METRICAS.exportar(), content_type=CONTENT_TYPE)
+
 @app.route("/", methods=["GET"])
 def index():
     return render_template_string(
@@ -240,6 +629,7 @@ def generate():
     length = (request.form.get("length") or "").strip()
     language = (request.form.get("language") or "pt-br").strip()
     chosen_provider = get_provider(request.form.get("provider", "auto"))
+    g.provider = chosen_provider
 
     if not user_prompt:
         flash("Informe um tema/briefing para o poema.")
@@ -247,6 +637,7 @@ def generate():
 
     instruction = build_instruction(user_prompt, style=style, length=length, language=language)
 
+    status, headers = 200, {}
     try:
         if chosen_provider == "openai":
             if not OPENAI_API_KEY:
@@ -254,12 +645,12 @@ def generate():
             poem = call_openai(instruction)
         else:
             poem = call_ollama(instruction)
-    except requests.HTTPError as e:
-        msg = f"Erro HTTP ao chamar {chosen_provider}: {e.response.status_code} - {e.response.text}"
-        flash(msg)
+    except FilaCheia as e:
+        flash(f"{e} Tente de novo em {e.retry_after}s.")
         poem = ""
+        status, headers = 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
-        flash(f"Erro ao gerar poema: {e}")
+        flash(mensagem_erro(chosen_provider, e))
         poem = ""
 
     return render_template_string(
@@ -274,6 +665,56 @@ def generate():
         style=style,
         length=length,
         language=language,
+    ), status, headers
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """Contadores do processo: single-flight, backends/filas do Ollama e cache de respostas."""
+    return {
+        "singleflight": SINGLE_FLIGHT.stats(),
+        "roteador": ROTEADOR.stats(),
+        "llm_cache": {"hits": LLM_CACHE.hits, "misses": LLM_CACHE.misses},
+    }
+
+@app.route("/stream", methods=["POST"])
+def generate_stream():
+    """
+    Mesmo formulário do POST "/", mas devolve o poema como Server-Sent Events
+    (event: token / fim / erro) à medida que o modelo gera.
+    """
+    user_prompt = (request.form.get("prompt") or "").strip()
+    style = (request.form.get("style") or "").strip()
+    length = (request.form.get("length") or "").strip()
+    language = (request.form.get("language") or "pt-br").strip()
+    chosen_provider = get_provider(request.form.get("provider", "auto"))
+    g.provider = chosen_provider
+
+    if not user_prompt:
+        return Response("Informe um tema/briefing para o poema.", status=400, mimetype="text/plain")
+    if chosen_provider == "openai" and not OPENAI_API_KEY:
+        return Response("OPENAI_API_KEY não configurada.", status=400, mimetype="text/plain")
+    if chosen_provider == "ollama" and ROTEADOR.cheio():
+        retry_after = ROTEADOR.retry_after()
+        return Response(f"Servidor ocupado: fila do Ollama cheia. Tente de novo em {retry_after}s.",
+                        status=503, mimetype="text/plain", headers={"Retry-After": str(retry_after)})
+
+    instruction = build_instruction(user_prompt, style=style, length=length, language=language)
+
+    def eventos():
+        try:
+            for token in stream_poem(chosen_provider, instruction):
+                yield sse("token", {"token": token})
+            yield sse("fim", {})
+        except FilaCheia as e:
+            yield sse("erro", {"erro": f"{e} Tente de novo em {e.retry_after}s.", "retry_after": e.retry_after})
+        except Exception as e:
+            yield sse("erro", {"erro": mensagem_erro(chosen_provider, e, prefixo="")})
+
+    return Response(
+        stream_with_context(eventos()),
+        mimetype="text/event-stream",
+        # sem buffer em proxies (nginx) nem cache
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 # ----------------------------
@@ -281,4 +722,5 @@ def generate():
 # ----------------------------
 if __name__ == "__main__":
     # Servir na porta 8080, acessível externamente (0.0.0.0)
+    # Para muitos usuários simultâneos use o servidor gevent: python serve_async.py
     app.run(host="0.0.0.0", port=8080, debug=os.environ.get("FLASK_DEBUG", "false").lower() == "true")
@@ -0,0 +1,89 @@
+"""
+Custo da instrumentação de métricas (metricas.py) por requisição.
+
+1. Micro: as operações de métrica que uma requisição faz (contador da rota,
+   histograma da rota, medir_upstream, fila, TTFT, tokens) repetidas N vezes.
+2. Requisição: mediana do POST "/" pelo test client do Flask contra o Ollama
+   falso com atraso zero — o pedido mais barato possível; uma geração real leva
+   segundos, então a fração real é bem menor.
+3. A/B: a mesma requisição com as métricas desligadas (informativo: o ruído de
+   uma requisição é maior que o custo medido).
+4. Exportação do /metrics.
+
+Uso: python bench_metricas.py [-n 2000]   (sai com código 1 se passar de 1%)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from stub_ollama import iniciar_stub
+
+LIMITE = 0.01
+
+def operacoes_por_requisicao(app) -> None:
+    with app.medir_upstream("ollama"):
+        pass
+    app.FILA_ESPERA.observar(0.001, backend="http://127.0.0.1:11434")
+    app.TTFT_SEGUNDOS.observar(0.2, provider="ollama")
+    app.registrar_tokens("ollama", 20, 0.5)
+    app.REQUISICOES.inc(rota="/", metodo="POST", provider="ollama", status="200")
+    app.REQUISICAO_SEGUNDOS.observar(0.7, rota="/")
+
+def mediana_requisicao(cliente, n: int) -> float:
+    tempos = []
+    for i in range(n):
+        inicio = time.perf_counter()
+        r = cliente.post("/", data={"prompt": f"tema {i}", "provider": "ollama"})
+        tempos.append(time.perf_counter() - inicio)
+        assert r.status_code == 200
+    return statistics.median(tempos)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Custo das métricas por requisição")
+    parser.add_argument("-n", type=int, default=2000, help="requisições por rodada")
+    args = parser.parse_args()
+
+    _, url = iniciar_stub(tokens=20)
+    os.environ.update(OLLAMA_BASE_URL=url, OLLAMA_BACKENDS="", LLM_CACHE="nunca", PROVIDER="ollama")
+    import app
+    cliente = app.app.test_client()
+
+    # 1. Micro
+    repeticoes = 50_000
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        operacoes_por_requisicao(app)
+    custo = (time.perf_counter() - inicio) / repeticoes
+    print(f"1) métricas por requisição: {custo * 1e6:.1f} µs")
+
+    # 2. Requisição mais barata possível
+    mediana_requisicao(cliente, 100)  # aquecimento
+    com = mediana_requisicao(cliente, args.n)
+    fracao = custo / com
+    print(f"2) POST / (stub sem atraso): mediana {com * 1000:.2f} ms -> métricas = {fracao:.3%} do tempo")
+
+    # 3. A/B
+    metricas = [m for m in app.METRICAS._metricas if hasattr(m, "ativo")]
+    for m in metricas:
+        m.ativo = False
+    sem = mediana_requisicao(cliente, args.n)
+    for m in metricas:
+        m.ativo = True
+    print(f"3) A/B: com {com * 1000:.2f} ms | sem {sem * 1000:.2f} ms | diferença {(com - sem) * 1e6:+.0f} µs")
+
+    # 4. /metrics
+    inicio = time.perf_counter()
+    corpo = app.METRICAS.exportar()
+    print(f"4) exportar /metrics: {(time.perf_counter() - inicio) * 1000:.2f} ms, {len(corpo.splitlines())} linhas")
+
+    if fracao >= LIMITE:
+        print(f"FALHA: instrumentação {fracao:.3%} >= {LIMITE:.0%}")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Teste de carga do app de poemas contra um Ollama falso (../comum/stub_ollama.py).
+
+Sobe o stub e o app em processos separados, dispara POST "/" com N clientes
+simultâneos (1, 10, 100, 200) e mostra latência p50/p95 (das respostas 200), vazão,
+respostas 503 (fila do Ollama cheia, ver admissao.py), o pico de gerações em
+andamento no app (GET /stats) e o pico de threads do processo do servidor: com
+gevent, centenas de gerações em andamento com poucas threads do SO.
+
+A admissão do app (OLLAMA_CONCORRENCIA/OLLAMA_FILA_MAX) fica, por padrão, do
+tamanho da maior rodada, para medir o servidor e não a fila; `--concorrencia 2`
+(ou as variáveis no ambiente) mede com a fila de um Ollama em CPU.
+
+Uso: python loadtest.py [--servidor dev|gevent|ambos] [--atraso 1.0] [--clientes 1 10 100 200]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+STUB = os.path.join(AQUI, "..", "comum", "stub_ollama.py")
+
+SERVIDORES = {
+    # app.run (servidor de desenvolvimento do Flask, uma thread por requisição)
+    "dev": [sys.executable, "-c", "import os; from app import app; "
+            "app.run(host='127.0.0.1', port=int(os.environ['PORT']))"],
+    "gevent": [sys.executable, os.path.join(AQUI, "serve_async.py")],
+}
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def esperar_porta(porta: int, timeout: float = 15) -> None:
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            socket.create_connection(("127.0.0.1", porta), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"porta {porta} não abriu em {timeout}s")
+
+def threads_do_processo(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linha in f:
+                if linha.startswith("Threads:"):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def geracoes_em_andamento(url: str) -> int:
+    """Soma de `ativos` das filas de admissão dos backends (GET /stats do app)."""
+    try:
+        stats = requests.get(f"{url}stats", timeout=2).json()
+    except (requests.RequestException, ValueError):
+        return 0
+    return sum(b["admissao"]["ativos"] for b in stats["roteador"]["backends"])
+
+def rodada(url: str, clientes: int, por_cliente: int, pid: int) -> dict:
+    latencias, erros, rejeitadas = [], 0, 0
+    lock = threading.Lock()
+    pico = [0]
+    pico_geracoes = [0]
+    parar = threading.Event()
+
+    def amostrar():
+        while not parar.is_set():
+            pico[0] = max(pico[0], threads_do_processo(pid))
+            time.sleep(0.05)
+
+    def amostrar_geracoes():
+        while not parar.is_set():
+            pico_geracoes[0] = max(pico_geracoes[0], geracoes_em_andamento(url))
+            time.sleep(0.1)
+
+    def cliente(i: int):
+        nonlocal erros, rejeitadas
+        with requests.Session() as s:
+            for j in range(por_cliente):
+                inicio = time.perf_counter()
+                status = None
+                try:
+                    r = s.post(url, data={"prompt": f"poema {i}-{j}", "provider": "ollama"}, timeout=300)
+                    status = r.status_code
+                    ok = status == 200 and "palavra" in r.text
+                except requests.RequestException:
+                    ok = False
+                with lock:
+                    if ok:
+                        latencias.append(time.perf_counter() - inicio)
+                    elif status == 503:
+                        rejeitadas += 1
+                    else:
+                        erros += 1
+
+    amostradores = [threading.Thread(target=fn, daemon=True) for fn in (amostrar, amostrar_geracoes)]
+    for a in amostradores:
+        a.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as ex:
+        list(ex.map(cliente, range(clientes)))
+    duracao = time.perf_counter() - inicio
+    parar.set()
+    for a in amostradores:
+        a.join()
+    return {
+        "clientes": clientes,
+        "ok": len(latencias),
+        "erros": erros,
+        "503": rejeitadas,
+        "p50": percentil(latencias, 50) if latencias else float("nan"),
+        "p95": percentil(latencias, 95) if latencias else float("nan"),
+        "vazao": len(latencias) / duracao,
+        "geracoes": pico_geracoes[0],
+        "threads": pico[0],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga do app contra um Ollama falso")
+    parser.add_argument("--servidor", choices=["dev", "gevent", "ambos"], default="ambos")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 10, 100, 200])
+    parser.add_argument("--requisicoes", type=int, default=3, help="requisições por cliente")
+    parser.add_argument("--atraso", type=float, default=1.0, help="segundos até o primeiro token no stub")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--capacidade", type=int, default=0,
+                        help="gerações simultâneas no stub (0 = sem limite; 2 simula um Ollama em CPU)")
+    parser.add_argument("--concorrencia", type=int,
+                        help="OLLAMA_CONCORRENCIA e OLLAMA_FILA_MAX do app (padrão: as do ambiente "
+                             "ou o maior número de clientes)")
+    args = parser.parse_args()
+    admissao = {}
+    if args.concorrencia is not None or "OLLAMA_CONCORRENCIA" not in os.environ:
+        limite = str(args.concorrencia or max(args.clientes))
+        admissao = {"OLLAMA_CONCORRENCIA": limite, "OLLAMA_FILA_MAX": limite}
+
+    porta_stub = porta_livre()
+    stub = subprocess.Popen([sys.executable, STUB, "--porta", str(porta_stub), "--atraso", str(args.atraso),
+                             "--intervalo", "0", "--tokens", str(args.tokens),
+                             "--capacidade", str(args.capacidade)], stdout=subprocess.DEVNULL)
+    try:
+        esperar_porta(porta_stub)
+        servidores = ["dev", "gevent"] if args.servidor == "ambos" else [args.servidor]
+        print(f"stub: atraso {args.atraso}s, {args.tokens} tokens, capacidade {args.capacidade or 'ilimitada'} | "
+              f"{args.requisicoes} requisições por cliente | admissão do app: "
+              f"{admissao.get('OLLAMA_CONCORRENCIA') or os.environ['OLLAMA_CONCORRENCIA']} gerações")
+        print(f"{'servidor':<8} {'clientes':>8} {'ok':>5} {'503':>5} {'erros':>5} {'p50 s':>7} {'p95 s':>7} "
+              f"{'req/s':>7} {'gerações':>8} {'threads':>7}")
+        for nome in servidores:
+            porta = porta_livre()
+            env = dict(os.environ, PORT=str(porta), HOST="127.0.0.1", PROVIDER="ollama",
+                       OLLAMA_BASE_URL=f"http://127.0.0.1:{porta_stub}", OLLAMA_STREAM="false",
+                       LLM_CACHE="nunca", FLASK_DEBUG="false", **admissao)
+            servidor = subprocess.Popen(SERVIDORES[nome], cwd=AQUI, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                esperar_porta(porta)
+                for clientes in args.clientes:
+                    r = rodada(f"http://127.0.0.1:{porta}/", clientes, args.requisicoes, servidor.pid)
+                    print(f"{nome:<8} {r['clientes']:>8} {r['ok']:>5} {r['503']:>5} {r['erros']:>5} {r['p50']:>7.2f} "
+                          f"{r['p95']:>7.2f} {r['vazao']:>7.1f} {r['geracoes']:>8} {r['threads']:>7}")
+            finally:
+                servidor.terminate()
+                servidor.wait()
+    finally:
+        stub.terminate()
+        stub.wait()
+
+if __name__ == "__main__":
+    main()
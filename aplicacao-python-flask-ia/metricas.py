@@ -0,0 +1,145 @@
+"""
+Métricas no formato texto do Prometheus (exposition format 0.0.4), sem dependências.
+
+Contador e Histograma guardam um valor por combinação de labels, com um lock
+por métrica; `observar` é um bisect + duas somas. Métricas de outros objetos
+(filas, cache) entram como Coletor: uma função chamada só na hora do /metrics.
+
+Com `ativo=False` (env METRICAS=false) inc/observar viram no-op.
+"""
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Tuple
+
+METRICAS_ATIVAS = os.environ.get("METRICAS", "true").lower() == "true"
+
+# Latências de LLM: de 50 ms a 2 min
+BUCKETS_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+BUCKETS_TOKENS_S = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+def _numero(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, labels: Iterable[str] = (), ativo: bool = True):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels = tuple(labels)
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def _chave(self, labels: dict) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def cabecalho(self) -> list:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor: float = 1, **labels) -> None:
+        if not self.ativo:
+            return
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **labels) -> float:
+        return self._valores.get(self._chave(labels), 0)
+
+    def exportar(self) -> list:
+        with self._lock:
+            itens = list(self._valores.items())
+        return self.cabecalho() + [f"{self.nome}{_labels(self.labels, k)} {_numero(v)}" for k, v in itens]
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS, ativo: bool = True):
+        super().__init__(nome, ajuda, labels, ativo)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, **labels) -> None:
+        if not self.ativo:
+            return
+        chave = self._chave(labels)
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(chave)
+            if serie is None:
+                # contagens por bucket (não cumulativas; o último é o +Inf), soma, total
+                serie = self._valores[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self) -> list:
+        with self._lock:
+            itens = [(k, (list(s[0]), s[1], s[2])) for k, s in self._valores.items()]
+        linhas = self.cabecalho()
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += n
+                le = 'le="%s"' % _numero(limite)
+                linhas.append(f"{self.nome}_bucket{_labels(self.labels, chave, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_labels(self.labels, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_labels(self.labels, chave)} {total}")
+        return linhas
+
+class Coletor(_Metrica):
+    """Valores lidos na hora da exportação: `fn()` devolve {valores_dos_labels: número}."""
+
+    def __init__(self, nome: str, ajuda: str, tipo: str, fn: Callable[[], Dict[Tuple, float]],
+                 labels: Iterable[str] = ()):
+        super().__init__(nome, ajuda, labels)
+        self.tipo = tipo
+        self.fn = fn
+
+    def exportar(self) -> list:
+        return self.cabecalho() + [f"{self.nome}{_labels(self.labels, k)} {_numero(v)}"
+                                   for k, v in self.fn().items()]
+
+class Registro:
+    def __init__(self, ativo: bool = METRICAS_ATIVAS):
+        self.ativo = ativo
+        self._metricas = []
+
+    def _registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, labels: Iterable[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, labels, self.ativo))
+
+    def histograma(self, nome: str, ajuda: str, labels: Iterable[str] = (),
+                   buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, labels, buckets, self.ativo))
+
+    def coletor(self, nome: str, ajuda: str, tipo: str, fn: Callable[[], Dict[Tuple, float]],
+                labels: Iterable[str] = ()) -> Coletor:
+        return self._registrar(Coletor(nome, ajuda, tipo, fn, labels))
+
+    def exportar(self) -> str:
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,264 @@
+"""
+Roteador entre várias instâncias do Ollama, com failover.
+
+Cada backend tem peso e a sua própria fila de admissão (admissao.Admissao).
+A escolha é feita entre os backends disponíveis por:
+  - "menos_carregado": (gerações em andamento + fila + 1) / peso;
+  - "latencia": idem, multiplicado pela latência média móvel (EWMA) do backend.
+    Backend ainda sem medida vai primeiro, para ser medido.
+
+Falhas (conexão, timeout, HTTP 429/5xx, fila cheia) passam para o próximo
+backend sem o usuário ver erro. `falhas_max` falhas seguidas tiram o backend de
+circulação por `quarentena` segundos; a verificação de saúde (GET /api/tags a
+cada `saude_intervalo` s) devolve o backend assim que ele responder. Se todos
+falharem, entra o `fallback` (no app: OpenAI) — menos quando algum deles estava
+só com a fila cheia: aí sobe o FilaCheia (503 com Retry-After no app), porque
+mandar o excesso para outro provedor desfaz a contrapressão da fila. Se o fallback também
+falhar, o erro dele sobe com o do último backend em `__cause__`.
+
+No streaming o failover só acontece antes do primeiro token.
+
+Config via env: OLLAMA_BACKENDS ("http://h1:11434=2,http://h2:11434=1", url=peso),
+ROTEAMENTO, ROTEADOR_FALHAS_MAX, ROTEADOR_QUARENTENA, ROTEADOR_SAUDE_INTERVALO.
+"""
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from admissao import Admissao, FilaCheia
+
+OLLAMA_BACKENDS = os.environ.get("OLLAMA_BACKENDS", "")
+ROTEAMENTO = os.environ.get("ROTEAMENTO", "menos_carregado").lower()  # ou "latencia"
+ROTEADOR_FALHAS_MAX = int(os.environ.get("ROTEADOR_FALHAS_MAX", 2))
+ROTEADOR_QUARENTENA = float(os.environ.get("ROTEADOR_QUARENTENA", 30))
+ROTEADOR_SAUDE_INTERVALO = float(os.environ.get("ROTEADOR_SAUDE_INTERVALO", 10))
+
+def parse_backends(texto: str, padrao: str) -> List[Tuple[str, float]]:
+    """ "url1=2,url2" -> [(url1, 2.0), (url2, 1.0)]; vazio -> [(padrao, 1.0)]."""
+    backends = []
+    for parte in (texto or "").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        url, _, peso = parte.rpartition("=") if "=" in parte else (parte, "", "")
+        backends.append((url.strip(), float(peso) if peso else 1.0))
+    return backends or [(padrao, 1.0)]
+
+def falha_do_backend(e: Exception) -> bool:
+    """Erros que justificam tentar outro backend (os demais sobem direto)."""
+    if isinstance(e, (requests.ConnectionError, requests.Timeout, FilaCheia)):
+        return True
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return False
+
+def sonda_ollama(url: str) -> bool:
+    # Sem retries: a sonda só quer saber se o host responde agora
+    try:
+        return requests.get(f"{url}/api/tags", timeout=(1, 3)).ok
+    except requests.RequestException:
+        return False
+
+class Backend:
+    def __init__(self, url: str, peso: float = 1.0, admissao: Admissao = None):
+        self.url = url.rstrip("/")
+        self.peso = peso
+        self.admissao = admissao or Admissao()
+        self.latencia = None  # EWMA em segundos
+        self.sucessos = 0
+        self.falhas = 0
+        self.falhas_seguidas = 0
+        self.fora_ate = 0.0
+        self._lock = threading.Lock()
+
+    def disponivel(self, agora: float) -> bool:
+        return agora >= self.fora_ate
+
+    def registrar_sucesso(self, duracao: float) -> None:
+        with self._lock:
+            self.sucessos += 1
+            self.falhas_seguidas = 0
+            self.latencia = duracao if self.latencia is None else 0.8 * self.latencia + 0.2 * duracao
+
+    def registrar_falha(self, falhas_max: int, quarentena: float) -> None:
+        with self._lock:
+            self.falhas += 1
+            self.falhas_seguidas += 1
+            if self.falhas_seguidas >= falhas_max:
+                self.fora_ate = time.monotonic() + quarentena
+
+    def reabilitar(self) -> None:
+        with self._lock:
+            self.falhas_seguidas = 0
+            self.fora_ate = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "peso": self.peso,
+            "disponivel": self.disponivel(time.monotonic()),
+            "latencia_s": round(self.latencia, 4) if self.latencia is not None else None,
+            "sucessos": self.sucessos,
+            "falhas": self.falhas,
+            "admissao": self.admissao.stats(),
+        }
+
+class Roteador:
+    def __init__(self, backends: List[Backend], estrategia: str = ROTEAMENTO,
+                 falhas_max: int = ROTEADOR_FALHAS_MAX, quarentena: float = ROTEADOR_QUARENTENA,
+                 saude_intervalo: float = ROTEADOR_SAUDE_INTERVALO,
+                 sonda: Callable[[str], bool] = sonda_ollama):
+        self.backends = backends
+        self.estrategia = estrategia
+        self.falhas_max = falhas_max
+        self.quarentena = quarentena
+        self.saude_intervalo = saude_intervalo
+        self.sonda = sonda
+        self.failovers = 0
+        self.fallbacks = 0
+        self._verificador = None
+        self._lock = threading.Lock()
+
+    def _pontuacao(self, b: Backend) -> float:
+        carga = (b.admissao.carga() + 1) / b.peso
+        if self.estrategia == "latencia":
+            return carga * (b.latencia or 0.0)
+        return carga
+
+    def disponiveis(self) -> List[Backend]:
+        """Backends fora de quarentena, na ordem da configuração."""
+        agora = time.monotonic()
+        return [b for b in self.backends if b.disponivel(agora)]
+
+    def candidatos(self) -> List[Backend]:
+        """Backends em ordem de preferência. Se todos estiverem fora, tenta-os mesmo assim."""
+        self._iniciar_verificacao()
+        disponiveis = self.disponiveis()
+        if not disponiveis:
+            return sorted(self.backends, key=lambda b: b.fora_ate)
+        return sorted(disponiveis, key=lambda b: (self._pontuacao(b), random.random()))
+
+    def _falhou(self, b: Backend, e: Exception) -> None:
+        # Fila cheia não é defeito do host: só passa para o próximo
+        if not isinstance(e, FilaCheia):
+            b.registrar_falha(self.falhas_max, self.quarentena)
+        with self._lock:
+            self.failovers += 1
+
+    def executar(self, fn: Callable[[Backend], object], fallback: Optional[Callable[[], object]] = None):
+        """Chama `fn(backend)` no melhor backend; em falha tenta o próximo e, por último, `fallback()`."""
+        ultimo = cheia = None
+        for b in self.candidatos():
+            inicio = time.perf_counter()
+            try:
+                resultado = fn(b)
+            except Exception as e:
+                if not falha_do_backend(e):
+                    raise
+                self._falhou(b, e)
+                ultimo = e
+                cheia = e if isinstance(e, FilaCheia) else cheia
+                continue
+            b.registrar_sucesso(time.perf_counter() - inicio)
+            return resultado
+        if cheia is not None:
+            raise cheia
+        if fallback is not None:
+            with self._lock:
+                self.fallbacks += 1
+            try:
+                return fallback()
+            except Exception as e:
+                raise e from ultimo
+        raise ultimo
+
+    def executar_stream(self, fn: Callable[[Backend], Iterable[str]],
+                        fallback: Optional[Callable[[], Iterable[str]]] = None) -> Iterator[str]:
+        """Como `executar` para geradores de tokens. A latência registrada é a do primeiro token."""
+        ultimo = cheia = None
+        for b in self.candidatos():
+            inicio = time.perf_counter()
+            tokens = iter(fn(b))
+            try:
+                primeiro = next(tokens)
+            except StopIteration:
+                b.registrar_sucesso(time.perf_counter() - inicio)
+                return
+            except Exception as e:
+                if not falha_do_backend(e):
+                    raise
+                self._falhou(b, e)
+                ultimo = e
+                cheia = e if isinstance(e, FilaCheia) else cheia
+                continue
+            b.registrar_sucesso(time.perf_counter() - inicio)
+            yield primeiro
+            try:
+                yield from tokens
+            except Exception as e:
+                # já foram tokens para o cliente: não dá para trocar de backend
+                if falha_do_backend(e):
+                    b.registrar_falha(self.falhas_max, self.quarentena)
+                raise
+            return
+        if cheia is not None:
+            raise cheia
+        if fallback is not None:
+            with self._lock:
+                self.fallbacks += 1
+            try:
+                yield from fallback()
+            except Exception as e:
+                raise e from ultimo
+            return
+        raise ultimo
+
+    def verificar_saude(self) -> None:
+        """Uma rodada de verificação: reabilita quem responde, conta falha de quem não responde."""
+        for b in self.backends:
+            if self.sonda(b.url):
+                if not b.disponivel(time.monotonic()) or b.falhas_seguidas:
+                    b.reabilitar()
+            else:
+                b.registrar_falha(self.falhas_max, self.quarentena)
+
+    def _iniciar_verificacao(self) -> None:
+        if self._verificador is not None or self.saude_intervalo <= 0 or len(self.backends) < 2:
+            return
+        with self._lock:
+            if self._verificador is not None:
+                return
+
+            def _loop():
+                while True:
+                    time.sleep(self.saude_intervalo)
+                    self.verificar_saude()
+
+            self._verificador = threading.Thread(target=_loop, name="roteador-saude", daemon=True)
+            self._verificador.start()
+
+    def cheio(self) -> bool:
+        """Todos os backends disponíveis estão com a fila cheia? (Todos em quarentena não é "cheio".)"""
+        disponiveis = self.disponiveis()
+        return bool(disponiveis) and all(b.admissao.cheia() for b in disponiveis)
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos no Retry-After: a menor espera entre os backends disponíveis;
+        com todos em quarentena, o tempo até o primeiro voltar."""
+        disponiveis = self.disponiveis()
+        if disponiveis:
+            return min(b.admissao.retry_after() for b in disponiveis)
+        return max(1, math.ceil(min(b.fora_ate for b in self.backends) - time.monotonic()))
+
+    def stats(self) -> dict:
+        return {
+            "estrategia": self.estrategia,
+            "failovers": self.failovers,
+            "fallbacks": self.fallbacks,
+            "backends": [b.stats() for b in self.backends],
+        }
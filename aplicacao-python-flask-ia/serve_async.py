@@ -0,0 +1,30 @@
+"""
+Servidor assíncrono (gevent) para o app de poemas.
+
+Com `monkey.patch_all()` os sockets do `requests` passam a ser cooperativos:
+enquanto uma requisição espera o Ollama/OpenAI, o loop atende as outras. Cada
+requisição é um greenlet, não uma thread do SO, então centenas de gerações em
+andamento cabem em um processo com poucas threads. As rotas do app.py (inclusive
+o /stream) funcionam sem mudança.
+
+Uso: python serve_async.py   (pip install -r requirements.txt; HOST, PORT e SERVER_MAX_CONEXOES via env)
+"""
+from gevent import monkey
+
+monkey.patch_all()  # antes de importar requests/flask
+
+import os
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from app import app
+
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", 8080))
+# Limite de conexões simultâneas (greenlets); acima disso novas conexões esperam no accept
+SERVER_MAX_CONEXOES = int(os.environ.get("SERVER_MAX_CONEXOES", 1000))
+
+if __name__ == "__main__":
+    print(f"Servindo em http://{HOST}:{PORT} (gevent, até {SERVER_MAX_CONEXOES} conexões)")
+    WSGIServer((HOST, PORT), app, spawn=Pool(SERVER_MAX_CONEXOES), log=None).serve_forever()
@@ -0,0 +1,114 @@
+"""
+Single-flight: requisições idênticas em andamento compartilham uma única
+geração no provedor (um duplo clique, ou vários usuários com o mesmo briefing).
+
+A primeira chamada com uma chave ("líder") executa a função; as que chegam
+enquanto ela roda ("seguidoras") esperam e recebem o mesmo resultado (ou a
+mesma exceção). Terminada a geração a chave sai da tabela: isso não é cache.
+
+No streaming as seguidoras recebem os tokens já gerados e depois acompanham
+o líder token a token.
+"""
+import hashlib
+import json
+import threading
+from typing import Callable, Iterable, Iterator
+
+class GeracaoInterrompida(RuntimeError):
+    pass
+
+class _Voo:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.partes = []
+        self.fim = False
+        self.resultado = None
+        self.erro = None
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voos = {}
+        self.emitidas = 0      # gerações de fato enviadas ao provedor
+        self.coalescidas = 0   # chamadas que pegaram carona numa geração em andamento
+
+    @staticmethod
+    def chave(*partes) -> str:
+        return hashlib.sha256(json.dumps(partes, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _entrar(self, chave: str):
+        """Retorna (voo, é_líder)."""
+        with self._lock:
+            voo = self._voos.get(chave)
+            if voo is not None:
+                self.coalescidas += 1
+                return voo, False
+            voo = self._voos[chave] = _Voo()
+            self.emitidas += 1
+            return voo, True
+
+    def _sair(self, chave: str, voo: _Voo) -> None:
+        with self._lock:
+            if self._voos.get(chave) is voo:
+                del self._voos[chave]
+        with voo.cond:
+            voo.fim = True
+            voo.cond.notify_all()
+
+    def fazer(self, chave: str, fn: Callable):
+        """Executa `fn()` uma vez por chave em andamento; todas as chamadas recebem o resultado."""
+        voo, lider = self._entrar(chave)
+        if not lider:
+            with voo.cond:
+                voo.cond.wait_for(lambda: voo.fim)
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+        try:
+            voo.resultado = fn()
+            return voo.resultado
+        except BaseException as e:
+            voo.erro = e
+            raise
+        finally:
+            self._sair(chave, voo)
+
+    def fazer_stream(self, chave: str, fn: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """Como `fazer`, para um gerador de tokens: o líder consome `fn()` e repassa os tokens."""
+        voo, lider = self._entrar(chave)
+        if lider:
+            yield from self._liderar(chave, voo, fn)
+            return
+        i = 0
+        while True:
+            with voo.cond:
+                voo.cond.wait_for(lambda: i < len(voo.partes) or voo.fim)
+                novas, fim = voo.partes[i:], voo.fim
+            i += len(novas)
+            yield from novas
+            if fim and i == len(voo.partes):
+                if voo.erro is not None:
+                    raise voo.erro
+                return
+
+    def _liderar(self, chave: str, voo: _Voo, fn: Callable[[], Iterable[str]]) -> Iterator[str]:
+        try:
+            for parte in fn():
+                with voo.cond:
+                    voo.partes.append(parte)
+                    voo.cond.notify_all()
+                yield parte
+        except GeneratorExit:
+            # o cliente do líder desconectou: as seguidoras recebem um erro em vez de um poema cortado
+            voo.erro = GeracaoInterrompida("geração interrompida")
+            raise
+        except BaseException as e:
+            voo.erro = e
+            raise
+        finally:
+            self._sair(chave, voo)
+
+    def stats(self) -> dict:
+        with self._lock:
+            em_andamento = len(self._voos)
+        return {"emitidas": self.emitidas, "coalescidas": self.coalescidas, "em_andamento": em_andamento}
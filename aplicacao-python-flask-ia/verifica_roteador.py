@@ -0,0 +1,140 @@
+"""
+Verificação do roteador (roteador.py) com vários Ollama falsos locais.
+
+Cenários, todos pelo app Flask (POST "/"):
+  1. distribuição: três stubs, pesos 2/1/1, estratégia "menos_carregado";
+  2. failover: um stub cai no meio da rodada, nenhum usuário vê erro e o
+     host sai de circulação;
+  3. volta: o stub sobe de novo e a verificação de saúde o reabilita;
+  4. último recurso: todos os Ollama fora, a resposta vem da OpenAI
+     (outro stub, no endpoint /v1/chat/completions), também no /stream; com o
+     cache ligado ela não é guardada com a chave do Ollama, e o Retry-After
+     vem da quarentena;
+  5. fila cheia: com o fallback ligado e todos os Ollama só ocupados (uma vaga,
+     sem fila), o excesso recebe 503 com Retry-After e nada vai para a OpenAI.
+
+Uso: python verifica_roteador.py   (sai com código 1 se algo falhar)
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "comum"))
+from stub_ollama import iniciar_stub, parar_stub
+
+from admissao import Admissao
+
+def subir(porta: int = 0, **config):
+    servidor, url = iniciar_stub(porta, tokens=3, **config)
+    return servidor, url, servidor.RequestHandlerClass.config
+
+def main() -> int:
+    falhas = []
+    stubs = [subir(atraso=0.05), subir(atraso=0.05), subir(atraso=0.05)]
+    openai, openai_url, openai_config = subir()
+    os.environ.update(
+        OLLAMA_BACKENDS=f"{stubs[0][1]}=2,{stubs[1][1]},{stubs[2][1]}",
+        OPENAI_BASE_URL=openai_url, OPENAI_API_KEY="teste", OPENAI_FALLBACK="true",
+        ROTEADOR_SAUDE_INTERVALO="0", ROTEADOR_QUARENTENA="60", LLM_CACHE="nunca",
+    )
+    import app
+    cliente = app.app.test_client()
+
+    def pedir(i: int) -> bool:
+        r = cliente.post("/", data={"prompt": f"tema {i}", "provider": "ollama"})
+        return r.status_code == 200 and b"palavra2" in r.data
+
+    def rodada(n: int, clientes: int = 4) -> int:
+        with ThreadPoolExecutor(clientes) as ex:
+            return sum(ex.map(pedir, range(n)))
+
+    def contagens() -> list:
+        return [cfg.requisicoes for _, _, cfg in stubs]
+
+    # 1. Distribuição
+    antes = contagens()
+    ok = rodada(80)
+    dist = [d - a for d, a in zip(contagens(), antes)]
+    print(f"1) distribuição 2/1/1: {dist} ({ok}/80 ok)")
+    if ok != 80 or not dist[0] > max(dist[1:]):
+        falhas.append(f"distribuição: {dist}, {ok}/80")
+
+    # 2. Failover
+    servidor, url, _ = stubs[1]
+    porta = servidor.server_address[1]
+    parar_stub(servidor)
+    ok = rodada(40)
+    estado = {b["url"]: b["disponivel"] for b in app.ROTEADOR.stats()["backends"]}
+    print(f"2) stub 2 fora: {ok}/40 ok, failovers {app.ROTEADOR.failovers}, disponível={estado[url]}")
+    if ok != 40 or estado[url]:
+        falhas.append(f"failover: {ok}/40, disponível={estado[url]}")
+
+    # 3. Volta
+    stubs[1] = subir(porta, atraso=0.05)
+    app.ROTEADOR.verificar_saude()
+    antes = contagens()
+    ok = rodada(40)
+    dist = [d - a for d, a in zip(contagens(), antes)]
+    print(f"3) stub 2 de volta: {dist} ({ok}/40 ok)")
+    if ok != 40 or dist[1] == 0:
+        falhas.append(f"volta: {dist}, {ok}/40")
+
+    # 4. Último recurso
+    for servidor, _, _ in stubs:
+        parar_stub(servidor)
+    antes = openai_config.requisicoes
+    ok = rodada(10)
+    print(f"4) todos os Ollama fora: {ok}/10 ok, {openai_config.requisicoes - antes} pela OpenAI, "
+          f"fallbacks {app.ROTEADOR.fallbacks}")
+    if ok != 10 or openai_config.requisicoes - antes != 10:
+        falhas.append(f"fallback: {ok}/10")
+    r = cliente.post("/stream", data={"prompt": "tema stream", "provider": "ollama"})
+    print(f"   /stream: {r.data.count(b'event: token')} tokens, fim={b'event: fim' in r.data}")
+    if b"event: fim" not in r.data:
+        falhas.append(f"fallback no stream: {r.data[:200]}")
+    # Com o cache ligado, a resposta da OpenAI não pode ficar guardada como se fosse do Ollama
+    app.LLM_CACHE.modo = "sempre"
+    cliente.post("/", data={"prompt": "tema cache", "provider": "ollama"})
+    cliente.post("/stream", data={"prompt": "tema cache", "provider": "ollama"})
+    guardadas = len(app.LLM_CACHE._memoria)
+    app.LLM_CACHE.modo = "nunca"
+    retry_after = app.ROTEADOR.retry_after()
+    print(f"   cache: {guardadas} respostas do fallback guardadas; Retry-After {retry_after}s "
+          f"(quarentena {app.ROTEADOR.quarentena:.0f}s)")
+    if guardadas:
+        falhas.append(f"resposta do fallback no cache do Ollama ({guardadas})")
+    if retry_after < 2:
+        falhas.append(f"Retry-After ignora a quarentena: {retry_after}")
+
+    # 5. Fila cheia não é falha: 503, não OpenAI
+    for i in range(len(stubs)):
+        stubs[i] = subir(stubs[i][0].server_address[1], atraso=0.5)
+    app.ROTEADOR.verificar_saude()
+    for b in app.ROTEADOR.backends:
+        b.admissao = Admissao(limite=1, fila_max=0)
+    antes = openai_config.requisicoes
+
+    def status(i: int):
+        r = cliente.post("/", data={"prompt": f"cheio {i}", "provider": "ollama"})
+        return r.status_code, r.headers.get("Retry-After")
+
+    with ThreadPoolExecutor(2 * len(stubs)) as ex:
+        respostas = list(ex.map(status, range(2 * len(stubs))))
+    codigos = sorted(c for c, _ in respostas)
+    pela_openai = openai_config.requisicoes - antes
+    print(f"5) fila cheia com fallback ligado: status {codigos}, {pela_openai} pela OpenAI")
+    if codigos.count(503) != len(stubs) or pela_openai:
+        falhas.append(f"fila cheia: {codigos}, {pela_openai} pela OpenAI")
+    if any(c == 503 and not ra for c, ra in respostas):
+        falhas.append(f"503 sem Retry-After: {respostas}")
+    for servidor, _, _ in stubs:
+        parar_stub(servidor)
+    parar_stub(openai)
+
+    for f in falhas:
+        print("FALHA:", f)
+    print("OK" if not falhas else f"{len(falhas)} falha(s)")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark da camada HTTP (http_cliente.ClienteHTTP) contra o Ollama falso local.
+
+1. Reuso de conexão: N requisições com `requests.get` solto (uma conexão TCP
+   por chamada) x ClienteHTTP (Session keep-alive por host), em HTTP e em HTTPS
+   (certificado autoassinado gerado com o `openssl`, se houver). Mostra latência
+   por requisição e quantas conexões o servidor viu. Localhost não tem RTT de
+   rede: contra a OpenAI/Status Invest cada handshake evitado vale bem mais.
+2. Retries: o stub responde 503 (recusa, repetida até em POST) ou 500 (não
+   repetido em POST: pode vir de uma geração que já rodou) em uma fração das
+   requisições; compara a taxa de sucesso sem e com retries.
+
+Uso: python bench_http_cliente.py [-n 300] [--falhar 0.3]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import requests
+
+from http_cliente import ClienteHTTP
+from stub_ollama import iniciar_stub
+
+def medir(fn, n: int) -> list:
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+def resumo(tempos: list) -> str:
+    tempos = sorted(tempos)
+    p95 = tempos[int(0.95 * (len(tempos) - 1))]
+    return f"média {statistics.mean(tempos):6.2f} ms | p50 {statistics.median(tempos):6.2f} ms | p95 {p95:6.2f} ms"
+
+def gerar_certificado(diretorio: str):
+    """Certificado autoassinado para 127.0.0.1. Retorna (cert, chave) ou None sem openssl."""
+    if not shutil.which("openssl"):
+        return None
+    cert, chave = os.path.join(diretorio, "cert.pem"), os.path.join(diretorio, "chave.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-keyout", chave, "-out", cert, "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1"],
+                   check=True, capture_output=True)
+    return cert, chave
+
+def reuso(n: int, certificado=None) -> None:
+    servidor, url = iniciar_stub(tokens=1, **({"certificado": certificado[0], "chave": certificado[1]}
+                                              if certificado else {}))
+    config = servidor.RequestHandlerClass.config
+    tags = f"{url}/api/tags"
+    verify = certificado[0] if certificado else True
+    print(f"   {tags}")
+    for nome, fn in [
+        ("requests.get (sem reuso)", lambda: requests.get(tags, timeout=5, verify=verify).raise_for_status()),
+        ("ClienteHTTP (keep-alive)", lambda c=ClienteHTTP(): c.get(tags, verify=verify).raise_for_status()),
+    ]:
+        medir(fn, 10)  # aquecimento
+        antes = config.conexoes
+        tempos = medir(fn, n)
+        print(f"   {nome:<25} {resumo(tempos)} | conexões abertas: {config.conexoes - antes}")
+    servidor.shutdown()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de reuso de conexão e retries")
+    parser.add_argument("-n", type=int, default=300)
+    parser.add_argument("--falhar", type=float, default=0.3)
+    args = parser.parse_args()
+
+    # 1. Reuso de conexão
+    print(f"1) {args.n} GET /api/tags")
+    reuso(args.n)
+    with tempfile.TemporaryDirectory() as tmp:
+        certificado = gerar_certificado(tmp)
+        if certificado:
+            reuso(args.n, certificado)
+        else:
+            print("   (sem openssl: HTTPS não medido)")
+
+    # 2. Retries
+    for status in (503, 500):
+        servidor, url = iniciar_stub(tokens=1, falhar=args.falhar, status_falha=status)
+        generate = f"{url}/api/generate"
+        print(f"2) {args.n} POST {generate} com {args.falhar:.0%} de respostas {status}")
+        for nome, cliente in [("sem retry", ClienteHTTP(retries=0)),
+                              ("3 retries", ClienteHTTP(retries=3, backoff=0.01, jitter=0.01))]:
+            ok = sum(cliente.post(generate, json={"model": "stub", "prompt": "x", "stream": False}).ok
+                     for _ in range(args.n))
+            print(f"   {nome:<25} sucesso {ok}/{args.n} ({ok / args.n:.1%})")
+        servidor.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Camada HTTP compartilhada: uma Session keep-alive por host, retries com backoff
+exponencial + jitter, limite de requisições simultâneas por host e timeouts
+(conexão, leitura) padrão.
+
+- Retries (urllib3 Retry): erros de conexão e respostas 429/500/502/503/504,
+  respeitando Retry-After, para os métodos idempotentes (o conjunto padrão do
+  urllib3). POST (/api/generate, chat da OpenAI) só repete erro de conexão e
+  429/503, em que o servidor recusou sem começar nada; um 500/504 pode vir de uma
+  geração que já rodou minutos. Erros de leitura não são repetidos: num LLM isso
+  dobraria uma geração longa. Esgotadas as tentativas, a última resposta é
+  devolvida e `raise_for_status()` continua com o chamador.
+- Limite por host: um semáforo por host para as requisições curtas; com gevent
+  (serve_async.py) ele é cooperativo. A espera por uma vaga vale como parte do
+  timeout de conexão: esgotado, sobe HostOcupado (um requests.Timeout).
+- Streams (gerações de LLM, que seguram a vaga até o último token) não entram
+  nesse limite; HTTP_MAX_STREAMS_POR_HOST (padrão 0 = sem limite) dá a eles um
+  semáforo próprio.
+
+Config via env: HTTP_RETRIES, HTTP_BACKOFF, HTTP_BACKOFF_JITTER, HTTP_MAX_POR_HOST,
+HTTP_MAX_STREAMS_POR_HOST, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", 0.5))  # 0.5, 1, 2... segundos
+HTTP_BACKOFF_JITTER = float(os.environ.get("HTTP_BACKOFF_JITTER", 0.5))
+HTTP_MAX_POR_HOST = int(os.environ.get("HTTP_MAX_POR_HOST", 8))
+HTTP_MAX_STREAMS_POR_HOST = int(os.environ.get("HTTP_MAX_STREAMS_POR_HOST", 0))
+HTTP_TIMEOUT = (float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5)), float(os.environ.get("HTTP_READ_TIMEOUT", 60)))
+
+STATUS_RETRY = (429, 500, 502, 503, 504)
+STATUS_RETRY_POST = (429, 503)  # recusas antes de qualquer trabalho: seguras até para POST
+
+class RetryHTTP(Retry):
+    """Retry do urllib3 que também repete métodos não idempotentes, mas só em STATUS_RETRY_POST."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if self._is_method_retryable(method):
+            return super().is_retry(method, status_code, has_retry_after)
+        return bool(self.total) and status_code in STATUS_RETRY_POST
+
+class HostOcupado(requests.Timeout):
+    """Nenhuma vaga do host liberou dentro do timeout de conexão."""
+
+class ClienteHTTP:
+    def __init__(self, retries: int = HTTP_RETRIES, backoff: float = HTTP_BACKOFF,
+                 jitter: float = HTTP_BACKOFF_JITTER, max_por_host: int = HTTP_MAX_POR_HOST,
+                 max_streams_por_host: int = HTTP_MAX_STREAMS_POR_HOST, timeout=HTTP_TIMEOUT):
+        self.retries = retries
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_por_host = max_por_host
+        self.max_streams_por_host = max_streams_por_host
+        self.timeout = timeout
+        self._sessoes = {}
+        self._limites = {}
+        self._limites_stream = {}
+        self._lock = threading.Lock()
+
+    def _retry(self) -> Retry:
+        return RetryHTTP(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=self.retries,
+            status_forcelist=STATUS_RETRY,
+            backoff_factor=self.backoff,
+            backoff_jitter=self.jitter,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+    @staticmethod
+    def host(url: str) -> str:
+        partes = urlsplit(url)
+        return f"{partes.scheme}://{partes.netloc}"
+
+    def sessao(self, url: str) -> requests.Session:
+        """Session do host da URL (criada na primeira vez, depois reaproveitada)."""
+        host = self.host(url)
+        with self._lock:
+            if host not in self._sessoes:
+                s = requests.Session()
+                # conexões para as requisições curtas + as dos streams (que não disputam as mesmas vagas)
+                conexoes = self.max_por_host + (self.max_streams_por_host or self.max_por_host)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=conexoes,
+                                      max_retries=self._retry())
+                s.mount(f"{host}/", adapter)
+                self._sessoes[host] = s
+                self._limites[host] = threading.BoundedSemaphore(self.max_por_host)
+                if self.max_streams_por_host > 0:
+                    self._limites_stream[host] = threading.BoundedSemaphore(self.max_streams_por_host)
+            return self._sessoes[host]
+
+    @contextmanager
+    def _vaga(self, url: str, timeout, stream: bool = False):
+        """Ocupa uma vaga do host, esperando no máximo o timeout de conexão."""
+        self.sessao(url)
+        host = self.host(url)
+        limite = (self._limites_stream if stream else self._limites).get(host)
+        if limite is None:
+            yield
+            return
+        espera = (timeout[0] if isinstance(timeout, tuple) else timeout)
+        if espera is None:
+            espera = self.timeout[0] if isinstance(self.timeout, tuple) else self.timeout
+        if not limite.acquire(timeout=espera):
+            tipo = "streams" if stream else "requisições"
+            raise HostOcupado(f"{host}: {tipo} simultâneas no limite, nenhuma vaga em {espera}s")
+        try:
+            yield
+        finally:
+            limite.release()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        with self._vaga(url, kwargs["timeout"]):
+            return self.sessao(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, url: str, **kwargs):
+        """Resposta em streaming. Não ocupa vaga das requisições curtas; com
+        max_streams_por_host, ocupa uma vaga de stream até o fim da leitura."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._vaga(url, kwargs["timeout"], stream=True):
+            r = self.sessao(url).request(method, url, stream=True, **kwargs)
+            try:
+                yield r
+            finally:
+                r.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for s in self._sessoes.values():
+                s.close()
+            self._sessoes.clear()
+            self._limites.clear()
+            self._limites_stream.clear()
+
+# Cliente compartilhado pelo processo (app, scrapers e run_analise)
+CLIENTE_HTTP = ClienteHTTP()
@@ -0,0 +1,146 @@
+"""
+Cache de respostas de LLM endereçado por conteúdo.
+
+A chave é o SHA-256 de (digest do modelo, prompt completo, opções de amostragem):
+qualquer mudança no modelo (novo `ollama create`), no prompt ou nas opções gera
+outra chave. Dois níveis:
+  - memória: LRU com `max_itens` entradas;
+  - disco (opcional): um arquivo JSON por chave em `diretorio`.
+
+Com temperatura > 0 a saída não é determinística, então o cache é ignorado,
+a menos que seja ligado explicitamente (modo "sempre"). Sem temperatura nas
+opções vale o padrão do Ollama (0.8).
+
+Modo via env LLM_CACHE: "auto" (padrão: só temperatura 0), "sempre" ou "nunca".
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Union
+
+from http_cliente import ClienteHTTP
+
+LLM_CACHE_MODE = os.environ.get("LLM_CACHE", "auto").lower()
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", "")
+LLM_CACHE_MAX_ITEMS = int(os.environ.get("LLM_CACHE_MAX_ITEMS", 256))
+# Depois de uma falha ao buscar o digest, quantos segundos usar o nome do modelo sem tentar de novo
+LLM_DIGEST_FALHA_TTL = float(os.environ.get("LLM_DIGEST_FALHA_TTL", 30))
+
+OLLAMA_DEFAULT_TEMPERATURE = 0.8
+
+_digests = {}
+_falhas = {}  # (base_url, model) -> monotonic até quando não tentar de novo
+
+# Sem retries: o digest é só a chave do cache, não vale segurar a requisição por ele
+_SONDA_HTTP = ClienteHTTP(retries=0)
+
+def ollama_model_digest(base_url: str, model: str, timeout=(1, 5)) -> str:
+    """Digest do modelo no Ollama (/api/tags), guardado por processo. Sem Ollama, usa o nome.
+    Uma falha também é lembrada por LLM_DIGEST_FALHA_TTL segundos (uma tentativa, sem retries)."""
+    key = (base_url, model)
+    if key not in _digests:
+        if time.monotonic() < _falhas.get(key, 0):
+            return model
+        name = model if ":" in model else f"{model}:latest"
+        try:
+            r = _SONDA_HTTP.get(f"{base_url.rstrip('/')}/api/tags", timeout=timeout)
+            r.raise_for_status()
+            for m in r.json().get("models", []):
+                if m.get("name") in (model, name) or m.get("model") in (model, name):
+                    _digests[key] = m.get("digest") or model
+                    break
+        except Exception:
+            # não guarda o nome como digest: tenta de novo depois do TTL
+            _falhas[key] = time.monotonic() + LLM_DIGEST_FALHA_TTL
+            return model
+        _digests.setdefault(key, model)
+    return _digests[key]
+
+class LLMCache:
+    def __init__(self, max_itens: int = LLM_CACHE_MAX_ITEMS, diretorio: str = LLM_CACHE_DIR,
+                 modo: str = LLM_CACHE_MODE):
+        self.max_itens = max_itens
+        self.diretorio = diretorio or None
+        self.modo = modo
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+
+    @staticmethod
+    def chave(digest: str, prompt: str, opcoes: Optional[dict] = None) -> str:
+        payload = json.dumps([digest, prompt, opcoes or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ativo(self, opcoes: Optional[dict] = None) -> bool:
+        """Cache só vale para saída determinística (temperatura 0), salvo modo "sempre"."""
+        if self.modo == "nunca":
+            return False
+        if self.modo == "sempre":
+            return True
+        temperatura = (opcoes or {}).get("temperature", OLLAMA_DEFAULT_TEMPERATURE)
+        return temperatura is not None and float(temperatura) <= 0
+
+    def _arquivo(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave[:2], f"{chave}.json")
+
+    def get(self, chave: str) -> Optional[str]:
+        """Resposta guardada ou None; conta a consulta em hits/misses (com o lock do cache)."""
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.hits += 1
+                return self._memoria[chave]
+        resposta = None
+        if self.diretorio:
+            try:
+                with open(self._arquivo(chave), encoding="utf-8") as f:
+                    resposta = json.load(f)["resposta"]
+            except (OSError, ValueError, KeyError):
+                resposta = None
+        if resposta is not None:
+            self._guardar_memoria(chave, resposta)
+        with self._lock:
+            if resposta is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return resposta
+
+    def _guardar_memoria(self, chave: str, resposta: str) -> None:
+        with self._lock:
+            self._memoria[chave] = resposta
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.max_itens:
+                self._memoria.popitem(last=False)
+
+    def put(self, chave: str, resposta: str) -> None:
+        self._guardar_memoria(chave, resposta)
+        if self.diretorio:
+            arquivo = self._arquivo(chave)
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            tmp = f"{arquivo}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"resposta": resposta}, f, ensure_ascii=False)
+            os.replace(tmp, arquivo)
+
+    def obter_ou_gerar(self, digest: Union[str, Callable[[], str]], prompt: str, opcoes: Optional[dict],
+                       gerar: Callable[[], str], guardar: Optional[Callable[[], bool]] = None) -> str:
+        """Devolve a resposta do cache ou chama `gerar()` e guarda o resultado.
+        `digest` pode ser uma função: só é chamada quando o cache está ativo.
+        `guardar`, chamada depois de `gerar()`: False não grava (ex.: outro provedor respondeu)."""
+        if not self.ativo(opcoes):
+            return gerar()
+        chave = self.chave(digest() if callable(digest) else digest, prompt, opcoes)
+        resposta = self.get(chave)
+        if resposta is not None:
+            return resposta
+        resposta = gerar()
+        if guardar is None or guardar():
+            self.put(chave, resposta)
+        return resposta
@@ -0,0 +1,227 @@
+"""
+Servidor falso do Ollama (e de um endpoint compatível com OpenAI) para testes,
+benchmarks e testes de carga locais — sem modelo, sem GPU, sem rede.
+
+Endpoints:
+  GET  /api/tags              lista um modelo com digest fixo
+  POST /api/generate          JSON único ou NDJSON (stream=true)
+  POST /api/chat              idem, no formato de chat
+  POST /v1/chat/completions   JSON ou SSE (stream=true), formato OpenAI
+
+A "geração" devolve `tokens` palavras, esperando `atraso` segundos antes da
+primeira e `intervalo` entre as seguintes; com "format": "json" (sem stream) o texto
+vem embrulhado num objeto JSON, como o Ollama faz com saída estruturada. Com `falhar` em [0, 1] responde `status_falha`
+(padrão 500) nessa fração das requisições. Com `capacidade` > 0, só essa quantidade de gerações
+roda ao mesmo tempo e as demais esperam (como um Ollama numa CPU).
+
+Uso: python stub_ollama.py [--porta 11435] [--atraso 0.5] [--tokens 20]
+"""
+import argparse
+import json
+import random
+import socket
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_DIGEST = "sha256:stub0000000000000000000000000000000000000000000000000000000000"
+
+class StubConfig:
+    def __init__(self, atraso: float = 0.0, intervalo: float = 0.0, tokens: int = 20, falhar: float = 0.0,
+                 capacidade: int = 0, status_falha: int = 500):
+        self.vagas = threading.Semaphore(capacidade) if capacidade else None
+        self.atraso = atraso
+        self.intervalo = intervalo
+        self.tokens = tokens
+        self.falhar = falhar
+        self.status_falha = status_falha
+        self.requisicoes = 0
+        self.conexoes = 0
+        self.ultimo_corpo = None  # JSON do último POST, para as verificações conferirem o payload
+        self.abertas = set()  # sockets das conexões em andamento (para parar_stub)
+        self._lock = threading.Lock()
+
+    def contar(self, nova_conexao: bool) -> None:
+        with self._lock:
+            self.requisicoes += 1
+            self.conexoes += nova_conexao
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados
+    config = StubConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self._nova_conexao = True
+        with self.config._lock:
+            self.config.abertas.add(self.connection)
+
+    def finish(self):
+        with self.config._lock:
+            self.config.abertas.discard(self.connection)
+        super().finish()
+
+    def _json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _tokens(self):
+        if self.config.vagas:
+            self.config.vagas.acquire()
+        try:
+            time.sleep(self.config.atraso)
+            for i in range(self.config.tokens):
+                if i and self.config.intervalo:
+                    time.sleep(self.config.intervalo)
+                yield f"palavra{i} "
+        finally:
+            if self.config.vagas:
+                self.config.vagas.release()
+
+    def _metricas(self, inicio: float) -> dict:
+        total = int((time.perf_counter() - inicio) * 1e9)
+        return {
+            "total_duration": total,
+            "load_duration": 1000,
+            "prompt_eval_count": 10,
+            "prompt_eval_duration": 1000,
+            "eval_count": self.config.tokens,
+            "eval_duration": max(total - 2000, 1),
+        }
+
+    def _contar(self) -> None:
+        self.config.contar(self._nova_conexao)
+        self._nova_conexao = False
+
+    def do_GET(self):
+        self._contar()
+        if self.path.rstrip("/") == "/api/tags":
+            return self._json(200, {"models": [{"name": "stub:latest", "model": "stub:latest", "digest": STUB_DIGEST}]})
+        if self.path.rstrip("/") in ("", "/api/version"):
+            return self._json(200, {"version": "stub"})
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        self._contar()
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._json(400, {"error": "json inválido"})
+        self.config.ultimo_corpo = body
+        if self.config.falhar and random.random() < self.config.falhar:
+            return self._json(self.config.status_falha, {"error": "falha simulada"})
+
+        path = self.path.rstrip("/")
+        if path not in ("/api/generate", "/api/chat", "/v1/chat/completions"):
+            return self._json(404, {"error": "not found"})
+        model = body.get("model", "stub")
+        inicio = time.perf_counter()
+
+        if path == "/v1/chat/completions":
+            if not body.get("stream"):
+                texto = "".join(self._tokens())
+                return self._json(200, {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": texto}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": self.config.tokens,
+                              "total_tokens": 10 + self.config.tokens},
+                })
+            self._inicio_stream("text/event-stream")
+            for tok in self._tokens():
+                evento = {"choices": [{"index": 0, "delta": {"content": tok}}]}
+                self._chunk(f"data: {json.dumps(evento)}\n\n".encode())
+            if (body.get("stream_options") or {}).get("include_usage"):
+                uso = {"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": self.config.tokens,
+                                                "total_tokens": 10 + self.config.tokens}}
+                self._chunk(f"data: {json.dumps(uso)}\n\n".encode())
+            self._chunk(b"data: [DONE]\n\n")
+            return self._chunk(b"")
+
+        chat = path == "/api/chat"
+        if not body.get("stream", True):
+            texto = "".join(self._tokens())
+            if body.get("format") == "json":
+                texto = json.dumps({"texto": texto.strip()})
+            data = {"model": model, "done": True, **self._metricas(inicio)}
+            data.update({"message": {"role": "assistant", "content": texto}} if chat else {"response": texto})
+            return self._json(200, data)
+        self._inicio_stream("application/x-ndjson")
+        for tok in self._tokens():
+            parte = {"model": model, "done": False}
+            parte.update({"message": {"role": "assistant", "content": tok}} if chat else {"response": tok})
+            self._chunk((json.dumps(parte) + "\n").encode())
+        final = {"model": model, "done": True, **self._metricas(inicio)}
+        final.update({"message": {"role": "assistant", "content": ""}} if chat else {"response": ""})
+        self._chunk((json.dumps(final) + "\n").encode())
+        self._chunk(b"")
+
+    def _inicio_stream(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # backlog do listen(); com o padrão (5) uma rajada de conexões novas (teste de carga)
+    # estoura a fila de accept e o cliente leva "Connection reset by peer"
+    request_queue_size = 1024
+
+def iniciar_stub(porta: int = 0, certificado: str = None, chave: str = None, **config) -> tuple:
+    """Sobe o stub numa thread. Retorna (servidor, url_base); pare com servidor.shutdown().
+    Com `certificado`/`chave` (PEM) serve HTTPS."""
+    handler = type("Handler", (StubHandler,), {"config": StubConfig(**config)})
+    servidor = StubServer(("127.0.0.1", porta), handler)
+    esquema = "http"
+    if certificado:
+        contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        contexto.load_cert_chain(certificado, chave)
+        servidor.socket = contexto.wrap_socket(servidor.socket, server_side=True)
+        esquema = "https"
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"{esquema}://127.0.0.1:{servidor.server_address[1]}"
+
+def parar_stub(servidor) -> None:
+    """Derruba o stub como um host que caiu: para de aceitar e fecha as conexões keep-alive abertas."""
+    servidor.shutdown()
+    servidor.server_close()
+    config = servidor.RequestHandlerClass.config
+    with config._lock:
+        abertas = list(config.abertas)
+    for sock in abertas:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ollama falso para testes locais")
+    parser.add_argument("--porta", type=int, default=11435)
+    parser.add_argument("--atraso", type=float, default=0.5, help="segundos até o primeiro token")
+    parser.add_argument("--intervalo", type=float, default=0.02, help="segundos entre tokens")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--falhar", type=float, default=0.0, help="fração de respostas com erro")
+    parser.add_argument("--status-falha", type=int, default=500, help="status dessas respostas (ex.: 503)")
+    parser.add_argument("--capacidade", type=int, default=0, help="gerações simultâneas (0 = sem limite)")
+    args = parser.parse_args()
+    servidor, url = iniciar_stub(args.porta, atraso=args.atraso, intervalo=args.intervalo,
+                                 tokens=args.tokens, falhar=args.falhar, capacidade=args.capacidade,
+                                 status_falha=args.status_falha)
+    print(f"Ollama falso em {url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()